@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+"""
+Warudo Scene Config Checker
+一括チェック（コマンドライン）エントリーポイント
+
+使い方:
+    python batch_check.py <シーンファイルまたはフォルダ>... [--assets StreamingAssetsのパス] [--workers N]
+
+問題が見つかった場合は終了コード1を返します。
+"""
+
+import sys
+
+from modules.batch import main
+
+
+if __name__ == "__main__":
+    sys.exit(main())
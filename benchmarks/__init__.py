@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""
+ベンチマーク
+合成データを使って各処理の速度を計測します。リポジトリのルートから
+``python -m benchmarks.<スクリプト名>`` で実行してください。
+"""
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+アセット情報のメモリ使用量ベンチマーク
+以前の辞書形式（7項目）と、フォルダ情報を共有するAssetRecordについて、
+ファイル一覧とインデックスを作成したときの1アセットあたりのバイト数と時間を比較します。
+
+    python -m benchmarks.bench_assets --files 25000 --subfolders 50
+"""
+
+import argparse
+import gc
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from modules.asset_manager import AssetManager
+from benchmarks.synthetic import make_streaming_assets
+
+
+def legacy_build_asset_files(manager, listings, states):
+    """以前の辞書形式でファイル一覧とインデックスを作成（比較用）"""
+    asset_files = {category: [] for category in manager.category_paths}
+    asset_index = {category: {} for category in manager.category_paths}
+    categories = list(manager.category_paths)
+    for rel_path, (_, _, files) in listings.items():
+        parts, state = states[rel_path]
+        if not files or state is None:
+            continue
+        category = categories[state[0]]
+        subfolder_name = state[4]
+        category_dir = "/".join(parts[state[3] + 1:])
+        prefix = manager.protocols[category]
+        for file in files:
+            category_rel_path = f"{category_dir}/{file}" if category_dir else file
+            path_variants = [f"{prefix}data/{folder}/{category_rel_path}" for folder in manager.category_paths[category]]
+            asset = {
+                "name": os.path.splitext(file)[0],
+                "full_path": os.path.join(manager.streaming_assets_path, rel_path, file).replace("\\", "/"),
+                "rel_path": f"{rel_path}/{file}" if rel_path else file,
+                "category_path": category_rel_path,
+                "asset_path": path_variants[0],
+                "asset_path_variants": path_variants,
+                "is_subfolder": subfolder_name is not None,
+                "subfolder_name": subfolder_name or ""
+            }
+            asset_files[category].append(asset)
+            key = manager._make_key(subfolder_name, category_rel_path.split('/')[-1])
+            asset_index[category].setdefault(key, []).append(asset)
+    return asset_files, asset_index
+
+
+def _retained_bytes(build):
+    """build() で作成した結果が保持するメモリ（バイト）を返す"""
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    result = build()
+    retained = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del result
+    return retained
+
+
+def _best_time(build, repeat):
+    """メモリ計測なしで repeat回実行した最短時間"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="アセット情報のメモリ使用量のベンチマーク")
+    parser.add_argument("--files", type=int, default=25000, help="カテゴリごとのファイル数")
+    parser.add_argument("--subfolders", type=int, default=50, help="カテゴリごとのサブフォルダ数")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--root", help="既存のStreamingAssetsフォルダを使う場合に指定")
+    args = parser.parse_args(argv)
+
+    root = args.root or tempfile.mkdtemp(prefix="warudo_bench_")
+    try:
+        if not args.root:
+            make_streaming_assets(root, args.files, args.subfolders)
+
+        manager = AssetManager()
+        manager.streaming_assets_path = root
+        listings, states = manager._walk_listings({}, manager.scan_workers)
+
+        def build_records():
+            built = AssetManager()
+            built.streaming_assets_path = root
+            built._build_asset_files(listings, states)
+            return built
+
+        manager = build_records()
+        total = sum(manager.get_asset_summary().values())
+        legacy_files, _ = legacy_build_asset_files(manager, listings, states)
+        for category, assets in manager.asset_files.items():
+            if [asset.to_dict() for asset in assets] != legacy_files[category]:
+                print(f"ERROR: {category} のアセット情報が以前の辞書形式と一致しません")
+                return 1
+        del legacy_files
+
+        print(f"assets: {total}")
+        print(f"{'representation':<16}{'bytes/asset':>12}{'total MB':>10}{'seconds':>10}")
+        results = []
+        for label, build in (("dict (legacy)", lambda: legacy_build_asset_files(manager, listings, states)),
+                             ("AssetRecord", build_records)):
+            retained = _retained_bytes(build)
+            seconds = _best_time(build, args.repeat)
+            results.append(retained)
+            print(f"{label:<16}{retained / total:>12.1f}{retained / (1024 * 1024):>10.2f}{seconds:>10.4f}")
+        print(f"memory ratio: {results[0] / results[1]:.2f}x")
+    finally:
+        if not args.root:
+            shutil.rmtree(root, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
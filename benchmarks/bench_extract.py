@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+参照抽出ベンチマーク
+SceneAnalyzer.extract_objects（明示的スタック版・参照テーブル）と、以前の再帰版
+（出現ごとの辞書）の速度とピークメモリを比較し、グループ化した結果が一致すること、
+記録した位置のJSON Pointerが参照を指すこと、深いシーンで再帰版がRecursionErrorになることを確認します。
+
+    python -m benchmarks.bench_extract --references 50000 --depth 8
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+
+from modules.analyzer import SceneAnalyzer
+from benchmarks.synthetic import make_scene, make_deep_scene
+
+
+def legacy_extract_objects(analyzer, data):
+    """以前の再帰版の抽出処理（比較用）"""
+    result = {"environments": [], "props": [], "characters": [], "particles": [], "other_objects": []}
+
+    def recurse(node):
+        if isinstance(node, dict):
+            if "value" in node and isinstance(node["value"], str):
+                value = node["value"].strip('"')
+                for prefix, key in (("environment://", "environments"), ("prop://", "props"),
+                                    ("character://", "characters"), ("particle://", "particles")):
+                    if value.startswith(prefix):
+                        result[key].append({"name": analyzer._get_name_from_path(value), "path": value})
+                        break
+            for value in node.values():
+                recurse(value)
+        elif isinstance(node, list):
+            for item in node:
+                recurse(item)
+
+    recurse(data)
+    return result
+
+
+def _best_time(func, repeat):
+    """repeat回実行した最短時間と結果を返す"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _peak_memory(func):
+    """funcの実行中に確保したメモリのピーク（バイト）"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _resolve_pointer(data, pointer):
+    """JSON Pointerが指す値を返す"""
+    for part in pointer.split("/")[1:]:
+        part = part.replace("~1", "/").replace("~0", "~")
+        data = data[int(part)] if type(data) is list else data[part]
+    return data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="参照抽出のベンチマーク")
+    parser.add_argument("--references", type=int, default=50000)
+    parser.add_argument("--unique", type=int, default=1000)
+    parser.add_argument("--depth", type=int, default=8)
+    parser.add_argument("--deep", type=int, default=20000, help="RecursionError確認用のネストの深さ")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    analyzer = SceneAnalyzer(None)
+    scene = make_scene(args.references, args.unique, args.depth)
+
+    legacy_time, legacy_result = _best_time(lambda: legacy_extract_objects(analyzer, scene), args.repeat)
+    new_time, new_result = _best_time(lambda: analyzer.extract_objects(scene), args.repeat)
+    for key, objects in legacy_result.items():
+        if (len(new_result[key]) != len(objects)
+                or analyzer.group_objects_by_path(new_result[key]) != analyzer.group_objects_by_path(objects)):
+            print(f"ERROR: 抽出結果（{key}）が再帰版と一致しません")
+            return 1
+
+    # 記録した位置がすべてその参照の "value" を指すか
+    located = analyzer.extract_objects(scene, locations=True)
+    for table in (located["props"], located["environments"]):
+        for path_id, node in list(zip(table.location_ids, table.location_nodes))[:20]:
+            pointer = analyzer.json_pointer(scene, node)
+            if _resolve_pointer(scene, pointer).strip('"') != table.paths[path_id]:
+                print(f"ERROR: 位置 {pointer} が {table.paths[path_id]} を指していません")
+                return 1
+
+    legacy_peak = _peak_memory(lambda: legacy_extract_objects(analyzer, scene))
+    new_peak = _peak_memory(lambda: analyzer.extract_objects(scene))
+    print(f"references: {args.references}, unique: {args.unique}, depth: {args.depth}")
+    print(f"recursive: {legacy_time:.4f}s, peak {legacy_peak / 1e6:.2f} MB")
+    print(f"iterative: {new_time:.4f}s  (x{legacy_time / new_time:.2f}), peak {new_peak / 1e6:.2f} MB")
+
+    deep = make_deep_scene(args.deep)
+    try:
+        legacy_extract_objects(analyzer, deep)
+        print(f"recursive (depth {args.deep}): ok")
+    except RecursionError:
+        print(f"recursive (depth {args.deep}): RecursionError")
+    deep_result = analyzer.extract_objects(deep)
+    print(f"iterative (depth {args.deep}): ok, {len(deep_result['props'])} prop(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
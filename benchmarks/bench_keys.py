@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+パスのキーのベンチマーク
+以前のキー（casefoldのみ）と、canonical_key() の正規形（区切り文字の統一・NFC・casefold）について、
+インデックスのキーと参照パスのキーを作成する時間を比較し、
+かな・漢字・全角文字の名前が正しく一致するかを確認します（一致しない場合は終了コード1）。
+
+    python -m benchmarks.bench_keys --names 200000
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import unicodedata
+
+from modules.asset_manager import AssetManager, canonical_key
+
+# 名前の部品（ASCII・ひらがな・カタカナ・漢字・全角英数字・半角カタカナ）
+NAME_PARTS = ("Chair", "desk", "ROOM", "がっこう", "ポスター", "ガラス", "教室", "黒板",
+              "ＡＢＣ", "ｂｏｘ", "１２３", "ｶﾞﾗｽ", "Café")
+
+# (参照側, ファイル側, 一致するべきか)
+MATCH_CASES = (
+    ("ガラス.warudo", unicodedata.normalize("NFD", "ガラス.warudo"), True),    # 濁点の分解(NFD)
+    ("ぱんだ.warudo", unicodedata.normalize("NFD", "ぱんだ.warudo"), True),    # 半濁点の分解(NFD)
+    ("教室の机.warudo", "教室の机.warudo", True),                               # 漢字
+    ("ＡＢＣ.warudo", "ａｂｃ.warudo", True),                                   # 全角英字の大文字小文字
+    ("Straße.warudo", "STRASSE.warudo", True),                                  # casefold
+    ("ＡＢＣ.warudo", "ABC.warudo", False),                                      # 全角と半角は区別する
+    ("ｶﾞﾗｽ.warudo", "ガラス.warudo", False),                                    # 半角カタカナと全角カタカナも区別する
+    ("がらす.warudo", "ガラス.warudo", False),                                   # ひらがなとカタカナも区別する
+)
+
+
+def legacy_key(subfolder, filename):
+    """以前のキー（casefoldのみ、比較用）"""
+    return (subfolder.casefold() if subfolder is not None else None, filename.casefold())
+
+
+def legacy_reference_key(manager, asset_path, category):
+    """以前の参照パスのキー（比較用）"""
+    parts = manager.normalize_asset_path(asset_path, category).split("/")
+    return legacy_key(parts[1] if len(parts) > 2 else None, parts[-1])
+
+
+def make_names(count, seed=0):
+    """部品を組み合わせた名前を作成（一部はNFDに分解）"""
+    rng = random.Random(seed)
+    names = []
+    for index in range(count):
+        name = "".join(rng.sample(NAME_PARTS, 2)) + f"{index}.warudo"
+        if rng.random() < 0.2:
+            name = unicodedata.normalize("NFD", name)
+        names.append(name)
+    return names
+
+
+def check_cases(manager, root):
+    """一致するべき名前の組み合わせを確認し、失敗の説明のリストを返す"""
+    failures = []
+    for reference, file, expected in MATCH_CASES:
+        if (canonical_key(reference) == canonical_key(file)) != expected:
+            failures.append(f"{reference!r} と {file!r} の比較結果が {expected} ではありません")
+        if canonical_key(canonical_key(file)) != canonical_key(file):
+            failures.append(f"{file!r} の正規形が冪等ではありません")
+
+    # 区切り文字の統一
+    if canonical_key("Props\\教室\\机.warudo") != canonical_key("props/教室/机.warudo"):
+        failures.append("区切り文字 \\ と / が一致しません")
+
+    # 実際のフォルダ: ファイル名・サブフォルダ名がNFDでも、NFCの参照パスで見つかる
+    folder = os.path.join(root, "Props", unicodedata.normalize("NFD", "学校グッズ"))
+    os.makedirs(folder, exist_ok=True)
+    for _, file, expected in MATCH_CASES:
+        open(os.path.join(folder, file), "w").close()
+    manager.set_streaming_assets_path(root)
+    for reference, file, expected in MATCH_CASES:
+        path = f"prop://data/Props/学校グッズ/{reference}"
+        if expected and not manager.check_file_exists(path, "Props"):
+            failures.append(f"{path!r} が {file!r} として見つかりません")
+    path = "prop://data/Props/学校グッズ/ＡＢＣ.warudo"
+    if manager.check_file_exists(path.replace("ＡＢＣ", "ＡＢＣＤ"), "Props"):
+        failures.append("存在しないファイルが見つかりました")
+    return failures
+
+
+def _best_time(func, repeat):
+    """repeat回実行した最短時間"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="パスのキーのベンチマーク")
+    parser.add_argument("--names", type=int, default=200000, help="キーを作成する名前の数")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix="warudo_bench_")
+    try:
+        manager = AssetManager()
+        failures = check_cases(manager, root)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    names = make_names(args.names)
+    subfolders = [name.split(".")[0][:6] for name in names]
+    paths = [f"prop://data/Props/{subfolder}/{name}" for subfolder, name in zip(subfolders, names)]
+    ascii_paths = [f"prop://data/Props/Sub{index % 50}/Item{index}.warudo" for index in range(args.names)]
+
+    print(f"names: {args.names}")
+    print(f"{'keys':<28}{'legacy s':>10}{'canonical s':>13}")
+    for label, legacy, canonical in (
+        ("index (mixed names)",
+         lambda: [legacy_key(s, n) for s, n in zip(subfolders, names)],
+         lambda: [manager._make_key(s, n) for s, n in zip(subfolders, names)]),
+        ("reference (mixed names)",
+         lambda: [legacy_reference_key(manager, p, "Props") for p in paths],
+         lambda: [manager.make_reference_key(p, "Props") for p in paths]),
+        ("reference (ASCII names)",
+         lambda: [legacy_reference_key(manager, p, "Props") for p in ascii_paths],
+         lambda: [manager.make_reference_key(p, "Props") for p in ascii_paths]),
+    ):
+        print(f"{label:<28}{_best_time(legacy, args.repeat):>10.4f}{_best_time(canonical, args.repeat):>13.4f}")
+
+    # 以前のキーでは見つからない（NFDの）名前の数
+    legacy_keys = {legacy_key(s, n) for s, n in zip(subfolders, names)}
+    canonical_keys = {manager._make_key(s, n) for s, n in zip(subfolders, names)}
+    composed = [unicodedata.normalize("NFC", p) for p in paths]
+    legacy_misses = sum(1 for p in composed if legacy_reference_key(manager, p, "Props") not in legacy_keys)
+    canonical_misses = sum(1 for p in composed if manager.make_reference_key(p, "Props") not in canonical_keys)
+    print(f"NFC references not found: legacy {legacy_misses}, canonical {canonical_misses}")
+    if canonical_misses:
+        failures.append(f"NFCの参照パス {canonical_misses} 件が見つかりません")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
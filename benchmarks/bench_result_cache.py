@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+分析結果キャッシュのベンチマーク
+SceneAnalyzer.load_scene でシーンを読み込む時間（キャッシュなし・ハッシュ値の計算あり・
+サイズとmtimeが同じでキャッシュを使う場合）を比較し、読み込みから保存までの間に
+シーンファイルが保存されても、新しい内容に古い分析結果が使われないことを確認します
+（使われた場合は終了コード1）。
+
+    python -m benchmarks.bench_result_cache --references 50000
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from modules.analyzer import SceneAnalyzer
+from modules.result_cache import SceneResultCache
+from benchmarks.synthetic import make_scene
+
+ADDED_REFERENCE = "prop://data/Props/Added/NewProp.warudo"
+
+
+def _best_time(func, repeat):
+    """repeat回実行した最短時間と結果を返す"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _write_scene(file_path, scene, mtime_offset=0):
+    """シーンを書き込み、更新時刻をずらす（同じ秒に保存しても別の内容として扱われるように）"""
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(scene, f)
+    stat = os.stat(file_path)
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + mtime_offset))
+
+
+def _analyze(analyzer, scene_data):
+    """抽出とグループ化"""
+    extracted_objects = analyzer.extract_objects(scene_data)
+    return extracted_objects, analyzer.group_extracted_objects(extracted_objects)
+
+
+def _has_reference(object_counts, path):
+    return any(obj["path"] == path for counts in object_counts.values() for obj in counts)
+
+
+def check_modified_between_load_and_store(root, scene):
+    """読み込み後・保存前にシーンが上書きされた場合のキャッシュを確認し、失敗した項目を返す"""
+    failures = []
+    cache_dir = os.path.join(root, "cache_modified")
+    scene_path = os.path.join(root, "modified.json")
+    _write_scene(scene_path, scene)
+
+    analyzer = SceneAnalyzer(None, result_cache=SceneResultCache(cache_dir))
+    scene_data, cached, scene_hash = analyzer.load_scene(scene_path)
+    if cached is not None or scene_hash is None:
+        failures.append("first load should parse the scene")
+
+    # Warudoで参照を追加して保存した状態（分析はまだ古いシーンデータ）
+    new_scene = {"root": scene, "added": {"value": ADDED_REFERENCE}}
+    _write_scene(scene_path, new_scene, mtime_offset=1_000_000_000)
+    extracted_objects, object_counts = _analyze(analyzer, scene_data)
+    analyzer.store_result(scene_hash, extracted_objects, object_counts)
+
+    # 新しいプロセスでは、新しい内容に対してキャッシュを使わない
+    fresh = SceneAnalyzer(None, result_cache=SceneResultCache(cache_dir))
+    new_data, cached, new_hash = fresh.load_scene(scene_path)
+    if cached is not None:
+        failures.append("stale result served for the modified scene")
+    elif not _has_reference(_analyze(fresh, new_data)[1], ADDED_REFERENCE):
+        failures.append("added reference missing from the modified scene")
+    if new_hash == scene_hash:
+        failures.append("modified scene has the same content hash")
+
+    # 元の内容に戻せば、保存した結果をそのまま使える
+    _write_scene(scene_path, scene, mtime_offset=2_000_000_000)
+    _, cached, _ = SceneAnalyzer(None, result_cache=SceneResultCache(cache_dir)).load_scene(scene_path)
+    if cached is None or cached["object_counts"] != object_counts:
+        failures.append("result for the original content not reused")
+    return failures
+
+
+def check_modified_while_streaming(root, scene):
+    """ストリーム読み込み中に上書きされたことを content_hash() の比較で検出できるか確認"""
+    failures = []
+    scene_path = os.path.join(root, "streamed.json")
+    _write_scene(scene_path, scene)
+    analyzer = SceneAnalyzer(None, result_cache=SceneResultCache(os.path.join(root, "cache_streamed")))
+    before = analyzer.content_hash(scene_path)
+    _write_scene(scene_path, {"root": scene, "added": {"value": ADDED_REFERENCE}}, mtime_offset=1_000_000_000)
+    if analyzer.content_hash(scene_path) == before:
+        failures.append("modification during streaming not detected")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="分析結果キャッシュのベンチマーク")
+    parser.add_argument("--references", type=int, default=50000, help="シーン内の参照の数")
+    parser.add_argument("--unique", type=int, default=500, help="ユニークな参照パスの数")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    scene = make_scene(args.references, args.unique)
+    root = tempfile.mkdtemp(prefix="warudo_bench_")
+    try:
+        failures = check_modified_between_load_and_store(root, scene)
+        failures += check_modified_while_streaming(root, scene)
+
+        scene_path = os.path.join(root, "scene.json")
+        _write_scene(scene_path, scene)
+        print(f"references: {args.references}, scene size: {os.path.getsize(scene_path)} bytes")
+
+        def load_without_cache():
+            with open(scene_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        def load_and_hash():
+            analyzer = SceneAnalyzer(None, result_cache=SceneResultCache(os.path.join(root, "cache_miss")))
+            return analyzer.load_scene(scene_path)
+
+        analyzer = SceneAnalyzer(None, result_cache=SceneResultCache(os.path.join(root, "cache_hit")))
+        scene_data, _, scene_hash = analyzer.load_scene(scene_path)
+        analyzer.store_result(scene_hash, *_analyze(analyzer, scene_data))
+
+        for label, func in (("json.load", load_without_cache),
+                            ("load_scene (miss)", load_and_hash),
+                            ("load_scene (hit)", lambda: analyzer.load_scene(scene_path))):
+            print(f"{label:<20}{_best_time(func, args.repeat)[0]:>10.4f} s")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+スキャン速度ベンチマーク
+os.walkによる参照実装と、スレッドプールによる並列スキャンをワーカー数ごとに比較します。
+
+    python -m benchmarks.bench_scan --files 5000 --workers 1 2 4 8 16
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+
+from modules.asset_manager import AssetManager
+from benchmarks.synthetic import make_streaming_assets
+
+
+def _time_scan(root, scan):
+    """新しいAssetManagerで1回スキャンし、(秒, AssetManager)を返す"""
+    manager = AssetManager()
+    manager.streaming_assets_path = root
+    start = time.perf_counter()
+    scan(manager)
+    return time.perf_counter() - start, manager
+
+
+def _as_dicts(manager):
+    """比較用にアセット情報を辞書のリストに変換"""
+    return {category: [asset.to_dict() for asset in assets] for category, assets in manager.asset_files.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="StreamingAssetsスキャンのベンチマーク")
+    parser.add_argument("--files", type=int, default=5000, help="カテゴリごとのファイル数")
+    parser.add_argument("--subfolders", type=int, default=50, help="カテゴリごとのサブフォルダ数")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--root", help="既存のStreamingAssetsフォルダを使う場合に指定")
+    args = parser.parse_args(argv)
+
+    root = args.root or tempfile.mkdtemp(prefix="warudo_bench_")
+    try:
+        if not args.root:
+            make_streaming_assets(root, args.files, args.subfolders)
+
+        best, reference = min((_time_scan(root, lambda m: m.scan_streaming_assets_reference())
+                               for _ in range(args.repeat)), key=lambda r: r[0])
+        total = sum(reference.get_asset_summary().values())
+        print(f"assets: {total}")
+        print(f"{'scanner':<16}{'seconds':>10}{'files/s':>12}{'speedup':>9}")
+        print(f"{'os.walk (ref)':<16}{best:>10.4f}{total / best:>12.0f}{1.0:>9.2f}")
+
+        for workers in args.workers:
+            elapsed, manager = min((_time_scan(root, lambda m: m.scan_streaming_assets(workers=workers))
+                                    for _ in range(args.repeat)), key=lambda r: r[0])
+            if _as_dicts(manager) != _as_dicts(reference):
+                print(f"ERROR: workers={workers} の結果が参照実装と一致しません")
+                return 1
+            print(f"{f'scandir x{workers}':<16}{elapsed:>10.4f}{total / elapsed:>12.0f}{best / elapsed:>9.2f}")
+    finally:
+        if not args.root:
+            shutil.rmtree(root, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
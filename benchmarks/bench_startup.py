@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+起動時間ベンチマーク
+新しいPythonプロセスで各エントリーポイントの読み込みとウィンドウ表示までの時間を計測し、
+予算（ミリ秒）を超えた場合やGUIを使わないエントリーポイントがtkinterを読み込んだ場合は
+終了コード1を返します（性能の劣化の検出用）。
+
+    python -m benchmarks.bench_startup --repeat 5 --import-budget 150 --window-budget 1000
+
+ウィンドウ表示の計測はディスプレイがない環境では省略します。
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.synthetic import make_streaming_assets
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# GUIを使わずに読み込めるべきモジュール
+NON_UI_MODULES = ("main", "modules.batch", "modules.analyzer", "modules.asset_manager")
+
+# 子プロセスで実行するコード（結果はJSONで標準出力に書く）
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - start, "tkinter": "tkinter" in sys.modules}}))
+"""
+
+_WINDOW_PROBE = """
+import json, sys, time
+import tkinter
+try:
+    tkinter.Tk().destroy()
+except tkinter.TclError:
+    print(json.dumps({"seconds": None}))
+    sys.exit(0)
+start = time.perf_counter()
+import main
+app = main.create_app()
+app.update()
+seconds = time.perf_counter() - start
+app.destroy()
+print(json.dumps({"seconds": seconds}))
+"""
+
+
+def _run_probe(code, cwd):
+    """新しいプロセスでコードを実行し、出力されたJSONを返す"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = REPO_ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    output = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="起動時間のベンチマーク")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--import-budget", type=float, default=150.0,
+                        help="GUIを使わないモジュールの読み込み時間の予算（ミリ秒）")
+    parser.add_argument("--window-budget", type=float, default=1000.0,
+                        help="ウィンドウを表示するまでの時間の予算（ミリ秒）")
+    parser.add_argument("--files", type=int, default=5000,
+                        help="保存済みのStreamingAssetsパスに作成するカテゴリごとのファイル数")
+    args = parser.parse_args(argv)
+
+    failures = []
+    workdir = tempfile.mkdtemp(prefix="warudo_bench_")
+    try:
+        print(f"{'entry point':<28}{'best ms':>10}{'budget':>10}  tkinter")
+        for module in NON_UI_MODULES:
+            runs = [_run_probe(_IMPORT_PROBE.format(module=module), workdir) for _ in range(args.repeat)]
+            best = min(run["seconds"] for run in runs) * 1000
+            loads_tk = any(run["tkinter"] for run in runs)
+            print(f"{'import ' + module:<28}{best:>10.1f}{args.import_budget:>10.0f}  {'yes' if loads_tk else 'no'}")
+            if loads_tk:
+                failures.append(f"{module} がtkinterを読み込んでいます")
+            if best > args.import_budget:
+                failures.append(f"{module} の読み込みが予算を超えました ({best:.1f} ms)")
+
+        # 保存済みのStreamingAssetsパスがある状態でウィンドウを表示するまでの時間
+        assets_root = os.path.join(workdir, "StreamingAssets")
+        make_streaming_assets(assets_root, args.files, 20)
+        with open(os.path.join(workdir, "settings.json"), "w", encoding="utf-8") as file:
+            json.dump({"language": "en", "streaming_assets_path": assets_root}, file)
+        runs = [_run_probe(_WINDOW_PROBE, workdir) for _ in range(args.repeat)]
+        if runs[0]["seconds"] is None:
+            print(f"{'window shown':<28}{'skipped (no display)':>20}")
+        else:
+            best = min(run["seconds"] for run in runs) * 1000
+            print(f"{'window shown':<28}{best:>10.1f}{args.window_budget:>10.0f}")
+            if best > args.window_budget:
+                failures.append(f"ウィンドウの表示が予算を超えました ({best:.1f} ms)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
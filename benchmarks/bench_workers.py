@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+ワーカー起動時間ベンチマーク
+一括チェックのワーカープロセスにアセット管理を渡す方法として、インデックス全体をpickleで
+コピーする以前の方法と、フラットインデックスのファイルを共有する方法について、
+ライブラリの規模ごとに受け渡すデータの大きさとワーカーの起動時間を比較します。
+存在確認の結果が一致しない場合は終了コード1を返します。
+
+    python -m benchmarks.bench_workers --files 2000 10000 40000 --workers 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import pickle
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from modules.asset_manager import AssetManager
+from modules.flat_index import temporary_flat_index
+from benchmarks.synthetic import make_streaming_assets
+
+_worker_manager = None
+
+
+def _init_worker(asset_manager):
+    global _worker_manager
+    _worker_manager = asset_manager
+
+
+def _first_check(path):
+    """ワーカーでの最初の存在確認（フラットインデックスはここで開く）"""
+    return _worker_manager.check_file_exists(path, "Props")
+
+
+def _pool_startup(asset_manager, workers, path):
+    """spawnで起動したワーカーがすべて最初の存在確認を終えるまでの時間"""
+    start = time.perf_counter()
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(asset_manager,)) as pool:
+        list(pool.map(_first_check, [path] * workers, chunksize=1))
+    return time.perf_counter() - start
+
+
+def _run_scale(files, subfolders, workers, root):
+    """1つの規模について計測し、(結果の辞書, 存在確認の不一致の数) を返す"""
+    references = make_streaming_assets(root, files, subfolders)
+    manager = AssetManager()
+    manager.set_streaming_assets_path(root)
+    total = sum(manager.get_asset_summary().values())
+
+    # 存在しないパスも混ぜて、両方の方法の結果を比較する
+    rng = random.Random(0)
+    paths = [path for path in references if path.startswith("prop://")][:5000]
+    paths += [path.replace(".warudo", "_missing.warudo") for path in rng.sample(paths, len(paths) // 4)]
+
+    data = pickle.dumps(manager)
+
+    with temporary_flat_index(manager) as flat_index_path:
+        start = time.perf_counter()
+        with temporary_flat_index(manager):
+            pass
+        encode_seconds = time.perf_counter() - start
+
+        worker_manager = AssetManager()
+        worker_manager.streaming_assets_path = root
+        worker_manager.use_flat_index(flat_index_path)
+        flat_data = pickle.dumps(worker_manager)
+        start = time.perf_counter()
+        opened = pickle.loads(flat_data)
+        opened.check_file_exists(paths[0], "Props")
+        open_seconds = time.perf_counter() - start
+
+        mismatches = 0
+        for path in paths:
+            for category in manager.category_paths:
+                if manager.check_file_exists(path, category) != opened.check_file_exists(path, category):
+                    mismatches += 1
+        start = time.perf_counter()
+        for path in paths:
+            opened.check_file_exists(path, "Props")
+        flat_lookup = (time.perf_counter() - start) / len(paths)
+        start = time.perf_counter()
+        for path in paths:
+            manager.check_file_exists(path, "Props")
+        dict_lookup = (time.perf_counter() - start) / len(paths)
+
+        pickled_startup = _pool_startup(manager, workers, paths[0])
+        flat_startup = _pool_startup(worker_manager, workers, paths[0])
+        flat_size = os.path.getsize(flat_index_path)
+        opened._get_flat_index().close()
+
+    return {
+        "assets": total,
+        "pickle_bytes": len(data),
+        "flat_bytes": flat_size,
+        "encode_seconds": encode_seconds,
+        "open_seconds": open_seconds,
+        "dict_lookup_us": dict_lookup * 1e6,
+        "flat_lookup_us": flat_lookup * 1e6,
+        "pickled_startup": pickled_startup,
+        "flat_startup": flat_startup,
+    }, mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ワーカー起動時間のベンチマーク")
+    parser.add_argument("--files", type=int, nargs="+", default=[2000, 10000, 40000],
+                        help="カテゴリごとのファイル数（規模ごと）")
+    parser.add_argument("--subfolders", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    print(f"{'assets':>8}{'pickle MB':>11}{'flat MB':>9}{'encode s':>10}{'open ms':>9}"
+          f"{'dict us':>9}{'flat us':>9}{'pickled start s':>17}{'flat start s':>14}")
+    failures = 0
+    for files in args.files:
+        root = tempfile.mkdtemp(prefix="warudo_bench_")
+        try:
+            result, mismatches = _run_scale(files, args.subfolders, args.workers, root)
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+        failures += mismatches
+        print(f"{result['assets']:>8}{result['pickle_bytes'] / 1e6:>11.2f}{result['flat_bytes'] / 1e6:>9.2f}"
+              f"{result['encode_seconds']:>10.3f}{result['open_seconds'] * 1000:>9.2f}"
+              f"{result['dict_lookup_us']:>9.2f}{result['flat_lookup_us']:>9.2f}"
+              f"{result['pickled_startup']:>17.3f}{result['flat_startup']:>14.3f}")
+    if failures:
+        print(f"FAIL: 存在確認の結果が {failures} 件一致しません")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
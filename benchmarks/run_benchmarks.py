@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+ベンチマークスイート
+合成データで各フェーズ（スキャン・読み込み・抽出・検証・レポート）の時間を
+複数の規模で計測し、結果をJSONファイルに書き出します。
+
+    python -m benchmarks.run_benchmarks --scales small medium --output benchmark_results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+from modules.analyzer import SceneAnalyzer
+from modules.asset_manager import AssetManager
+from modules.scan_cache import ScanCache
+from modules.translations import get_text
+from benchmarks.synthetic import make_streaming_assets, make_scene
+
+# 規模ごとの設定
+SCALES = {
+    "small": {"files_per_category": 500, "subfolders": 5, "references": 2000, "unique": 200, "depth": 4},
+    "medium": {"files_per_category": 5000, "subfolders": 20, "references": 20000, "unique": 2000, "depth": 6},
+    "large": {"files_per_category": 25000, "subfolders": 50, "references": 100000, "unique": 10000, "depth": 8},
+}
+
+
+def _get_text(key, **kwargs):
+    """レポート生成用の翻訳テキスト"""
+    return get_text("en", key, **kwargs)
+
+
+def _measure(func, repeat):
+    """repeat回実行した最短時間と、最後の結果を返す"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_scale(name, config, repeat, workdir):
+    """1つの規模について全フェーズを計測し、結果のリストを返す"""
+    results = []
+
+    def record(phase, seconds, items):
+        results.append({
+            "scale": name,
+            "phase": phase,
+            "seconds": round(seconds, 6),
+            "items": items,
+            "us_per_item": round(seconds * 1e6 / items, 3) if items else None,
+        })
+        print(f"{name:<8}{phase:<14}{seconds:>10.4f}s {items:>9} items")
+
+    assets_root = os.path.join(workdir, "StreamingAssets")
+    asset_paths = make_streaming_assets(assets_root, config["files_per_category"], config["subfolders"])
+    scene = make_scene(config["references"], config["unique"], config["depth"], asset_paths=asset_paths)
+    scene_text = json.dumps(scene)
+
+    # スキャン（キャッシュなし）
+    def scan_cold():
+        manager = AssetManager()
+        manager.set_streaming_assets_path(assets_root)
+        return manager
+    seconds, asset_manager = _measure(scan_cold, repeat)
+    total_assets = sum(asset_manager.get_asset_summary().values())
+    record("scan_cold", seconds, total_assets)
+
+    # スキャン（キャッシュあり、変更なし）
+    cache_file = os.path.join(workdir, "scan_cache.json")
+    AssetManager(scan_cache=ScanCache(cache_file)).set_streaming_assets_path(assets_root)
+
+    def scan_warm():
+        manager = AssetManager(scan_cache=ScanCache(cache_file))
+        manager.set_streaming_assets_path(assets_root)
+        return manager
+    seconds, _ = _measure(scan_warm, repeat)
+    record("scan_warm", seconds, total_assets)
+
+    analyzer = SceneAnalyzer(asset_manager)
+
+    # JSON読み込み
+    seconds, scene_data = _measure(lambda: json.loads(scene_text), repeat)
+    record("json_load", seconds, len(scene_text))
+
+    # 参照の抽出
+    seconds, extracted_objects = _measure(lambda: analyzer.extract_objects(scene_data), repeat)
+    record("extract", seconds, config["references"])
+
+    # グループ化
+    seconds, object_counts = _measure(lambda: analyzer.group_extracted_objects(extracted_objects), repeat)
+    record("group", seconds, config["references"])
+
+    # 分類と存在確認（ユニークな参照パスごとに1回）
+    unique_refs = sum(len(counts) for counts in object_counts.values())
+    seconds, verifications = _measure(lambda: analyzer.verify_paths(object_counts), repeat)
+    record("verify", seconds, unique_refs)
+
+    # レポート（サブフォルダの問題・不足ファイル・未使用ファイル）
+    def report():
+        issues = analyzer.subfolder_issues(verifications, _get_text)
+        missing = analyzer.missing_file_issues(verifications, _get_text)
+        unused = asset_manager.find_unused_assets(analyzer.referenced_keys(verifications))
+        return issues, missing, unused
+    seconds, _ = _measure(report, repeat)
+    record("report", seconds, unique_refs + total_assets)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="合成データによるベンチマークスイート")
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["small", "medium"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="benchmark_results.json", help="結果を書き出すJSONファイル")
+    args = parser.parse_args(argv)
+
+    results = []
+    for name in args.scales:
+        workdir = tempfile.mkdtemp(prefix=f"warudo_bench_{name}_")
+        try:
+            results.extend(run_scale(name, SCALES[name], args.repeat, workdir))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeat": args.repeat,
+        "scales": {name: SCALES[name] for name in args.scales},
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"-> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+合成データ生成モジュール
+ベンチマーク用のStreamingAssetsフォルダとWarudo風のシーンデータを生成します。
+"""
+
+import os
+import random
+
+# カテゴリごとのフォルダ名（複数形, 単数形）
+CATEGORY_FOLDERS = {
+    "Environment": ("Environments", "Environment"),
+    "Props": ("Props", "Prop"),
+    "Characters": ("Characters", "Character"),
+    "Particles": ("Particles", "Particle"),
+}
+
+# シーン内の参照スキームとカテゴリフォルダ
+SCENE_SCHEMES = (
+    ("environment", "Environment"),
+    ("prop", "Props"),
+    ("character", "Characters"),
+    ("particle", "Particles"),
+)
+
+
+def make_streaming_assets(root, files_per_category=1000, subfolders=10, subfolder_depth=1,
+                          folder_names="mixed", seed=0):
+    """合成StreamingAssetsフォルダを作成し、作成したファイルを指すシーン内の参照パスを返す
+
+    Args:
+        root (str): 作成先のフォルダ
+        files_per_category (int): カテゴリごとのファイル数
+        subfolders (int): カテゴリごとのサブフォルダ数（ファイルは直下と各サブフォルダに分散）
+        subfolder_depth (int): サブフォルダのネストの深さ
+        folder_names (str): カテゴリフォルダ名 "plural" / "singular" / "mixed"（カテゴリごとにランダム）
+        seed (int): 乱数のシード
+    """
+    rng = random.Random(seed)
+    references = []
+    for scheme, category in SCENE_SCHEMES:
+        plural, singular = CATEGORY_FOLDERS[category]
+        if folder_names == "plural":
+            folder = plural
+        elif folder_names == "singular":
+            folder = singular
+        else:
+            folder = rng.choice((plural, singular))
+        category_dir = os.path.join(root, folder)
+
+        for i in range(files_per_category):
+            bucket = i % (subfolders + 1)
+            if bucket == 0:
+                rel_parts = []
+            else:
+                rel_parts = [f"Set{bucket:03d}"] + [f"Level{level}" for level in range(1, subfolder_depth)]
+            target = os.path.join(category_dir, *rel_parts)
+            os.makedirs(target, exist_ok=True)
+            file_name = f"{category}_{i:06d}.warudo"
+            with open(os.path.join(target, file_name), "w", encoding="utf-8"):
+                pass
+            references.append(f"{scheme}://data/{category}/" + "".join(f"{part}/" for part in rel_parts) + file_name)
+
+    # カテゴリ外のフォルダ（スキャン対象だが登録されない）
+    other_dir = os.path.join(root, "Other")
+    os.makedirs(other_dir, exist_ok=True)
+    for i in range(files_per_category // 10):
+        with open(os.path.join(other_dir, f"other_{i:06d}.bin"), "w", encoding="utf-8"):
+            pass
+    return references
+
+
+def make_scene(references=10000, unique=500, depth=4, seed=0, asset_paths=None, missing_ratio=0.1):
+    """Warudoのシーンに似た構造の合成データ（dict）を作成
+
+    Args:
+        references (int): 参照の総数
+        unique (int): ユニークな参照パスの数（残りは繰り返し）
+        depth (int): 参照を含むノードまでの追加のネストの深さ
+        seed (int): 乱数のシード
+        asset_paths (list): 参照に使う既存アセットのパス（make_streaming_assets の戻り値）
+        missing_ratio (float): asset_paths を指定した場合に、存在しないパスにする割合
+    """
+    rng = random.Random(seed)
+    paths = []
+    for i in range(unique):
+        if asset_paths and rng.random() >= missing_ratio:
+            paths.append(rng.choice(asset_paths))
+            continue
+        scheme, folder = SCENE_SCHEMES[i % len(SCENE_SCHEMES)]
+        subfolder = f"Set{i % 7:03d}/" if i % 5 == 0 else ""
+        paths.append(f"{scheme}://data/{folder}/{subfolder}Missing_{i:06d}.warudo")
+
+    assets = []
+    for i in range(references):
+        node = {"value": paths[rng.randrange(unique)]}
+        for level in range(depth):
+            node = {"key": f"Level{level}", "type": "Port", "data": [node, {"value": level}]}
+        assets.append({
+            "id": f"{i:08x}-0000-0000-0000-000000000000",
+            "name": f"Asset {i}",
+            "dataInputs": {
+                "Source": node,
+                "Enabled": {"value": True},
+                "Label": {"value": f"Label {i}"},
+                "Layer": {"value": "Default"},
+                "Parent": {"value": f"{rng.getrandbits(64):016x}"},
+                "Position": {"value": {"x": rng.random(), "y": rng.random(), "z": rng.random()}},
+            },
+        })
+    return {"name": "Synthetic Scene", "assets": assets, "graphs": [{"nodes": [], "value": "plain string"}]}
+
+
+def make_deep_scene(depth=10000, reference="prop://data/Props/Deep.warudo"):
+    """1本の長い入れ子チェーンの末端に参照を持つ合成データを作成"""
+    node = {"value": reference}
+    for _ in range(depth):
+        node = {"child": [node]}
+    return node
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""
+Warudo Scene Config Checker
+インデックスファイル作成（コマンドライン）エントリーポイント
+
+使い方:
+    python build_index.py [--assets StreamingAssetsのパス] [--output asset_index.idx]
+    python build_index.py --verify [--output asset_index.idx]
+
+作成したファイルは batch_check.py --index で、スキャンせずに使えます。
+"""
+
+import sys
+
+from modules.flat_index import main
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+"""
+Warudo Scene Config Checker
+アセットカタログ（コマンドライン）エントリーポイント
+
+使い方:
+    python catalog.py scan [--assets StreamingAssetsのパス]
+    python catalog.py scenes --category Props --subfolder StageSet
+    python catalog.py assets --name "chair*"
+    python catalog.py changes --since 7
+    python catalog.py unused
+    python catalog.py history
+
+シーンごとの参照は batch_check.py --catalog（またはGUIの「設定 > カタログに記録」）で記録します。
+"""
+
+import sys
+
+from modules.catalog import main
+
+
+if __name__ == "__main__":
+    sys.exit(main())
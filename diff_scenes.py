@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+"""
+Warudo Scene Config Checker
+シーン比較（コマンドライン）エントリーポイント
+
+使い方:
+    python diff_scenes.py <古いシーンファイル> <新しいシーンファイル>
+
+アセット参照に差分がある場合は終了コード1を返します。
+"""
+
+import sys
+
+from modules.scene_diff import main
+
+
+if __name__ == "__main__":
+    sys.exit(main())
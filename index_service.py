@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""
+Warudo Scene Config Checker
+インデックスサービス（コマンドライン）エントリーポイント
+
+使い方:
+    python index_service.py [--assets StreamingAssetsのパス] [--port N] [--interval 秒]
+    python index_service.py --status
+
+起動中は、同じStreamingAssetsフォルダを使うGUIと一括チェックがスキャンせずにこのサービスを使います。
+"""
+
+import sys
+
+from modules.index_service import main
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,23 +9,37 @@ Version 2.0.0 - Refactored for better maintainability
 
 from modules.config import ConfigManager
 from modules.asset_manager import AssetManager
+from modules.scan_cache import ScanCache
 from modules.analyzer import SceneAnalyzer
-from modules.ui import MainUI
+from modules.result_cache import SceneResultCache
 
 
-def main():
-    """メインアプリケーション関数"""
+def create_app():
+    """メインウィンドウを作成（StreamingAssetsのスキャンは表示後にバックグラウンドで行う）"""
+    # tkinterはUIを作成するときに初めて読み込む
+    from modules.ui import MainUI
+    
     # 設定管理の初期化
     config_manager = ConfigManager()
-      # アセット管理の初期化
-    asset_manager = AssetManager()
     
-    # 分析エンジンの初期化
-    analyzer = SceneAnalyzer(asset_manager)
+    # アセット管理の初期化（スキャン結果はキャッシュして次回起動時に再利用）
+    asset_manager = AssetManager(scan_cache=ScanCache())
+    
+    # 分析エンジンの初期化（変更のないシーンは前回の分析結果を再利用）
+    analyzer = SceneAnalyzer(asset_manager, result_cache=SceneResultCache())
     
-    # メインUIの初期化と実行
-    app = MainUI(config_manager, asset_manager, analyzer)
-    app.mainloop()
+    # メインUIの初期化
+    return MainUI(config_manager, asset_manager, analyzer)
+
+
+def main():
+    """メインアプリケーション関数"""
+    app = create_app()
+    try:
+        app.mainloop()
+    finally:
+        # 分析結果キャッシュの使用順の変更をまとめて保存
+        app.analyzer.result_cache.close()
 
 
 if __name__ == "__main__":
@@ -4,74 +4,365 @@
 シーンデータの分析を行います。
 """
 
+import json
 import os
-from collections import defaultdict
+from array import array
+from collections import defaultdict, namedtuple
+
+from .scene_stream import iter_value_strings
+
+
+class PathVerification(namedtuple("PathVerification",
+                                  ("category", "path", "name", "count", "key", "subfolder", "workshop", "exists"))):
+    """1つのユニークな参照パスの分類・検証結果（変更不可）
+    
+    category: アセットのカテゴリ（"Props" など）
+    path / name / count: 参照パス、オブジェクト名、シーン内での出現回数
+    key: 存在確認用インデックスのキー（AssetManager.make_reference_key）
+    subfolder: カテゴリフォルダ内のサブフォルダ名（サブフォルダの警告と色分け用、なければNone）
+    workshop: ワークショップのアイテムかどうか
+    exists: ファイルが存在するかどうか（存在確認をしない場合はNone）
+    """
+    
+    __slots__ = ()
+
+
+class ReferenceTable:
+    """1つの抽出結果のキー（カテゴリ）の参照を、ユニークなパスごとの整数IDでまとめた表
+    
+    パスには最初に現れた順に0からのIDを割り当て、出現回数はIDごとの配列で数えます。
+    オブジェクト名はユニークなパスごとに一度だけ求めます。出現ごとの辞書は作りません。
+    locationsを有効にすると、出現ごとに (ID, JSONのノード番号) を配列に記録します
+    （SceneAnalyzer.json_pointer() でJSON Pointerに変換できます）。
+    len() は出現回数の合計で、以前の出現ごとのリストの長さと同じです。
+    """
+    
+    __slots__ = ("paths", "names", "counts", "ids", "location_ids", "location_nodes")
+    
+    def __init__(self, locations=False):
+        self.paths = []           # ID → パス
+        self.names = []           # ID → オブジェクト名
+        self.counts = array("L")  # ID → 出現回数
+        self.ids = {}             # パス → ID
+        self.location_ids = array("L") if locations else None
+        self.location_nodes = array("Q") if locations else None
+    
+    def intern(self, path, name):
+        """新しいパスにIDを割り当てる（出現回数は0）"""
+        path_id = self.ids[path] = len(self.paths)
+        self.paths.append(path)
+        self.names.append(name)
+        self.counts.append(0)
+        return path_id
+    
+    def __len__(self):
+        return sum(self.counts)
+    
+    def path_counts(self):
+        """(パス, 出現回数) を最初に現れた順に返す"""
+        return zip(self.paths, self.counts)
+    
+    def grouped(self):
+        """group_objects_by_path() と同じ形式（パス・名前・出現回数の辞書のリスト）"""
+        return [{
+            'path': path,
+            'name': name,
+            'count': count
+        } for path, name, count in zip(self.paths, self.names, self.counts)]
+    
+    def locations(self, path):
+        """パスが出現したJSONのノード番号のリスト（locationsを記録していなければNone）"""
+        if self.location_ids is None:
+            return None
+        path_id = self.ids.get(path)
+        return [node for location_id, node in zip(self.location_ids, self.location_nodes)
+                if location_id == path_id]
 
 
 class SceneAnalyzer:
     """シーンデータ分析クラス"""
     
-    def __init__(self, asset_manager):
+    # このサイズ以上のシーンファイルはストリーム読み込みで処理する
+    STREAMING_THRESHOLD = 32 * 1024 * 1024
+    
+    # 抽出結果のキーとアセットのカテゴリ
+    EXTRACTED_CATEGORIES = (
+        ("environments", "Environment"),
+        ("props", "Props"),
+        ("characters", "Characters"),
+        ("particles", "Particles")
+    )
+    
+    # 抽出中に進捗通知（キャンセル確認）を行う間隔（ノード数）
+    CHECKPOINT_INTERVAL = 8192
+    
+    # 検証中に進捗通知を行う間隔（パス数）
+    VERIFY_INTERVAL = 256
+    
+    # サブフォルダの判定に使うパスの一部とカテゴリフォルダ名（サブフォルダの警告の表示順）
+    SUBFOLDER_CHECKS = (
+        ("Props", ("data/Props/", "data/Prop/"), "prop_category"),
+        ("Environment", ("data/Environment/", "data/Environments/"), "env_category"),
+        ("Characters", ("data/Characters/", "data/Character/"), "char_category"),
+        ("Particles", ("data/Particles/", "data/Particle/"), "particle_category")
+    )
+    
+    # カテゴリと表示名の翻訳キー
+    CATEGORY_NAME_KEYS = {
+        "Environment": "env_category",
+        "Props": "prop_category",
+        "Characters": "char_category",
+        "Particles": "particle_category"
+    }
+    
+    # 参照のスキーム（"://" より前の部分）と抽出結果のキー
+    REFERENCE_SCHEMES = {
+        "environment": "environments",
+        "prop": "props",
+        "character": "characters",
+        "particle": "particles"
+    }
+    
+    def __init__(self, asset_manager, result_cache=None):
         self.asset_manager = asset_manager
+        self.result_cache = result_cache
+    
+    def should_stream(self, file_path):
+        """シーンファイルをストリーム読み込みで処理すべきか判定"""
+        try:
+            return os.path.getsize(file_path) >= self.STREAMING_THRESHOLD
+        except OSError:
+            return False
     
-    def extract_objects(self, data):
-        """JSONデータを再帰的に処理して、関連するオブジェクトを抽出する"""
-        environments = []
-        props = []
-        characters = []
-        particles = []
-        other_objects = []
+    def extract_objects_from_file(self, file_path, streaming=None, progress=None):
+        """シーンファイルから関連するオブジェクトを抽出する
         
-        self._extract_objects_recursive(data, environments, props, characters, particles, other_objects)
+        streamingがNoneの場合はファイルサイズで判定し、小さなファイルは従来どおり
+        JSON全体を読み込んでから抽出します。大きなファイルはJSONツリーを作らずに
+        読み込みながら参照を抽出するため、メモリ使用量がシーンの大きさに依存しません。
+        JSONの構文エラーは json.JSONDecodeError または SceneStreamError（ValueError）になります。
+        """
+        if streaming is None:
+            streaming = self.should_stream(file_path)
         
+        with open(file_path, 'r', encoding='utf-8') as f:
+            if not streaming:
+                return self.extract_objects(json.load(f))
+            
+            tables = self._new_reference_tables()
+            prefixes = tuple(f"{scheme}://" for scheme in self.REFERENCE_SCHEMES)
+            for value in iter_value_strings(f, prefixes, progress=progress):
+                match = self._match_reference(value)
+                if match:
+                    self._add_reference(tables[match[0]], match[1])
+            return self._extracted(tables)
+    
+    def content_hash(self, file_path):
+        """シーンファイルの内容のハッシュ値を取得（キャッシュを使わない場合や読めない場合はNone）"""
+        if not self.result_cache:
+            return None
+        try:
+            return self.result_cache.content_hash(file_path)
+        except OSError:
+            return None
+    
+    def load_scene(self, file_path):
+        """シーンファイルを読み込む（変更のないシーンはキャッシュを使いJSONを解析しない）
+        
+        戻り値は (シーンデータ, キャッシュから復元した分析結果, 内容のハッシュ値) で、
+        シーンデータとキャッシュのどちらか一方だけがNone以外になります。
+        ハッシュ値は解析したバイト列そのものから求めるため、store_result() にそのまま渡せます。
+        """
+        if not self.result_cache:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return json.load(f), None, None
+        
+        content_hash = self.result_cache.known_hash(file_path)
+        if content_hash:
+            cached = self.load_cached_result(file_path, content_hash)
+            if cached:
+                return None, cached, content_hash
+        data, content_hash = self.result_cache.read(file_path)
+        cached = self.load_cached_result(file_path, content_hash)
+        if cached:
+            return None, cached, content_hash
+        return json.loads(data.decode('utf-8')), None, content_hash
+    
+    def load_cached_result(self, file_path, content_hash=None):
+        """キャッシュ済みの分析結果を取得（キャッシュがなければNone）
+        
+        戻り値は extracted_objects / object_counts / file_status / index_fingerprint / content_hash の
+        辞書で、JSONの解析と抽出を行わずに分析結果を復元できます。
+        content_hash を省略した場合は現在のファイルの内容のハッシュ値を使います。
+        """
+        if not self.result_cache:
+            return None
+        content_hash = content_hash or self.content_hash(file_path)
+        if not content_hash:
+            return None
+        entry = self.result_cache.get(content_hash)
+        if not entry:
+            return None
+        file_status = None
+        if entry.get("file_status") is not None:
+            file_status = {(category, path): exists for category, path, exists in entry["file_status"]}
         return {
-            "environments": environments,
-            "props": props,
-            "characters": characters,
-            "particles": particles,
-            "other_objects": other_objects
+            "extracted_objects": self.extracted_from_counts(entry["object_counts"]),
+            "object_counts": entry["object_counts"],
+            "file_status": file_status,
+            "index_fingerprint": entry.get("index_fingerprint"),
+            "content_hash": content_hash
         }
     
-    def _extract_objects_recursive(self, data, environments, props, characters, particles, other_objects):
-        """再帰的にオブジェクトを抽出する内部メソッド"""
-        if isinstance(data, dict):
-            # valueキーがあり、文字列で、特定のプレフィックスを含む場合
-            if "value" in data and isinstance(data["value"], str):
-                value = data["value"].strip('"')
-                
-                # 環境
-                if value.startswith("environment://"):
-                    environments.append({
-                        "name": self._get_name_from_path(value),
-                        "path": value
-                    })
-                # アイテム
-                elif value.startswith("prop://"):
-                    props.append({
-                        "name": self._get_name_from_path(value),
-                        "path": value
-                    })
-                # キャラクター
-                elif value.startswith("character://"):
-                    characters.append({
-                        "name": self._get_name_from_path(value),
-                        "path": value
-                    })
-                # パーティクル
-                elif value.startswith("particle://"):
-                    particles.append({
-                        "name": self._get_name_from_path(value),
-                        "path": value
-                    })
-            
-            # 再帰的に辞書のすべての値を処理
-            for key, value in data.items():
-                self._extract_objects_recursive(value, environments, props, characters, particles, other_objects)
+    def cached_file_status(self, cached):
+        """キャッシュの存在確認結果が現在のインデックスでも有効なら返す（無効ならNone）"""
+        if cached["file_status"] is None:
+            return None
+        if cached["index_fingerprint"] != self.asset_manager.get_index_fingerprint():
+            return None
+        return cached["file_status"]
+    
+    def store_result(self, content_hash, extracted_objects, object_counts, verifications=None):
+        """分析結果をキャッシュに保存（verificationsは存在確認をした場合のみ）
         
-        elif isinstance(data, list):
-            # リスト内のすべてのアイテムを処理
-            for item in data:
-                self._extract_objects_recursive(item, environments, props, characters, particles, other_objects)
+        content_hash は分析したシーンデータを読み込んだ時点の内容のハッシュ値です
+        （load_scene() / content_hash() の戻り値。Noneの場合は保存しません）。
+        """
+        if not self.result_cache or not content_hash:
+            return
+        entry = {
+            "object_counts": object_counts,
+            "file_status": None,
+            "index_fingerprint": None
+        }
+        if verifications is not None:
+            entry["file_status"] = [
+                [record.category, record.path, record.exists]
+                for records in verifications.values() for record in records
+            ]
+            entry["index_fingerprint"] = self.asset_manager.get_index_fingerprint()
+        self.result_cache.put(content_hash, entry)
+    
+    def retained_result(self, extracted_objects, object_counts, verifications=None, content_hash=None):
+        """分析結果を load_cached_result() と同じ形式にする（シーンデータを破棄した後の再分析用）"""
+        file_status = None
+        if verifications is not None:
+            file_status = {
+                (record.category, record.path): record.exists
+                for records in verifications.values() for record in records
+            }
+        return {
+            "extracted_objects": extracted_objects,
+            "object_counts": object_counts,
+            "file_status": file_status,
+            "index_fingerprint": self.asset_manager.get_index_fingerprint() if verifications is not None else None,
+            "content_hash": content_hash
+        }
+    
+    def _new_reference_tables(self, locations=False):
+        """抽出結果のキーごとの空の参照テーブルを作成"""
+        return {key: ReferenceTable(locations) for key in self.REFERENCE_SCHEMES.values()}
+    
+    def _add_reference(self, table, path, count=1):
+        """参照テーブルにパスの出現を追加（名前は新しいパスのときだけ求める）"""
+        path_id = table.ids.get(path)
+        if path_id is None:
+            path_id = table.intern(path, self._get_name_from_path(path))
+        table.counts[path_id] += count
+    
+    def _extracted(self, tables):
+        """参照テーブルから抽出結果（キー → ReferenceTable）を作成"""
+        result = dict(tables)
+        result["other_objects"] = []
+        return result
+    
+    def extracted_from_counts(self, object_counts):
+        """group_extracted_objects() の結果から抽出結果を復元（キャッシュ用）"""
+        tables = self._new_reference_tables()
+        for key, category in self.EXTRACTED_CATEGORIES:
+            table = tables[key]
+            for obj in object_counts.get(category, ()):
+                table.intern(obj['path'], obj['name'])
+                table.counts[-1] = obj['count']
+        return self._extracted(tables)
+    
+    def _match_reference(self, value):
+        """valueの文字列が参照であれば (抽出結果のキー, パス) を返す"""
+        # "://" を含まない文字列はスキームの判定をせずに除外
+        if "://" not in value:
+            return None
+        value = value.strip('"')
+        key = self.REFERENCE_SCHEMES.get(value.partition("://")[0])
+        return (key, value) if key else None
+    
+    def extract_objects(self, data, checkpoint=None, locations=False):
+        """JSONデータを走査して、関連するオブジェクトを抽出する
+        
+        再帰呼び出しの代わりに明示的なスタックで走査するため、
+        深くネストしたシーンでもRecursionErrorになりません。
+        checkpointを指定すると、CHECKPOINT_INTERVAL個のノードを処理するたびに
+        処理済みノード数を渡して呼び出します（例外を送出すれば中断できます）。
+        戻り値は抽出結果のキー → ReferenceTable（ユニークなパスごとのIDと出現回数）です。
+        locationsを有効にすると、出現ごとのJSONのノード番号も記録します。
+        抽出後は data を参照しないため、呼び出し元はシーンデータを破棄できます。
+        """
+        tables = self._new_reference_tables(locations)
+        get_key = self.REFERENCE_SCHEMES.get
+        get_name = self._get_name_from_path
+        
+        # スタックには辞書とリストだけを積む。子要素は逆順に積み、
+        # 再帰版と同じ順序（行きがけ順）で処理する
+        stack = [data] if type(data) in (dict, list) else []
+        pop = stack.pop
+        push = stack.append
+        processed = 0
+        count_nodes = checkpoint is not None or locations
+        while stack:
+            node = pop()
+            if count_nodes:
+                processed += 1
+                if checkpoint is not None and not processed % self.CHECKPOINT_INTERVAL:
+                    checkpoint(processed)
+            if type(node) is dict:
+                # valueキーが "://" を含む文字列の場合のみスキームを判定
+                value = node.get("value")
+                if type(value) is str and "://" in value:
+                    value = value.strip('"')
+                    key = get_key(value.partition("://")[0])
+                    if key:
+                        # パスをIDに変換して出現回数を数える（名前は新しいパスのときだけ求める）
+                        table = tables[key]
+                        path_id = table.ids.get(value)
+                        if path_id is None:
+                            path_id = table.intern(value, get_name(value))
+                        table.counts[path_id] += 1
+                        if locations:
+                            table.location_ids.append(path_id)
+                            table.location_nodes.append(processed)
+                node = node.values()
+            for child in reversed(node):
+                child_type = type(child)
+                if child_type is dict or child_type is list:
+                    push(child)
+        
+        return self._extracted(tables)
+    
+    @staticmethod
+    def json_pointer(data, node_number):
+        """extract_objects() と同じ順序で走査し、ノード番号の参照の "value" のJSON Pointerを返す"""
+        stack = [(data, "")] if type(data) in (dict, list) else []
+        processed = 0
+        while stack:
+            node, pointer = stack.pop()
+            processed += 1
+            if processed == node_number:
+                return f"{pointer}/value"
+            items = node.items() if type(node) is dict else enumerate(node)
+            for key, child in reversed(list(items)):
+                if type(child) in (dict, list):
+                    escaped = str(key).replace("~", "~0").replace("/", "~1")
+                    stack.append((child, f"{pointer}/{escaped}"))
+        return None
     
     def _get_name_from_path(self, path):
         """パスからオブジェクト名を抽出する"""
@@ -88,7 +379,12 @@ class SceneAnalyzer:
         return name
     
     def group_objects_by_path(self, objects):
-        """同じパスを持つオブジェクトをグループ化して、出現回数をカウントする"""
+        """同じパスを持つオブジェクトをグループ化して、出現回数をカウントする
+        
+        ReferenceTableはすでにパスごとにまとまっているため、そのまま変換します。
+        """
+        if isinstance(objects, ReferenceTable):
+            return objects.grouped()
         path_count = defaultdict(int)
         path_name = {}
         
@@ -104,86 +400,154 @@ class SceneAnalyzer:
             'count': count
         } for path, count in path_count.items()]
     
-    def check_subfolder_issues(self, extracted_objects, get_text_func):
-        """サブフォルダに関する問題点をチェックする"""
-        issues = []
+    def group_extracted_objects(self, extracted_objects):
+        """抽出結果をカテゴリごとにグループ化（カテゴリ → group_objects_by_path の結果）"""
+        return {
+            category: self.group_objects_by_path(extracted_objects[key])
+            for key, category in self.EXTRACTED_CATEGORIES
+        }
+    
+    def verify_paths(self, object_counts, verify=True, known_status=None, progress=None):
+        """ユニークな参照パスごとに一度だけ分類・存在確認を行い、PathVerification を返す
         
-        # フォルダカテゴリごとのチェック設定
-        folders_to_check = [
-            {
-                "list": extracted_objects["props"], 
-                "path_parts": ["data/Props/", "data/Prop/"], 
-                "folder_idx": 2, 
-                "folder_name": "Props", 
-                "type_name": get_text_func("prop_category")
-            },
-            {
-                "list": extracted_objects["environments"], 
-                "path_parts": ["data/Environment/", "data/Environments/"], 
-                "folder_idx": 2, 
-                "folder_name": "Environment", 
-                "type_name": get_text_func("env_category")
-            },
-            {
-                "list": extracted_objects["characters"], 
-                "path_parts": ["data/Characters/", "data/Character/"], 
-                "folder_idx": 2, 
-                "folder_name": "Characters", 
-                "type_name": get_text_func("char_category")
-            },
-            {
-                "list": extracted_objects["particles"], 
-                "path_parts": ["data/Particles/", "data/Particle/"], 
-                "folder_idx": 2, 
-                "folder_name": "Particles", 
-                "type_name": get_text_func("particle_category")
-            }
-        ]
+        object_countsは group_extracted_objects() の結果で、戻り値はカテゴリ →
+        PathVerificationのリスト（object_countsと同じ順序）です。ツリー・サマリー・
+        レポートはすべてこの結果を使います。known_statusに (カテゴリ, パス) → 存在するか
+        の辞書を渡すと、含まれるパスは存在確認を省略してその値を使います。
+        progressを指定すると、VERIFY_INTERVAL個ごとに確認済みの割合を渡して呼び出します。
+        存在確認はVERIFY_INTERVAL個ずつまとめて行います（インデックスサービスには1回の問い合わせ）。
+        """
+        subfolder_parts = {category: path_parts for category, path_parts, _ in self.SUBFOLDER_CHECKS}
+        make_key = self.asset_manager.make_reference_key
+        check_exists = self.asset_manager.check_files_exist
+        known_status = known_status or {}
+        total = max(sum(len(counts) for counts in object_counts.values()), 1)
+        checked = 0
+        
+        verifications = {}
+        for category, counts in object_counts.items():
+            path_parts = subfolder_parts.get(category, ())
+            records = []
+            for start in range(0, len(counts), self.VERIFY_INTERVAL):
+                chunk = counts[start:start + self.VERIFY_INTERVAL]
+                statuses = [None] * len(chunk)
+                if verify:
+                    statuses = [known_status.get((category, obj['path'])) for obj in chunk]
+                    unknown = [index for index, exists in enumerate(statuses) if exists is None]
+                    if unknown:
+                        found = check_exists(category, [chunk[index]['path'] for index in unknown])
+                        for index, exists in zip(unknown, found):
+                            statuses[index] = exists
+                for obj, exists in zip(chunk, statuses):
+                    path = obj['path']
+                    records.append(PathVerification(
+                        category, path, obj['name'], obj['count'],
+                        make_key(path, category),
+                        self._get_subfolder(path, category, path_parts),
+                        bool(path) and "workshop/" in path,
+                        exists
+                    ))
+                checked += len(chunk)
+                if progress:
+                    progress(checked / total)
+            verifications[category] = records
+        return verifications
+    
+    @staticmethod
+    def _get_subfolder(path, category, path_parts):
+        """カテゴリフォルダの直下ではなくサブフォルダ内を指すパスならサブフォルダ名を返す"""
+        for path_part in path_parts:
+            if path_part in path:
+                parts = path.split('/')
+                # フォルダ名のバリエーションをチェック（単数形/複数形）
+                if (len(parts) > 3 and
+                    parts[2].lower() in (category.lower(), category.rstrip('s').lower())):
+                    return parts[3]
+                return None
+        return None
+    
+    def subfolder_issues(self, verifications, get_text_func):
+        """サブフォルダに関する問題点を表示用のテキストにする"""
+        issues = []
         
         # 同じ問題を重複して報告しないためのセット
         reported_issues = set()
         
-        for check in folders_to_check:
-            for obj in check["list"]:
-                path = obj.get('path', '')
-                
-                # 複数のパスパターンをチェック
-                for path_part in check["path_parts"]:
-                    if path_part in path:
-                        parts = path.split('/')
-                        folder_idx = check["folder_idx"]
-                        
-                        # フォルダ名のバリエーションをチェック
-                        if (len(parts) > folder_idx and
-                            (parts[folder_idx].lower() == check["folder_name"].lower() or
-                             parts[folder_idx].lower() == check["folder_name"].rstrip('s').lower()) and
-                            len(parts) > folder_idx + 1):
-                            
-                            issue_text = get_text_func("subfolder_move", 
-                                                     type=check["type_name"], 
-                                                     name=obj.get('name'), 
-                                                     folder=parts[folder_idx+1], 
-                                                     category=check["folder_name"])
-                            
-                            # 重複チェック
-                            if issue_text not in reported_issues:
-                                issues.append(issue_text)
-                                reported_issues.add(issue_text)
-                        break
+        for category, _, type_key in self.SUBFOLDER_CHECKS:
+            type_name = get_text_func(type_key)
+            for record in verifications.get(category, ()):
+                if record.subfolder is None:
+                    continue
+                issue_text = get_text_func("subfolder_move",
+                                           type=type_name,
+                                           name=record.name,
+                                           folder=record.subfolder,
+                                           category=category)
+                if issue_text not in reported_issues:
+                    issues.append(issue_text)
+                    reported_issues.add(issue_text)
         
         return issues
     
+    def missing_file_issues(self, verifications, get_text_func):
+        """存在しないファイルの問題を表示用のテキストにする"""
+        issues = []
+        for category, records in verifications.items():
+            type_name = get_text_func(self.CATEGORY_NAME_KEYS.get(category, category))
+            for record in records:
+                if record.exists is False:
+                    issues.append(get_text_func("file_missing",
+                                                type=type_name,
+                                                name=record.name,
+                                                path=record.path,
+                                                debug=""))
+        return issues
+    
+    def referenced_keys(self, verifications):
+        """検証結果からカテゴリごとの参照キーの集合を作成（未使用ファイルのチェック用）"""
+        return {
+            category: {record.key for record in records if record.path}
+            for category, records in verifications.items()
+        }
+    
+    def check_subfolder_issues(self, extracted_objects, get_text_func):
+        """サブフォルダに関する問題点をチェックする"""
+        verifications = self.verify_paths(self.group_extracted_objects(extracted_objects), verify=False)
+        return self.subfolder_issues(verifications, get_text_func)
+    
     def check_missing_files(self, extracted_objects, get_text_func):
         """存在しないファイルの問題をチェック"""
-        issues = []
+        verifications = self.verify_paths(self.group_extracted_objects(extracted_objects))
+        return self.missing_file_issues(verifications, get_text_func)
+    
+    def collect_reference_paths(self, extracted_objects, reference_paths=None):
+        """抽出結果からカテゴリごとのユニークな参照パスを集める
         
-        # カテゴリとリストのマッピング
-        category_lists = {
-            "Environment": extracted_objects["environments"],
-            "Props": extracted_objects["props"],
-            "Characters": extracted_objects["characters"],
-            "Particles": extracted_objects["particles"]
-        }
+        reference_pathsを渡すとそこに追加するため、複数のシーンの参照をまとめられます。
+        """
+        if reference_paths is None:
+            reference_paths = {category: set() for _, category in self.EXTRACTED_CATEGORIES}
+        for key, category in self.EXTRACTED_CATEGORIES:
+            reference_paths.setdefault(category, set()).update(extracted_objects[key].paths)
+        return reference_paths
+    
+    def find_unused_files(self, reference_paths):
+        """どのシーンからも参照されていないStreamingAssets内のファイルを探す
+        
+        ユニークな参照パスをそれぞれ一度だけアセットのインデックスと同じキーに正規化し、
+        カテゴリごとにインデックスのキーとの差集合を取ります（アセット数＋参照数に比例）。
+        戻り値はカテゴリ → アセット情報のリストです。
+        """
+        referenced_keys = {}
+        for category, paths in reference_paths.items():
+            referenced_keys[category] = {
+                self.asset_manager.make_reference_key(path, category) for path in paths if path
+            }
+        return self.asset_manager.find_unused_assets(referenced_keys)
+    
+    def check_unused_files(self, unused_files, get_text_func):
+        """未使用ファイルの一覧を表示用のテキストにする"""
+        issues = []
         
         # カテゴリ名とその表示名
         category_names = {
@@ -193,25 +557,10 @@ class SceneAnalyzer:
             "Particles": get_text_func("particle_category")
         }
         
-        # 各カテゴリのファイルをチェック
-        for category, obj_list in category_lists.items():
-            # 同じ問題を重複して報告しないためのセット
-            reported_paths = set()
-            
-            for obj in obj_list:
-                path = obj.get('path', '')
-                name = obj.get('name', 'Unknown')
-                
-                # このパスがすでに報告済みかチェック
-                if path in reported_paths:
-                    continue
-                      # ファイルが存在するかチェック
-                if not self.asset_manager.check_file_exists(path, category):
-                    issues.append(get_text_func("file_missing", 
-                                              type=category_names.get(category, category), 
-                                              name=name, 
-                                              path=path, 
-                                              debug=""))
-                    reported_paths.add(path)
-        
+        for category, assets in unused_files.items():
+            for asset in assets:
+                issues.append(get_text_func("file_unused_item",
+                                            type=category_names.get(category, category),
+                                            name=asset["name"],
+                                            path=asset["rel_path"]))
         return issues
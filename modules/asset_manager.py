@@ -4,16 +4,129 @@
 StreamingAssetsフォルダのスキャンと管理を行います。
 """
 
+import hashlib
 import os
+import sys
+import unicodedata
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+def canonical_key(text):
+    """パスや名前を比較用の正規形にする
+    
+    区切り文字を "/" に統一し、Unicode正規化(NFC)と大文字小文字の統一(casefold)を行います。
+    Macからコピーした濁点・半濁点が分解された(NFD)ファイル名も、シーン内のNFCの名前と一致します。
+    全角英数字は全角のまま（大文字小文字のみ統一）で、半角とは区別します。
+    比較のたびではなく、インデックス作成時と参照パスごとに一度だけ呼び出し、比較は == で行います。
+    """
+    text = text.replace("\\", "/")
+    if text.isascii():
+        return text.lower()
+    return unicodedata.normalize("NFC", unicodedata.normalize("NFC", text).casefold())
+
+
+class AssetDirectory:
+    """アセットを含むフォルダの情報（同じフォルダのアセットで共有）"""
+    
+    __slots__ = ("category", "full_dir", "rel_dir", "category_dir", "subfolder", "subfolder_key", "path_prefixes")
+    
+    def __init__(self, category, full_dir, rel_dir, category_dir, subfolder, path_prefixes):
+        self.category = category
+        self.full_dir = full_dir
+        self.rel_dir = rel_dir
+        self.category_dir = category_dir
+        self.subfolder = subfolder          # サブフォルダ内でなければNone
+        self.subfolder_key = canonical_key(subfolder) if subfolder is not None else None
+        self.path_prefixes = path_prefixes  # "prop://data/Props/" などのフォルダ名候補ごとの接頭辞
+
+
+class AssetRecord:
+    """スキャンしたアセット1件（フォルダ情報とファイル名だけを保持）
+    
+    パスなどの情報は必要になったときにフォルダ情報から組み立てます。
+    asset["name"] のように従来の辞書と同じキーでも参照できます。
+    """
+    
+    __slots__ = ("directory", "file")
+    
+    # 辞書と同じキーで参照できる項目
+    FIELDS = ("name", "full_path", "rel_path", "category_path", "asset_path",
+              "asset_path_variants", "is_subfolder", "subfolder_name")
+    
+    def __init__(self, directory, file):
+        self.directory = directory
+        self.file = file
+    
+    @property
+    def name(self):
+        return os.path.splitext(self.file)[0]
+    
+    @property
+    def full_path(self):
+        return os.path.join(self.directory.full_dir, self.file).replace("\\", "/")
+    
+    @property
+    def rel_path(self):
+        rel_dir = self.directory.rel_dir
+        return f"{rel_dir}/{self.file}" if rel_dir else self.file
+    
+    @property
+    def category_path(self):
+        category_dir = self.directory.category_dir
+        return f"{category_dir}/{self.file}" if category_dir else self.file
+    
+    @property
+    def asset_path(self):
+        return self.directory.path_prefixes[0] + self.category_path
+    
+    @property
+    def asset_path_variants(self):
+        category_path = self.category_path
+        return [prefix + category_path for prefix in self.directory.path_prefixes]
+    
+    @property
+    def is_subfolder(self):
+        return self.directory.subfolder is not None
+    
+    @property
+    def subfolder_name(self):
+        return self.directory.subfolder or ""
+    
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def get(self, key, default=None):
+        """辞書のget()と同じ"""
+        return getattr(self, key) if key in self.FIELDS else default
+    
+    def keys(self):
+        return self.FIELDS
+    
+    def to_dict(self):
+        """従来の形式の辞書に変換"""
+        return {key: getattr(self, key) for key in self.FIELDS}
+    
+    def __repr__(self):
+        return f"AssetRecord({self.rel_path!r})"
 
 
 class AssetManager:
     """アセット管理クラス"""
     
-    def __init__(self):
-        pass
+    def __init__(self, scan_cache=None):
         self.streaming_assets_path = None
+        
+        # ディレクトリ単位のスキャン結果（差分スキャン用）
+        self.scan_cache = scan_cache
+        self._dir_listings = {}
+        self._listings_root = None
+        self._dir_states = {}
+        self.last_scan_stats = {"directories": 0, "relisted": 0}
+        self.scan_workers = min(32, (os.cpu_count() or 1) + 4)
+        
         self.asset_files = {
             "Environment": [],
             "Props": [],
@@ -21,6 +134,21 @@ class AssetManager:
             "Particles": []
         }
         
+        # 存在確認用のインデックス（カテゴリ → (サブフォルダ, ファイル名) キー → アセット一覧）
+        self.asset_index = {category: {} for category in self.asset_files}
+        self.watcher = None
+        
+        # 起動中のインデックスサービスを使う場合のクライアント（存在確認などをサービスに問い合わせる）
+        self.index_service = None
+        
+        # 存在確認に使うフラットインデックスのファイル（ワーカープロセス用、初めて使うときに開く）
+        self.flat_index_path = None
+        self._flat_index = None
+        
+        # インデックスを作り直す・変更するたびに増える世代番号と、その世代の指紋
+        self.index_generation = 0
+        self._fingerprint = None
+        
         # プロトコル接頭辞リスト
         self.protocols = {
             "Environment": "environment://",
@@ -45,29 +173,106 @@ class AssetManager:
             "data/Characters/": ["Characters", "Character"],
             "data/Particles/": ["Particles", "Particle"]
         }
+        
+        # カテゴリ → アセットパスの接頭辞（フォルダ名候補ごと、単数形/複数形両方に対応）
+        self._path_prefixes = {
+            category: tuple(f"{self.protocols[category]}data/{folder}/" for folder in folders)
+            for category, folders in self.category_paths.items()
+        }
+        
+        # フォルダ名（正規形）→ (カテゴリ優先順位, フォルダ名候補の順位)
+        self._folder_lookup = {}
+        for priority, folders in enumerate(self.category_paths.values()):
+            for variant, folder in enumerate(folders):
+                self._folder_lookup[canonical_key(folder)] = (priority, variant)
+        
+        # 参照パスから取り除くプロトコル接頭辞（正規形）
+        self._protocol_keys = tuple(canonical_key(protocol) for protocol in self.protocols.values())
     
-    def set_streaming_assets_path(self, path):
-        """StreamingAssetsのパスを設定"""
+    def __getstate__(self):
+        """プロセス間で受け渡す状態（存在確認に不要なスキャン途中の情報は除く）"""
+        state = self.__dict__.copy()
+        state["scan_cache"] = None
+        state["_dir_listings"] = {}
+        state["_listings_root"] = None
+        state["_dir_states"] = {}
+        state["watcher"] = None
+        state["_flat_index"] = None
+        return state
+    
+    def set_streaming_assets_path(self, path, use_service=False, index_file=None):
+        """StreamingAssetsのパスを設定
+        
+        use_serviceの場合、同じフォルダのインデックスサービスが起動していれば
+        スキャンせずにサービスのインデックスを使います。index_fileを指定すると、
+        同じフォルダのインデックスファイル（build_index.py で作成）があればスキャンせずに使います。
+        """
+        # 前のフォルダの監視は止める（変更の相対パスを新しいフォルダのインデックスに反映しないように）
+        self.stop_watching()
         self.streaming_assets_path = path
-        if path:
+        self.index_service = None
+        self.use_flat_index(None)
+        if path and use_service:
+            # HTTPクライアントの読み込みはサービスを探す場合だけにする
+            from .index_service import find_index_service
+            self.index_service = find_index_service(path)
+        if path and index_file and not self.index_service:
+            from .flat_index import load_index_file
+            flat_index = load_index_file(path, index_file)
+            if flat_index:
+                self.flat_index_path = index_file
+                self._flat_index = flat_index
+        if path and not self.index_service and not self.flat_index_path:
             self.scan_streaming_assets()
     
-    def scan_streaming_assets(self):
+    def _call_service(self, method, *args):
+        """インデックスサービスに問い合わせる（応答がなければ切り離してローカルでスキャンし、Noneを返す）"""
+        try:
+            return getattr(self.index_service, method)(*args)
+        except OSError as e:
+            print(f"インデックスサービスとの通信エラー: {e}")
+            self.index_service = None
+            self.scan_streaming_assets()
+            return None
+    
+    def scan_streaming_assets(self, workers=None):
         """StreamingAssetsフォルダをスキャンしてファイル一覧を作成"""
         if not self.streaming_assets_path or not os.path.exists(self.streaming_assets_path):
             return
+        
+        # 前回のディレクトリ一覧（メモリ上になければキャッシュファイルから）
+        root = self.streaming_assets_path
+        if self._listings_root == root:
+            previous = self._dir_listings
+        elif self.scan_cache:
+            previous = self.scan_cache.get_listings(root)
+        else:
+            previous = {}
+        
+        # 更新時刻が変わったディレクトリだけを読み直す
+        listings, states = self._walk_listings(previous, workers or self.scan_workers)
+        self._dir_listings = listings
+        self._dir_states = states
+        self._listings_root = root
+        if self.scan_cache:
+            self.scan_cache.set_listings(root, listings)
+            self.scan_cache.save()
+        
+        self._build_asset_files(listings, states)
+    
+    def scan_streaming_assets_reference(self):
+        """os.walkによる逐次スキャン（比較・検証用の参照実装、キャッシュは使用しない）"""
+        if not self.streaming_assets_path or not os.path.exists(self.streaming_assets_path):
+            return
             
         # カテゴリ別のフォルダと拡張子のマッピング（複数形/単数形の両方に対応）
-        category_folders = {
-            "Environment": ["Environment", "Environments"],
-            "Props": ["Props", "Prop"],
-            "Characters": ["Characters", "Character"],
-            "Particles": ["Particles", "Particle"]
-        }
+        category_folders = self.category_paths
         
-        # 各カテゴリのファイルリストをクリア
+        # 各カテゴリのファイルリストとインデックスをクリア
         for category in self.asset_files:
             self.asset_files[category] = []
+            self.asset_index[category] = {}
+        self.index_generation += 1
             
         # StreamingAssetsフォルダを再帰的に探索
         for root, dirs, files in os.walk(self.streaming_assets_path):
@@ -78,13 +283,15 @@ class AssetManager:
             is_subfolder = False
             subfolder_name = ""
             
-            # パス階層を分析
+            # パス階層を分析（比較は正規形どうしで行う）
             path_parts = rel_path.split("/")
+            part_keys = [canonical_key(part) for part in path_parts]
             
             for category, folders in category_folders.items():
                 for folder in folders:
-                    for i, part in enumerate(path_parts):
-                        if part.lower() == folder.lower():
+                    folder_key = canonical_key(folder)
+                    for i, part_key in enumerate(part_keys):
+                        if part_key == folder_key:
                             current_category = category
                             
                             # サブフォルダかどうかの判定
@@ -99,6 +306,7 @@ class AssetManager:
             
             if current_category:
                 # このフォルダ内の.warudoファイルを追加
+                directory = None
                 for file in files:
                     if file.endswith(".warudo"):
                         full_path = os.path.join(root, file).replace("\\", "/")
@@ -110,44 +318,365 @@ class AssetManager:
                         # カテゴリフォルダから下のパス部分を取得
                         category_rel_path = self._get_path_after_category(file_rel_path, cat_folder_actual)
                         
-                        # 適切なプレフィックスを決定
-                        prefix = self.protocols.get(current_category, "")
-                        
-                        # 複数のパスバリエーションを生成（単数形/複数形両方に対応）
-                        path_variants = []
-                        for folder_variant in self.category_paths[current_category]:
-                            # 完全なパス
-                            full_prefix_path = f"{prefix}data/{folder_variant}/{category_rel_path}"
-                            path_variants.append(full_prefix_path)
-                        
-                        # サブフォルダ情報を追加
-                        self.asset_files[current_category].append({
-                            "name": os.path.splitext(file)[0],
-                            "full_path": full_path,
-                            "rel_path": file_rel_path,
-                            "category_path": category_rel_path,
-                            "asset_path": path_variants[0],                            "asset_path_variants": path_variants,
-                            "is_subfolder": is_subfolder,
-                            "subfolder_name": subfolder_name if is_subfolder else ""
-                        })
+                        # フォルダ情報は同じフォルダのファイルで共有する
+                        if directory is None:
+                            directory = AssetDirectory(
+                                current_category,
+                                full_path.rpartition("/")[0],
+                                file_rel_path.rpartition("/")[0],
+                                category_rel_path.rpartition("/")[0],
+                                sys.intern(subfolder_name) if is_subfolder else None,
+                                self._path_prefixes[current_category]
+                            )
+                        self._add_asset(directory, file)
+    
+    def _walk_listings(self, previous, workers):
+        """ディレクトリ一覧を更新（mtimeが一致するディレクトリは前回の結果を再利用）
+        
+        各ディレクトリの処理はスレッドプールで並列に行い、カテゴリ判定の結果は
+        親から子へ引き継ぎます。戻り値は（相対パス → [mtime_ns, サブディレクトリ, ファイル]、
+        相対パス → (パス階層, カテゴリ判定状態)）です。
+        """
+        visited = {}
+        root_task = ("", (), None, None)
+        
+        if workers <= 1:
+            stack = [root_task]
+            while stack:
+                rel_dir, result, children = self._visit_directory(previous, *stack.pop())
+                if result:
+                    visited[rel_dir] = result
+                stack.extend(children)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                pending = {pool.submit(self._visit_directory, previous, *root_task)}
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        rel_dir, result, children = future.result()
+                        if result:
+                            visited[rel_dir] = result
+                        for child in children:
+                            pending.add(pool.submit(self._visit_directory, previous, *child))
+        
+        # os.walkと同じ順序（深さ優先・行きがけ順）に並べ直す
+        listings = {}
+        states = {}
+        relisted = 0
+        stack = [""]
+        while stack:
+            rel_dir = stack.pop()
+            if rel_dir not in visited:
+                continue
+            listing, parts, state, was_relisted = visited[rel_dir]
+            listings[rel_dir] = listing
+            states[rel_dir] = (parts, state)
+            relisted += was_relisted
+            for subdir in reversed(listing[1]):
+                stack.append(f"{rel_dir}/{subdir}" if rel_dir else subdir)
+        
+        self.last_scan_stats = {"directories": len(listings), "relisted": relisted}
+        return listings, states
+    
+    def _visit_directory(self, previous, rel_dir, parts, state, mtime_ns):
+        """1つのディレクトリを処理し、子ディレクトリのタスクを返す"""
+        full_dir = os.path.join(self.streaming_assets_path, rel_dir) if rel_dir else self.streaming_assets_path
+        if mtime_ns is None:
+            try:
+                mtime_ns = os.stat(full_dir).st_mtime_ns
+            except OSError:
+                return rel_dir, None, []
+        
+        cached = previous.get(rel_dir)
+        if cached and cached[0] == mtime_ns:
+            # 変更なし: 子ディレクトリのmtimeは各タスクで確認する
+            subdirs, files = cached[1], cached[2]
+            subdir_mtimes = [None] * len(subdirs)
+            was_relisted = 0
+        else:
+            subdirs, subdir_mtimes, files = self._list_directory(full_dir)
+            was_relisted = 1
+        
+        depth = len(parts)
+        children = []
+        for subdir, subdir_mtime in zip(subdirs, subdir_mtimes):
+            children.append((
+                f"{rel_dir}/{subdir}" if rel_dir else subdir,
+                parts + (subdir,),
+                self._classify_child(state, subdir, depth),
+                subdir_mtime
+            ))
+        return rel_dir, ([mtime_ns, subdirs, files], parts, state, was_relisted), children
+    
+    @staticmethod
+    def _list_directory(full_dir):
+        """ディレクトリ内のサブディレクトリ（とそのmtime）と.warudoファイルを列挙"""
+        subdirs = []
+        subdir_mtimes = []
+        files = []
+        try:
+            with os.scandir(full_dir) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        # os.walkと同様にシンボリックリンクのフォルダには入らない
+                        if entry.is_symlink():
+                            continue
+                        try:
+                            # Windowsではディレクトリ列挙時の情報から取得できる
+                            subdir_mtimes.append(entry.stat(follow_symlinks=False).st_mtime_ns)
+                        except OSError:
+                            subdir_mtimes.append(None)
+                        subdirs.append(entry.name)
+                    elif entry.name.endswith(".warudo"):
+                        files.append(entry.name)
+        except OSError:
+            pass
+        return subdirs, subdir_mtimes, files
+    
+    def _classify_child(self, state, name, depth):
+        """親ディレクトリのカテゴリ判定状態から子ディレクトリの状態を求める
+        
+        状態は (カテゴリ優先順位, フォルダ名候補の順位, カテゴリフォルダの位置,
+        最初にカテゴリ名と一致したフォルダの位置, サブフォルダ名) のタプルで、
+        パス全体を先頭から判定する参照実装と同じ結果になります。
+        """
+        match = self._folder_lookup.get(canonical_key(name))
+        if state is None:
+            return match + (depth, depth, None) if match else None
+        
+        priority, variant, index, first_index, subfolder = state
+        if match:
+            if match[0] < priority:
+                # より優先度の高いカテゴリのフォルダ
+                return match + (depth, depth, None)
+            if match[0] == priority and match[1] < variant:
+                # 同じカテゴリで優先されるフォルダ名
+                return (priority, match[1], depth, first_index, None)
+        if index == depth - 1:
+            # カテゴリフォルダ直下のフォルダはサブフォルダ
+            return (priority, variant, index, first_index, name)
+        return state
+    
+    def _build_asset_files(self, listings, states):
+        """ディレクトリ一覧からカテゴリ別のファイル一覧とインデックスを作成"""
+        # 各カテゴリのファイルリストとインデックスをクリア
+        for category in self.asset_files:
+            self.asset_files[category] = []
+            self.asset_index[category] = {}
+        self.index_generation += 1
+        
+        for rel_path, (_, _, files) in listings.items():
+            parts, state = states[rel_path]
+            if files and state is not None:
+                self._add_directory_assets(rel_path, parts, state, files)
+    
+    def _add_directory_assets(self, rel_path, parts, state, files):
+        """カテゴリ判定済みのフォルダ内の.warudoファイルを追加し、追加したアセットを返す"""
+        category = list(self.category_paths)[state[0]]
+        subfolder_name = state[4]
+        directory = AssetDirectory(
+            category,
+            os.path.join(self.streaming_assets_path, rel_path) if rel_path else self.streaming_assets_path,
+            rel_path,
+            "/".join(parts[state[3] + 1:]),
+            sys.intern(subfolder_name) if subfolder_name is not None else None,
+            self._path_prefixes[category]
+        )
+        return [self._add_asset(directory, file) for file in files]
+    
+    def _add_asset(self, directory, file):
+        """アセット情報を作成してファイル一覧とインデックスに追加"""
+        asset = AssetRecord(directory, file)
+        self.asset_files[directory.category].append(asset)
+        self._add_to_index(directory.category, asset)
+        return asset
+    
+    def _add_to_index(self, category, asset):
+        """アセットを存在確認用インデックスに登録"""
+        self.asset_index[category].setdefault(self._asset_key(asset), []).append(asset)
+    
+    def _asset_key(self, asset):
+        """アセットのインデックスキーを作成"""
+        return (asset.directory.subfolder_key, canonical_key(asset.file))
+    
+    def _find_asset(self, rel_dir, file):
+        """フォルダの相対パスとファイル名からアセットを探す（なければNone）"""
+        state = self._dir_states.get(rel_dir, (None, None))[1]
+        if state is None:
+            return None
+        category = list(self.category_paths)[state[0]]
+        for asset in self.asset_index[category].get(self._make_key(state[4], file), ()):
+            if asset.file == file and asset.directory.rel_dir == rel_dir:
+                return asset
+        return None
+    
+    @staticmethod
+    def _make_key(subfolder, filename):
+        """インデックスのキーを作成（サブフォルダなしはNone、名前は canonical_key() の正規形）"""
+        return (canonical_key(subfolder) if subfolder is not None else None, canonical_key(filename))
+    
+    def start_watching(self):
+        """StreamingAssetsフォルダの監視を開始（スキャン済みでなければFalse）"""
+        # ctypesなどの読み込みは監視を使う場合だけにする
+        from .asset_watcher import create_watcher
+        
+        self.stop_watching()
+        if (not self.streaming_assets_path or self.index_service or self.flat_index_path
+                or self._listings_root != self.streaming_assets_path):
+            return False
+        category_dirs = [rel_dir for rel_dir, (_, state) in self._dir_states.items() if state is not None]
+        self.watcher = create_watcher(self.streaming_assets_path, self._dir_listings,
+                                      category_dirs, self._list_directory).start()
+        return True
+    
+    def stop_watching(self):
+        """StreamingAssetsフォルダの監視を停止"""
+        if self.watcher:
+            self.watcher.stop()
+            self.watcher = None
+    
+    def apply_watch_changes(self):
+        """監視で検出した変更をインデックスに反映（フォルダ全体は再スキャンしない）
+        
+        戻り値は、追加・削除されたアセットのキーをカテゴリごとにまとめた辞書です
+        （変更がなければ空の辞書）。インデックスを読む処理と同時に呼ばないでください。
+        """
+        if not self.watcher:
+            return {}
+        
+        affected = {}
+        for kind, rel_path in self.watcher.poll():
+            if kind == "rescan":
+                changed = self._rescan_keys()
+            elif kind == "file_added":
+                changed = self._apply_file_added(rel_path)
+            elif kind == "file_removed":
+                changed = self._apply_file_removed(rel_path)
+            elif kind == "dir_added":
+                changed = self._apply_dir_added(rel_path)
+            else:
+                changed = self._apply_dir_removed(rel_path)
+            for category, asset in changed:
+                affected.setdefault(category, set()).add(self._asset_key(asset))
+        if affected:
+            self.index_generation += 1
+        return affected
+    
+    def _rescan_keys(self):
+        """全体を再スキャンし、スキャン前後のすべてのアセットを返す"""
+        before = self._all_assets()
+        self.scan_streaming_assets()
+        return before + self._all_assets()
+    
+    def _all_assets(self):
+        """すべてのアセットを (カテゴリ, アセット) のリストで返す"""
+        return [(category, asset) for category, assets in self.asset_files.items() for asset in assets]
+    
+    def _apply_file_added(self, rel_path):
+        """追加されたファイルをインデックスに反映"""
+        rel_dir, _, file = rel_path.rpartition("/")
+        if rel_dir not in self._dir_states or self._find_asset(rel_dir, file):
+            return []
+        files = self._dir_listings[rel_dir][2]
+        if file not in files:
+            files.append(file)
+        parts, state = self._dir_states[rel_dir]
+        if state is None:
+            return []
+        category = list(self.category_paths)[state[0]]
+        return [(category, asset) for asset in self._add_directory_assets(rel_dir, parts, state, [file])]
+    
+    def _apply_file_removed(self, rel_path):
+        """削除されたファイルをインデックスから取り除く"""
+        rel_dir, _, file = rel_path.rpartition("/")
+        listing = self._dir_listings.get(rel_dir)
+        if listing and file in listing[2]:
+            listing[2].remove(file)
+        
+        asset = self._find_asset(rel_dir, file)
+        if not asset:
+            return []
+        category = asset.directory.category
+        self.asset_files[category].remove(asset)
+        key = self._asset_key(asset)
+        assets = self.asset_index[category][key]
+        assets.remove(asset)
+        if not assets:
+            del self.asset_index[category][key]
+        return [(category, asset)]
+    
+    def _apply_dir_added(self, rel_dir):
+        """追加されたフォルダ（とその下）をインデックスに反映"""
+        parent, _, name = rel_dir.rpartition("/")
+        if parent not in self._dir_states:
+            return []
+        
+        # 同じフォルダの通知が重複した場合は一度取り除いてから追加し直す
+        changed = self._apply_dir_removed(rel_dir)
+        
+        parent_parts, parent_state = self._dir_states[parent]
+        if name not in self._dir_listings[parent][1]:
+            self._dir_listings[parent][1].append(name)
+        
+        categories = list(self.category_paths)
+        stack = [(rel_dir, parent_parts + (name,),
+                  self._classify_child(parent_state, name, len(parent_parts)))]
+        while stack:
+            current, parts, state = stack.pop()
+            full_dir = os.path.join(self.streaming_assets_path, current)
+            try:
+                mtime_ns = os.stat(full_dir).st_mtime_ns
+            except OSError:
+                continue
+            subdirs, _, files = self._list_directory(full_dir)
+            self._dir_listings[current] = [mtime_ns, subdirs, files]
+            self._dir_states[current] = (parts, state)
+            if files and state is not None:
+                category = categories[state[0]]
+                changed.extend((category, asset)
+                               for asset in self._add_directory_assets(current, parts, state, files))
+            for subdir in subdirs:
+                stack.append((f"{current}/{subdir}", parts + (subdir,),
+                              self._classify_child(state, subdir, len(parts))))
+        return changed
+    
+    def _apply_dir_removed(self, rel_dir):
+        """削除されたフォルダ（とその下）のアセットをインデックスから取り除く"""
+        parent, _, name = rel_dir.rpartition("/")
+        parent_listing = self._dir_listings.get(parent)
+        if parent_listing and name in parent_listing[1]:
+            parent_listing[1].remove(name)
+        
+        changed = []
+        prefix = rel_dir + "/"
+        for current in [path for path in self._dir_listings if path == rel_dir or path.startswith(prefix)]:
+            for file in list(self._dir_listings[current][2]):
+                changed.extend(self._apply_file_removed(f"{current}/{file}"))
+            del self._dir_listings[current]
+            self._dir_states.pop(current, None)
+        return changed
     
     def _get_actual_folder_name(self, path, possible_folders):
         """パスから実際のフォルダ名を取得（大文字小文字の差異を保持）"""
-        parts = path.split("/")
-        for part in parts:
-            for folder in possible_folders:
-                if part.lower() == folder.lower():
-                    return part
+        folder_keys = [canonical_key(folder) for folder in possible_folders]
+        for part in path.split("/"):
+            if canonical_key(part) in folder_keys:
+                return part
         return possible_folders[0]
     
     def _get_path_after_category(self, path, category):
         """カテゴリフォルダ名の後のパス部分を取得"""
         parts = path.split('/')
         try:
-            # カテゴリフォルダ名のインデックスを検索（大文字小文字を区別せず）
+            # カテゴリフォルダ名のインデックスを検索（正規形で比較）
+            category_key = canonical_key(category)
             index = -1
             for i, part in enumerate(parts):
-                if part.lower() == category.lower():
+                if canonical_key(part) == category_key:
                     index = i
                     break
                     
@@ -182,53 +711,132 @@ class AssetManager:
                 
         return path
     
+    def make_reference_key(self, asset_path, category):
+        """シーン内の参照パスからインデックスのキーを作成
+        
+        パス全体を一度だけ正規形にしてから、プロトコルと "data/" を取り除いて分割します
+        （NFCと大文字小文字の統一は "/" をまたがないため、各部分も正規形になります）。
+        """
+        path = canonical_key(asset_path) if asset_path else ""
+        for protocol in self._protocol_keys:
+            if path.startswith(protocol):
+                path = path[len(protocol):]
+                break
+        if path.startswith("data/"):
+            path = path[5:]
+        
+        # JSONのパス構造を解析（カテゴリ名の後にサブフォルダがあるか）
+        json_parts = path.split('/')
+        json_subfolder = json_parts[1] if len(json_parts) > 2 else None
+        return (json_subfolder, json_parts[-1])
+    
     def check_file_exists(self, asset_path, category):
         """StreamingAssetsフォルダでファイルが存在するか確認（サブフォルダまで厳密チェック）"""
         if not self.streaming_assets_path or not asset_path:
             return True
+        if self.index_service:
+            return self.check_files_exist(category, [asset_path])[0]
+        if self.flat_index_path:
+            return self._get_flat_index().contains(category, self.make_reference_key(asset_path, category))
         
-        # パスを正規化
-        normalized_asset_path = self.normalize_asset_path(asset_path, category)
-        
-        # カテゴリに対応するアセットリスト
-        assets = self.asset_files.get(category, [])
-        
-        # JSONのパス構造を解析
-        json_parts = normalized_asset_path.split('/')
-        json_has_subfolder = len(json_parts) > 2  # カテゴリ名の後にサブフォルダがあるか
-        json_subfolder = json_parts[1] if json_has_subfolder else ""
-        json_filename = json_parts[-1]  # ファイル名部分
-        
-        # 各アセットとの厳密な比較
-        for asset in assets:
-            asset_category_path = asset.get('category_path', '')
-            asset_is_in_subfolder = asset.get('is_subfolder', False)
-            asset_subfolder_name = asset.get('subfolder_name', '')
-              # アセットのパス構造を解析
-            asset_parts = asset_category_path.split('/')
-            asset_filename = asset_parts[-1] if asset_parts else ''
-            
-            # ファイル名が一致しない場合はスキップ
-            if json_filename.lower() != asset_filename.lower():
-                continue
-            
-            # 1. 両方ともサブフォルダにない場合（直接カテゴリフォルダ内）
-            if not json_has_subfolder and not asset_is_in_subfolder:
-                return True
-              # 2. 両方ともサブフォルダ内にある場合
-            elif json_has_subfolder and asset_is_in_subfolder:
-                # サブフォルダ名まで一致するかチェック
-                if json_subfolder.lower() == asset_subfolder_name.lower():
-                    return True
-              # 3. 構造が異なる場合（一方がサブフォルダ、もう一方が直接）
-            else:
-                # 構造が異なる場合は一致しないとみなす
-                continue
+        # ファイル名とサブフォルダ名の両方が一致するアセットがあるか
+        # （サブフォルダの有無が異なる場合は一致しないとみなす）
+        index = self.asset_index.get(category, {})
+        return self.make_reference_key(asset_path, category) in index
+    
+    def use_flat_index(self, flat_index_path):
+        """フラットインデックスのファイルを存在確認に使う（Noneで使用をやめる）
+        
+        ファイル一覧とインデックスは持たず、mmapしたファイルをそのまま検索します。
+        プロセス間ではファイルのパスだけを受け渡すため、ワーカーの起動時間は
+        アセットの数によらず一定になります。
+        """
+        if self._flat_index is not None:
+            self._flat_index.close()
+        self.flat_index_path = flat_index_path
+        self._flat_index = None
+    
+    def _get_flat_index(self):
+        """フラットインデックスを開く（プロセスごとに一度だけmmapする）"""
+        if self._flat_index is None:
+            # 使う場合だけ読み込む
+            from .flat_index import FlatAssetIndex
+            self._flat_index = FlatAssetIndex.open_file(self.flat_index_path)
+        return self._flat_index
+    
+    def check_files_exist(self, category, asset_paths):
+        """複数の参照パスの存在確認をまとめて行う（インデックスサービスには1回の問い合わせ）"""
+        if self.index_service and self.streaming_assets_path:
+            exists = self._call_service("check_files", category, asset_paths)
+            if exists is not None:
+                return exists
+        return [self.check_file_exists(path, category) for path in asset_paths]
+    
+    def get_directory_mtimes(self):
+        """スキャンした各ディレクトリの相対パス → 更新時刻(mtime_ns)（ローカルでスキャンしていなければNone）"""
+        if (not self.streaming_assets_path or self.index_service or self.flat_index_path
+                or self._listings_root != self.streaming_assets_path):
+            return None
+        return {rel_dir: listing[0] for rel_dir, listing in self._dir_listings.items()}
+    
+    def get_index_fingerprint(self):
+        """インデックスのキー集合の指紋（存在確認の結果が変わりうるかの判定用）
         
-        return False
+        同じフォルダ構成であれば再起動後も同じ値になるため、ディスクに保存した
+        検証結果を再利用できるかどうかの判定に使えます。世代ごとに一度だけ計算します。
+        """
+        if self.index_service:
+            status = self._call_service("status")
+            if status is not None:
+                return status["fingerprint"]
+        if self.flat_index_path:
+            # 一時的なフラットインデックスは指紋を記録していない（None）
+            return self._get_flat_index().metadata["fingerprint"]
+        if self._fingerprint and self._fingerprint[0] == self.index_generation:
+            return self._fingerprint[1]
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr(bool(self.streaming_assets_path)).encode("utf-8"))
+        for category, index in self.asset_index.items():
+            digest.update(f"\0{category}\0".encode("utf-8"))
+            digest.update("\n".join(sorted(map(repr, index))).encode("utf-8"))
+        fingerprint = digest.hexdigest()
+        self._fingerprint = (self.index_generation, fingerprint)
+        return fingerprint
+    
+    def find_unused_assets(self, referenced_keys):
+        """参照キーに一致しないアセットをカテゴリごとに返す
+        
+        referenced_keysはカテゴリ → make_reference_key() で作成したキーの集合です。
+        インデックスサービスやフラットインデックスを使う場合、アセット情報は辞書になります。
+        """
+        if self.index_service:
+            unused = self._call_service("find_unused", referenced_keys)
+            if unused is not None:
+                return unused
+        if self.flat_index_path:
+            return self._get_flat_index().find_unused(referenced_keys)
+        unused = {}
+        for category, index in self.asset_index.items():
+            used = referenced_keys.get(category, set())
+            unused[category] = [
+                asset
+                for key, assets in index.items() if key not in used
+                for asset in assets
+            ]
+        return unused
+    
+    def get_all_assets(self):
+        """すべてのアセットをカテゴリごとに返す（形式は find_unused_assets() と同じ）"""
+        return self.find_unused_assets({})
     
     def get_asset_summary(self):
         """アセットの概要を取得"""
+        if self.index_service:
+            status = self._call_service("status")
+            if status is not None:
+                return status["assets"]
+        if self.flat_index_path:
+            return dict(self._get_flat_index().metadata["assets"])
         summary = {}
         for category, files in self.asset_files.items():
             summary[category] = len(files)
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+アセット監視モジュール
+StreamingAssetsフォルダの変更（ファイルの追加・削除・名前変更）を監視します。
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import queue
+import select
+import struct
+import sys
+import threading
+
+# inotify のイベント種別（<sys/inotify.h>）
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_ONLYDIR
+
+# struct inotify_event の固定長部分（wd, mask, cookie, len）
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _join(rel_dir, name):
+    """相対パスを結合"""
+    return f"{rel_dir}/{name}" if rel_dir else name
+
+
+def _is_within(rel_path, rel_dir):
+    """rel_path が rel_dir 自身またはその下にあるか"""
+    return rel_path == rel_dir or rel_path.startswith(rel_dir + "/")
+
+
+class AssetWatcher:
+    """監視クラスの基底クラス
+
+    変更はワーカースレッドでキューに積み、poll() で取り出します。
+    イベントは (種別, StreamingAssetsからの相対パス) のタプルで、種別は以下のいずれかです。
+        "file_added" / "file_removed" / "dir_added" / "dir_removed" / "rescan"
+    名前の変更は削除と追加の2つのイベントとして通知します。
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._queue = queue.Queue()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        """監視を開始"""
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """監視を停止"""
+        self._stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+
+    def poll(self):
+        """たまっているイベントをすべて取り出す"""
+        events = []
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                return events
+
+    def _emit(self, kind, rel_path):
+        """イベントをキューに追加"""
+        self._queue.put((kind, rel_path))
+
+    def _full_path(self, rel_path):
+        """相対パスを絶対パスに変換"""
+        return os.path.join(self.root, rel_path) if rel_path else self.root
+
+    def _run(self):
+        """ワーカースレッドの本体"""
+        raise NotImplementedError
+
+
+class InotifyWatcher(AssetWatcher):
+    """inotify（ctypes経由）による監視クラス（Linux用）
+
+    各ディレクトリに監視を登録し、新しく作成されたディレクトリにも監視を追加します。
+    """
+
+    READ_TIMEOUT = 0.5
+
+    def __init__(self, root, directories):
+        super().__init__(root)
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._libc.inotify_init1.argtypes = [ctypes.c_int]
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+
+        # 監視記述子 → 相対パス
+        self._watches = {}
+        try:
+            for rel_dir in directories:
+                self._add_watch(rel_dir, strict=True)
+        except OSError:
+            os.close(self._fd)
+            raise
+
+    def _add_watch(self, rel_dir, strict=False):
+        """ディレクトリに監視を登録（strictの場合は上限超過などのエラーを送出）"""
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(self._full_path(rel_dir)), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if strict and error in (errno.ENOSPC, errno.ENOMEM, errno.EACCES):
+                raise OSError(error, os.strerror(error))
+            return
+        self._watches[wd] = rel_dir
+
+    def _add_tree(self, rel_dir):
+        """新しいディレクトリとその下のすべてのディレクトリに監視を登録"""
+        self._add_watch(rel_dir)
+        for current, dirs, _ in os.walk(self._full_path(rel_dir)):
+            current_rel = os.path.relpath(current, self.root).replace("\\", "/")
+            for name in dirs:
+                self._add_watch(_join(current_rel, name))
+
+    def _remove_tree(self, rel_dir):
+        """移動したディレクトリとその下の監視を解除"""
+        for wd, watched in list(self._watches.items()):
+            if _is_within(watched, rel_dir):
+                self._libc.inotify_rm_watch(self._fd, wd)
+                del self._watches[wd]
+
+    def _run(self):
+        """inotifyのイベントを読み取ってキューに積む"""
+        try:
+            while not self._stop_event.is_set():
+                readable, _, _ = select.select([self._fd], [], [], self.READ_TIMEOUT)
+                if not readable:
+                    continue
+                try:
+                    data = os.read(self._fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                self._handle_events(data)
+        finally:
+            os.close(self._fd)
+
+    def _handle_events(self, data):
+        """読み取ったバイト列をイベントに変換"""
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # イベントが失われたので全体をスキャンし直す
+                self._emit("rescan", "")
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            rel_dir = self._watches.get(wd)
+            if rel_dir is None or not name:
+                continue
+
+            rel_path = _join(rel_dir, name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add_tree(rel_path)
+                    self._emit("dir_added", rel_path)
+                elif mask & IN_MOVED_FROM:
+                    self._remove_tree(rel_path)
+                    self._emit("dir_removed", rel_path)
+                elif mask & IN_DELETE:
+                    self._emit("dir_removed", rel_path)
+            elif name.endswith(".warudo"):
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._emit("file_added", rel_path)
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    self._emit("file_removed", rel_path)
+
+
+class PollingWatcher(AssetWatcher):
+    """更新時刻(mtime)のポーリングによる監視クラス（inotifyが使えない環境用）
+
+    カテゴリフォルダ以下のディレクトリだけを一定間隔で確認し、
+    mtimeが変わったディレクトリの内容を前回と比較します。
+    """
+
+    POLL_INTERVAL = 2.0
+
+    def __init__(self, root, listings, list_directory):
+        super().__init__(root)
+        self._list_directory = list_directory
+        # 相対パス → (mtime_ns, サブディレクトリの集合, ファイルの集合)
+        self._snapshot = {
+            rel_dir: (listing[0], set(listing[1]), set(listing[2]))
+            for rel_dir, listing in listings.items()
+        }
+
+    def _run(self):
+        """一定間隔でディレクトリを確認"""
+        while not self._stop_event.wait(self.POLL_INTERVAL):
+            for rel_dir in sorted(self._snapshot):
+                if rel_dir in self._snapshot:
+                    self._check_directory(rel_dir)
+
+    def _check_directory(self, rel_dir):
+        """1つのディレクトリの変更を確認してイベントを積む"""
+        mtime_ns, subdirs, files = self._snapshot[rel_dir]
+        try:
+            current_mtime = os.stat(self._full_path(rel_dir)).st_mtime_ns
+        except OSError:
+            self._forget_tree(rel_dir)
+            self._emit("dir_removed", rel_dir)
+            return
+        if current_mtime == mtime_ns:
+            return
+
+        new_subdirs, _, new_files = self._list_directory(self._full_path(rel_dir))
+        new_subdirs = set(new_subdirs)
+        new_files = set(new_files)
+        self._snapshot[rel_dir] = (current_mtime, new_subdirs, new_files)
+
+        for name in sorted(files - new_files):
+            self._emit("file_removed", _join(rel_dir, name))
+        for name in sorted(new_files - files):
+            self._emit("file_added", _join(rel_dir, name))
+        for name in sorted(subdirs - new_subdirs):
+            self._forget_tree(_join(rel_dir, name))
+            self._emit("dir_removed", _join(rel_dir, name))
+        for name in sorted(new_subdirs - subdirs):
+            self._remember_tree(_join(rel_dir, name))
+            self._emit("dir_added", _join(rel_dir, name))
+
+    def _remember_tree(self, rel_dir):
+        """新しいディレクトリとその下を監視対象に追加"""
+        stack = [rel_dir]
+        while stack:
+            current = stack.pop()
+            try:
+                mtime_ns = os.stat(self._full_path(current)).st_mtime_ns
+            except OSError:
+                continue
+            subdirs, _, files = self._list_directory(self._full_path(current))
+            self._snapshot[current] = (mtime_ns, set(subdirs), set(files))
+            stack.extend(_join(current, name) for name in subdirs)
+
+    def _forget_tree(self, rel_dir):
+        """削除されたディレクトリとその下を監視対象から外す"""
+        for watched in [path for path in self._snapshot if _is_within(path, rel_dir)]:
+            del self._snapshot[watched]
+
+
+def create_watcher(root, listings, category_dirs, list_directory):
+    """環境に合った監視クラスを作成
+
+    Linuxではinotifyですべてのディレクトリを監視し、それ以外の環境や
+    inotifyの監視数が上限に達した場合は、カテゴリフォルダ以下のみをポーリングします。
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root, listings)
+        except OSError as e:
+            print(f"inotifyを使用できないため、ポーリングで監視します: {e}")
+    category_listings = {rel_dir: listings[rel_dir] for rel_dir in category_dirs if rel_dir in listings}
+    return PollingWatcher(root, category_listings, list_directory)
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""
+一括チェックモジュール
+GUIを使わずに複数のシーンファイルをまとめてチェックします。
+アセットのインデックスは一度だけ作成し、シーンの分析はプロセスプールで並列に行います。
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+
+from .analyzer import SceneAnalyzer
+from .asset_manager import AssetManager
+from .catalog import AssetCatalog
+from .config import ConfigManager
+from .flat_index import INDEX_FILE, temporary_flat_index
+from .report_export import REPORT_FORMATS, create_report_writer, iter_scene_records, iter_unused_records
+from .scan_cache import ScanCache
+from .translations import get_text
+
+# ワーカープロセスごとの分析エンジンと言語設定
+_worker_analyzer = None
+_worker_language = "ja"
+_worker_collect_references = False
+_worker_collect_records = False
+
+# カタログに1つのトランザクションでまとめて記録するシーンの数
+CATALOG_CHUNK = 256
+
+
+def _init_worker(asset_manager, language, collect_references=False, collect_records=False):
+    """ワーカープロセスの初期化（アセットのインデックスはここで一度だけ受け取る）"""
+    global _worker_analyzer, _worker_language, _worker_collect_references, _worker_collect_records
+    _worker_analyzer = SceneAnalyzer(asset_manager)
+    _worker_language = language
+    _worker_collect_references = collect_references
+    _worker_collect_records = collect_records
+
+
+def _worker_get_text(key, **kwargs):
+    """ワーカープロセスの言語設定で翻訳テキストを取得"""
+    return get_text(_worker_language, key, **kwargs)
+
+
+def _check_scene(scene_path):
+    """1つのシーンファイルを分析して結果を辞書で返す（ワーカープロセスで実行）"""
+    return check_scene(_worker_analyzer, scene_path, _worker_get_text,
+                       _worker_collect_references, _worker_collect_records)
+
+
+def check_scene(analyzer, scene_path, get_text_func, collect_references=False, collect_records=False):
+    """1つのシーンファイルを分析して結果を辞書で返す（インデックスサービスからも使用）"""
+    result = {
+        "path": scene_path,
+        "error": None,
+        "counts": {},
+        "subfolder_issues": [],
+        "missing_files": [],
+        "references": {},
+        "records": []
+    }
+    try:
+        extracted_objects = analyzer.extract_objects_from_file(scene_path)
+    except ValueError as e:
+        result["error"] = get_text_func("json_error", error=str(e))
+    except Exception as e:
+        result["error"] = get_text_func("file_error", error=str(e))
+    if result["error"]:
+        if collect_records:
+            result["records"] = list(iter_scene_records(scene_path, None, get_text_func, result["error"]))
+        return result
+    
+    result["counts"] = {key: len(objects) for key, objects in extracted_objects.items()}
+    # ユニークな参照パスごとに一度だけ分類と存在確認を行い、両方のレポートで共有
+    verify = bool(analyzer.asset_manager.streaming_assets_path)
+    verifications = analyzer.verify_paths(analyzer.group_extracted_objects(extracted_objects), verify)
+    result["subfolder_issues"] = analyzer.subfolder_issues(verifications, get_text_func)
+    if verify:
+        result["missing_files"] = analyzer.missing_file_issues(verifications, get_text_func)
+    if collect_references:
+        # 未使用ファイルのチェック用に、ユニークな参照パスだけを返す
+        reference_paths = analyzer.collect_reference_paths(extracted_objects)
+        result["references"] = {category: sorted(paths) for category, paths in reference_paths.items()}
+    if collect_records:
+        # レポート出力用の参照と問題点のレコード
+        result["records"] = list(iter_scene_records(scene_path, verifications, get_text_func))
+    return result
+
+
+def has_problems(result):
+    """シーンの分析結果に問題があるか判定"""
+    return bool(result["error"] or result["subfolder_issues"] or result["missing_files"])
+
+
+def collect_scene_files(paths):
+    """ファイルとフォルダの指定からシーンファイル（*.json）の一覧を作成"""
+    scene_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for file in sorted(files):
+                    if file.lower().endswith(".json"):
+                        scene_files.append(os.path.join(root, file))
+        else:
+            scene_files.append(path)
+    return scene_files
+
+
+class BatchChecker:
+    """複数シーンの一括チェッククラス"""
+    
+    def __init__(self, asset_manager, language="ja", workers=None, collect_references=False,
+                 collect_records=False):
+        self.asset_manager = asset_manager
+        self.language = language
+        self.workers = workers or os.cpu_count() or 1
+        self.collect_references = collect_references
+        self.collect_records = collect_records
+    
+    def run(self, scene_paths, on_result=None):
+        """シーンファイルを並列に分析し、(結果のリスト, 経過秒数) を返す
+        
+        結果は scene_paths と同じ順序で返されます。on_resultを指定すると、
+        各シーンの結果が届いた時点で（同じ順序で）呼び出します。
+        """
+        start = time.perf_counter()
+        results = []
+        if self.workers <= 1 or len(scene_paths) <= 1:
+            _init_worker(self.asset_manager, self.language, self.collect_references, self.collect_records)
+            self._collect(map(_check_scene, scene_paths), results, on_result)
+            return results, time.perf_counter() - start
+        
+        # ワーカーにはインデックスをコピーせず、フラットインデックスのファイルを共有する
+        with self._shared_index() as worker_manager:
+            initargs = (worker_manager, self.language, self.collect_references, self.collect_records)
+            chunksize = max(1, len(scene_paths) // (self.workers * 4))
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                     initargs=initargs) as pool:
+                self._collect(pool.map(_check_scene, scene_paths, chunksize=chunksize), results, on_result)
+        return results, time.perf_counter() - start
+    
+    @contextmanager
+    def _shared_index(self):
+        """ワーカープロセスに渡すアセット管理を作成
+        
+        インデックスを一時ファイルのフラットインデックスに書き出し、ファイルのパスだけを持つ
+        アセット管理を渡します（各ワーカーはファイルをmmapして直接検索する）。
+        インデックスサービスやインデックスファイルを使う場合と、StreamingAssetsがない場合はそのまま渡します。
+        """
+        if (self.asset_manager.index_service or self.asset_manager.flat_index_path
+                or not self.asset_manager.streaming_assets_path):
+            yield self.asset_manager
+            return
+        with temporary_flat_index(self.asset_manager) as flat_index_path:
+            worker_manager = AssetManager()
+            worker_manager.streaming_assets_path = self.asset_manager.streaming_assets_path
+            worker_manager.use_flat_index(flat_index_path)
+            yield worker_manager
+    
+    @staticmethod
+    def _collect(scene_results, results, on_result):
+        """届いた結果をリストに追加（レコードは渡した後に破棄してメモリを節約）"""
+        for result in scene_results:
+            if on_result:
+                on_result(result)
+            result["records"] = []
+            results.append(result)
+    
+    def find_unused_files(self, results):
+        """すべてのシーンで使用されていないファイルを1回の差集合で求める"""
+        analyzer = SceneAnalyzer(self.asset_manager)
+        reference_paths = {}
+        for result in results:
+            for category, paths in result["references"].items():
+                reference_paths.setdefault(category, set()).update(paths)
+        return analyzer.find_unused_files(reference_paths)
+
+
+def main(argv=None):
+    """コマンドラインから一括チェックを実行し、終了コードを返す"""
+    config_manager = ConfigManager()
+    language = config_manager.get_language()
+    
+    parser = argparse.ArgumentParser(description=get_text(language, "batch_description"))
+    parser.add_argument("scenes", nargs="+", help=get_text(language, "batch_scenes_help"))
+    parser.add_argument("--assets", default=config_manager.get_streaming_assets_path(),
+                        help=get_text(language, "batch_assets_help"))
+    parser.add_argument("--workers", type=int, default=None, help=get_text(language, "batch_workers_help"))
+    parser.add_argument("--quiet", action="store_true", help=get_text(language, "batch_quiet_help"))
+    parser.add_argument("--unused", action="store_true", help=get_text(language, "batch_unused_help"))
+    parser.add_argument("--report", help=get_text(language, "batch_report_help"))
+    parser.add_argument("--report-format", choices=list(REPORT_FORMATS),
+                        help=get_text(language, "batch_report_format_help"))
+    parser.add_argument("--index", nargs="?", const=INDEX_FILE, help=get_text(language, "batch_index_help"))
+    parser.add_argument("--catalog", nargs="?", const=AssetCatalog.CATALOG_FILE,
+                        help=get_text(language, "batch_catalog_help"))
+    args = parser.parse_args(argv)
+    
+    scene_files = collect_scene_files(args.scenes)
+    if not scene_files:
+        print(get_text(language, "batch_no_scenes"), file=sys.stderr)
+        return 2
+    
+    # アセットのインデックスは一度だけ作成する（インデックスサービスが起動していればスキャンしない）
+    asset_manager = AssetManager(scan_cache=ScanCache())
+    if args.assets and os.path.isdir(args.assets):
+        asset_manager.set_streaming_assets_path(args.assets, use_service=True, index_file=args.index)
+        if asset_manager.index_service and not args.quiet:
+            print(get_text(language, "using_index_service", url=asset_manager.index_service.url), file=sys.stderr)
+        elif args.index and not asset_manager.flat_index_path:
+            # インデックスファイルがない・別のフォルダ用・壊れている場合はスキャンした
+            print(get_text(language, "index_file_unusable", path=args.index), file=sys.stderr)
+    else:
+        print(get_text(language, "batch_no_assets"), file=sys.stderr)
+    
+    # カタログにはスキャン結果とシーンごとの参照を記録する
+    catalog = None
+    if args.catalog:
+        try:
+            catalog = AssetCatalog(args.catalog)
+            if asset_manager.streaming_assets_path:
+                catalog.record_scan(asset_manager)
+        except sqlite3.Error as e:
+            print(get_text(language, "catalog_error", error=str(e)), file=sys.stderr)
+            return 2
+    
+    check_unused = bool(args.unused and asset_manager.streaming_assets_path)
+    checker = BatchChecker(asset_manager, language, args.workers, collect_references=check_unused,
+                           collect_records=bool(args.report or catalog))
+    
+    get_text_func = lambda key, **kwargs: get_text(language, key, **kwargs)
+    try:
+        report = create_report_writer(args.report, args.report_format) if args.report else None
+    except OSError as e:
+        print(get_text(language, "file_error", error=str(e)), file=sys.stderr)
+        if catalog:
+            catalog.close()
+        return 2
+    
+    # レポートはシーンの結果が届くたびに書き出し、カタログにはCATALOG_CHUNK個ずつまとめて記録する
+    pending = []
+    
+    def on_result(result):
+        if writer:
+            writer.write_all(result["records"])
+        if catalog:
+            pending.append((result["path"], result["records"]))
+            if len(pending) >= CATALOG_CHUNK:
+                catalog.record_scenes(pending, asset_manager.streaming_assets_path)
+                pending.clear()
+    
+    with (report or nullcontext()) as writer, (catalog or nullcontext()):
+        results, elapsed = checker.run(scene_files, on_result=on_result if (writer or catalog) else None)
+        if catalog and pending:
+            catalog.record_scenes(pending, asset_manager.streaming_assets_path)
+        unused_files = checker.find_unused_files(results) if check_unused else None
+        if writer and unused_files is not None:
+            writer.write_all(iter_unused_records(unused_files, get_text_func))
+    
+    problem_count = 0
+    for result in results:
+        if not has_problems(result):
+            if not args.quiet:
+                print(get_text(language, "batch_scene_ok", path=result["path"]))
+            continue
+        
+        problem_count += 1
+        print(get_text(language, "batch_scene_issues", path=result["path"]))
+        if result["error"]:
+            print(f"  - {result['error']}")
+        for issue in result["subfolder_issues"] + result["missing_files"]:
+            print(f"  - {issue}")
+    
+    # 未使用ファイル（問題としては数えない）
+    if check_unused:
+        unused_items = SceneAnalyzer(asset_manager).check_unused_files(unused_files, get_text_func)
+        print(get_text(language, "unused_files"))
+        print(get_text(language, "unused_count", count=len(unused_items)))
+        for item in unused_items:
+            print(f"  - {item}")
+    
+    throughput = len(results) / elapsed if elapsed > 0 else float("inf")
+    print(get_text(language, "batch_summary", total=len(results), problems=problem_count,
+                   seconds=elapsed, rate=throughput, workers=checker.workers))
+    return 1 if problem_count else 0
@@ -0,0 +1,443 @@
+# -*- coding: utf-8 -*-
+"""
+カタログモジュール
+StreamingAssetsのスキャン結果・シーンごとの参照・スキャン履歴をSQLiteのデータベースに記録し、
+「どのシーンがこのサブフォルダのアセットを使っているか」「先週から何が追加されたか」などを検索します。
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from .asset_manager import AssetManager, canonical_key
+from .config import ConfigManager
+from .scan_cache import ScanCache
+from .translations import get_text
+
+# テーブルとインデックス（キーはすべて canonical_key() の正規形、サブフォルダなしは空文字列）
+#   scans            スキャン履歴（追加・削除されたアセットの数）
+#   assets           アセット（削除されたものも removed_scan を記録して残す）
+#   scenes           記録したシーンファイル
+#   scene_references シーンごとのユニークな参照パス
+_SCHEMA = """
+CREATE TABLE scans (
+    id INTEGER PRIMARY KEY,
+    root TEXT NOT NULL,
+    scanned_at REAL NOT NULL,
+    fingerprint TEXT,
+    asset_count INTEGER NOT NULL DEFAULT 0,
+    added INTEGER NOT NULL DEFAULT 0,
+    removed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX scans_root ON scans (root, scanned_at);
+
+CREATE TABLE assets (
+    id INTEGER PRIMARY KEY,
+    root TEXT NOT NULL,
+    category TEXT NOT NULL,
+    rel_path TEXT NOT NULL,
+    subfolder TEXT,
+    subfolder_key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    file_key TEXT NOT NULL,
+    added_scan INTEGER REFERENCES scans (id),
+    removed_scan INTEGER REFERENCES scans (id),
+    UNIQUE (root, category, rel_path)
+);
+CREATE INDEX assets_key ON assets (category, subfolder_key, file_key);
+CREATE INDEX assets_name ON assets (name_key);
+CREATE INDEX assets_added ON assets (added_scan);
+CREATE INDEX assets_removed ON assets (removed_scan);
+
+CREATE TABLE scenes (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    root TEXT,
+    analyzed_at REAL NOT NULL,
+    error TEXT
+);
+
+CREATE TABLE scene_references (
+    scene_id INTEGER NOT NULL REFERENCES scenes (id) ON DELETE CASCADE,
+    category TEXT NOT NULL,
+    path TEXT NOT NULL,
+    name TEXT,
+    name_key TEXT NOT NULL,
+    subfolder_key TEXT NOT NULL,
+    file_key TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    workshop INTEGER NOT NULL,
+    file_exists INTEGER
+);
+CREATE INDEX references_key ON scene_references (category, subfolder_key, file_key);
+CREATE INDEX references_name ON scene_references (name_key);
+CREATE INDEX references_scene ON scene_references (scene_id);
+"""
+
+# 名前の検索でワイルドカード（GLOB）として扱う文字
+_WILDCARDS = ("*", "?", "[")
+
+
+class AssetCatalog:
+    """アセットと参照のカタログクラス（SQLite）
+
+    記録はまとめて1つのトランザクションで行います（スキャン1回・シーンのまとまりごと）。
+    名前とサブフォルダはインデックスと同じ正規形（大文字小文字・Unicodeの正規化形式を無視）で
+    検索し、カテゴリ・サブフォルダ・名前にはデータベースのインデックスがあります。
+    UIのワーカースレッドとメインスレッドから使えるよう、接続は1つをロックで共有します。
+    """
+
+    CATALOG_FILE = os.path.join(os.path.dirname(ConfigManager.SETTINGS_FILE), "asset_catalog.db")
+    VERSION = 1
+
+    def __init__(self, catalog_file=None):
+        self.catalog_file = catalog_file or self.CATALOG_FILE
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.catalog_file, isolation_level=None, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        try:
+            self._prepare()
+        except sqlite3.Error:
+            self._connection.close()
+            raise
+        # 参照パスのキーの作成用（プロトコルとフォルダ名の対応のみ使う）
+        self._key_maker = AssetManager()
+
+    def _prepare(self):
+        """データベースを初期化する（新しいファイルならテーブルを作成）"""
+        connection = self._connection
+        connection.execute("PRAGMA foreign_keys = ON")
+        # 記録中もUIやスクリプトから検索できるようにする
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        if version == 0:
+            connection.executescript(f"BEGIN; {_SCHEMA} PRAGMA user_version = {self.VERSION}; COMMIT;")
+        elif version != self.VERSION:
+            raise sqlite3.DatabaseError(f"unsupported catalog version {version}")
+
+    def close(self):
+        """データベースを閉じる"""
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    @staticmethod
+    def _path_key(path):
+        """フォルダ・ファイルのパスをカタログのキーに変換（ScanCache と同じ）"""
+        return os.path.normcase(os.path.abspath(path))
+
+    @contextmanager
+    def _transaction(self):
+        """書き込み用のトランザクション（例外が起きた場合はすべて取り消す）"""
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def _query(self, sql, params=()):
+        """検索して結果を辞書のリストで返す"""
+        with self._lock:
+            return [dict(row) for row in self._connection.execute(sql, params)]
+
+    # --- 記録 ---
+
+    def record_scan(self, asset_manager):
+        """スキャン結果を記録し、前回のスキャンからの変更を履歴に残す
+
+        インデックスサービス・インデックスファイルを使っている場合も、そのアセット一覧を記録します。
+        最初のスキャンで登録したアセットは「追加」として数えません。
+        戻り値は {"scan_id", "asset_count", "added", "removed"} です。
+        """
+        root = self._path_key(asset_manager.streaming_assets_path)
+        rows = {}
+        for category, assets in asset_manager.get_all_assets().items():
+            for asset in assets:
+                rel_path = asset["rel_path"]
+                subfolder = asset["subfolder_name"] or None
+                subfolder_key, file_key = AssetManager._make_key(subfolder, os.path.basename(rel_path))
+                rows[(category, rel_path)] = (subfolder, subfolder_key or "", asset["name"],
+                                              os.path.splitext(file_key)[0], file_key)
+        fingerprint = asset_manager.get_index_fingerprint()
+
+        with self._transaction() as connection:
+            known = {
+                (category, rel_path): (asset_id, removed_scan)
+                for asset_id, category, rel_path, removed_scan in connection.execute(
+                    "SELECT id, category, rel_path, removed_scan FROM assets WHERE root = ?", (root,))
+            }
+            initial = connection.execute("SELECT 1 FROM scans WHERE root = ? LIMIT 1", (root,)).fetchone() is None
+            scan_id = connection.execute(
+                "INSERT INTO scans (root, scanned_at, fingerprint, asset_count) VALUES (?, ?, ?, ?)",
+                (root, time.time(), fingerprint, len(rows))
+            ).lastrowid
+
+            added = [key for key in rows if key not in known]
+            restored = [known[key][0] for key in rows if key in known and known[key][1] is not None]
+            removed = [asset_id for key, (asset_id, removed_scan) in known.items()
+                       if removed_scan is None and key not in rows]
+            added_scan = None if initial else scan_id
+            connection.executemany(
+                "INSERT INTO assets (root, category, rel_path, subfolder, subfolder_key, name, name_key, file_key,"
+                " added_scan) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((root, category, rel_path, *rows[(category, rel_path)], added_scan) for category, rel_path in added)
+            )
+            connection.executemany("UPDATE assets SET added_scan = ?, removed_scan = NULL WHERE id = ?",
+                                   ((scan_id, asset_id) for asset_id in restored))
+            connection.executemany("UPDATE assets SET removed_scan = ? WHERE id = ?",
+                                   ((scan_id, asset_id) for asset_id in removed))
+            added_count = 0 if initial else len(added) + len(restored)
+            connection.execute("UPDATE scans SET added = ?, removed = ? WHERE id = ?",
+                               (added_count, len(removed), scan_id))
+        return {"scan_id": scan_id, "asset_count": len(rows), "added": added_count, "removed": len(removed)}
+
+    def record_scenes(self, scenes, streaming_assets_path=None):
+        """シーンごとの参照を1つのトランザクションで記録する（同じシーンの以前の記録は置き換える）
+
+        scenesは (シーンファイルのパス, レコード) の組の並びで、レコードは
+        report_export.iter_scene_records() と同じ形式です（"reference" と "error" のみ使用）。
+        記録したシーンの数を返します。
+        """
+        root = self._path_key(streaming_assets_path) if streaming_assets_path else None
+        make_key = self._key_maker.make_reference_key
+        count = 0
+        with self._transaction() as connection:
+            for scene_path, records in scenes:
+                error = None
+                references = []
+                for record in records:
+                    if record["record"] == "error":
+                        error = record["message"]
+                    elif record["record"] == "reference" and record["path"]:
+                        subfolder_key, file_key = make_key(record["path"], record["category"])
+                        references.append((record["category"], record["path"], record["name"],
+                                           os.path.splitext(file_key)[0], subfolder_key or "", file_key,
+                                           record["count"], record["workshop"], record["exists"]))
+
+                path = self._path_key(scene_path)
+                row = connection.execute("SELECT id FROM scenes WHERE path = ?", (path,)).fetchone()
+                if row is None:
+                    scene_id = connection.execute(
+                        "INSERT INTO scenes (path, root, analyzed_at, error) VALUES (?, ?, ?, ?)",
+                        (path, root, time.time(), error)
+                    ).lastrowid
+                else:
+                    scene_id = row[0]
+                    connection.execute("UPDATE scenes SET root = ?, analyzed_at = ?, error = ? WHERE id = ?",
+                                       (root, time.time(), error, scene_id))
+                    connection.execute("DELETE FROM scene_references WHERE scene_id = ?", (scene_id,))
+                connection.executemany(
+                    "INSERT INTO scene_references (scene_id, category, path, name, name_key, subfolder_key,"
+                    " file_key, count, workshop, file_exists) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    ((scene_id, *reference) for reference in references)
+                )
+                count += 1
+        return count
+
+    def record_scene(self, scene_path, records, streaming_assets_path=None):
+        """1つのシーンの参照を記録する"""
+        return self.record_scenes([(scene_path, records)], streaming_assets_path)
+
+    def forget_scene(self, scene_path):
+        """シーンの記録を削除する"""
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM scenes WHERE path = ?", (self._path_key(scene_path),))
+
+    # --- 検索 ---
+
+    @staticmethod
+    def _filters(table, category=None, subfolder=None, name=None):
+        """カテゴリ・サブフォルダ・名前の検索条件を (SQLの条件のリスト, パラメーター) にする
+
+        subfolderに空文字列を指定するとカテゴリフォルダ直下のアセットだけになります。
+        nameは拡張子なしの名前で、* ? [ を含む場合はワイルドカードとして扱います。
+        """
+        clauses = []
+        params = []
+        if category:
+            clauses.append(f"{table}.category = ?")
+            params.append(category)
+        if subfolder is not None:
+            clauses.append(f"{table}.subfolder_key = ?")
+            params.append(canonical_key(subfolder) if subfolder else "")
+        if name:
+            name_key = canonical_key(name)
+            operator = "GLOB" if any(wildcard in name_key for wildcard in _WILDCARDS) else "="
+            clauses.append(f"{table}.name_key {operator} ?")
+            params.append(name_key)
+        return clauses, params
+
+    def _root_filter(self, clauses, params, streaming_assets_path):
+        """StreamingAssetsフォルダの検索条件を追加"""
+        if streaming_assets_path:
+            clauses.append("assets.root = ?")
+            params.append(self._path_key(streaming_assets_path))
+
+    _ASSET_COLUMNS = ("SELECT assets.root, assets.category, assets.rel_path, assets.subfolder, assets.name,"
+                      " added.scanned_at AS added_at, removed.scanned_at AS removed_at FROM assets"
+                      " LEFT JOIN scans AS added ON added.id = assets.added_scan"
+                      " LEFT JOIN scans AS removed ON removed.id = assets.removed_scan")
+
+    def find_assets(self, category=None, subfolder=None, name=None, streaming_assets_path=None,
+                    include_removed=False):
+        """条件に一致するアセットを返す（削除されたアセットは include_removed の場合のみ）"""
+        clauses, params = self._filters("assets", category, subfolder, name)
+        self._root_filter(clauses, params, streaming_assets_path)
+        if not include_removed:
+            clauses.append("assets.removed_scan IS NULL")
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._query(f"{self._ASSET_COLUMNS}{where} ORDER BY assets.root, assets.category, assets.rel_path",
+                           params)
+
+    def scenes_using(self, category=None, subfolder=None, name=None):
+        """条件に一致するアセットを参照しているシーンを返す
+
+        戻り値はシーンごとの {"scene", "analyzed_at", "references"（一致したユニークな参照の数）,
+        "count"（出現回数の合計）} のリストです。
+        """
+        clauses, params = self._filters("scene_references", category, subfolder, name)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._query(
+            "SELECT scenes.path AS scene, scenes.analyzed_at, COUNT(*) AS \"references\","
+            " SUM(scene_references.count) AS count FROM scene_references"
+            f" JOIN scenes ON scenes.id = scene_references.scene_id{where}"
+            " GROUP BY scenes.id ORDER BY scenes.path",
+            params
+        )
+
+    def scene_references(self, scene_path):
+        """記録したシーンの参照を返す"""
+        return self._query(
+            "SELECT scene_references.category, scene_references.path, scene_references.name,"
+            " scene_references.count, scene_references.workshop, scene_references.file_exists"
+            " FROM scene_references JOIN scenes ON scenes.id = scene_references.scene_id"
+            " WHERE scenes.path = ? ORDER BY scene_references.rowid",
+            (self._path_key(scene_path),)
+        )
+
+    def changes_since(self, since, streaming_assets_path=None):
+        """指定した時刻（time.time() の値）以降のスキャンで追加・削除されたアセットを返す
+
+        戻り値は {"added": アセットのリスト, "removed": アセットのリスト} です。
+        """
+        changes = {}
+        for change, column in (("added", "added"), ("removed", "removed")):
+            clauses = [f"{column}.scanned_at >= ?"]
+            params = [since]
+            self._root_filter(clauses, params, streaming_assets_path)
+            if change == "added":
+                clauses.append("assets.removed_scan IS NULL")
+            changes[change] = self._query(
+                f"{self._ASSET_COLUMNS} WHERE {' AND '.join(clauses)}"
+                f" ORDER BY {column}.scanned_at, assets.category, assets.rel_path",
+                params
+            )
+        return changes
+
+    def unused_assets(self, streaming_assets_path=None, category=None):
+        """記録したどのシーンからも参照されていないアセットを返す"""
+        clauses, params = self._filters("assets", category)
+        self._root_filter(clauses, params, streaming_assets_path)
+        clauses.append("assets.removed_scan IS NULL")
+        clauses.append("NOT EXISTS (SELECT 1 FROM scene_references WHERE"
+                       " scene_references.category = assets.category"
+                       " AND scene_references.subfolder_key = assets.subfolder_key"
+                       " AND scene_references.file_key = assets.file_key)")
+        return self._query(f"{self._ASSET_COLUMNS} WHERE {' AND '.join(clauses)}"
+                           " ORDER BY assets.category, assets.rel_path", params)
+
+    def scan_history(self, streaming_assets_path=None, limit=20):
+        """スキャン履歴を新しい順に返す"""
+        if streaming_assets_path:
+            return self._query("SELECT * FROM scans WHERE root = ? ORDER BY id DESC LIMIT ?",
+                               (self._path_key(streaming_assets_path), limit))
+        return self._query("SELECT * FROM scans ORDER BY id DESC LIMIT ?", (limit,))
+
+
+def parse_since(value):
+    """"7"（日数）または "2024-05-01"（日付）を time.time() の値に変換"""
+    if value.isdigit():
+        return time.time() - int(value) * 86400
+    return time.mktime(time.strptime(value, "%Y-%m-%d"))
+
+
+def format_time(timestamp):
+    """time.time() の値を表示用の日時にする"""
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(timestamp)) if timestamp else "-"
+
+
+def main(argv=None):
+    """コマンドラインからカタログを更新・検索し、終了コードを返す"""
+    config_manager = ConfigManager()
+    language = config_manager.get_language()
+
+    parser = argparse.ArgumentParser(description=get_text(language, "catalog_description"))
+    parser.add_argument("--catalog", default=AssetCatalog.CATALOG_FILE, help=get_text(language, "catalog_file_help"))
+    parser.add_argument("--assets", default=config_manager.get_streaming_assets_path(),
+                        help=get_text(language, "batch_assets_help"))
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("scan", help=get_text(language, "catalog_scan_help"))
+    for command in ("assets", "scenes"):
+        subparser = subparsers.add_parser(command, help=get_text(language, f"catalog_{command}_help"))
+        subparser.add_argument("--category", choices=list(AssetManager().category_paths))
+        subparser.add_argument("--subfolder", help=get_text(language, "catalog_subfolder_help"))
+        subparser.add_argument("--name", help=get_text(language, "catalog_name_help"))
+    subparsers.add_parser("changes", help=get_text(language, "catalog_changes_help")).add_argument(
+        "--since", default="7", help=get_text(language, "catalog_since_help"))
+    subparsers.add_parser("unused", help=get_text(language, "catalog_unused_help"))
+    subparsers.add_parser("history", help=get_text(language, "catalog_history_help"))
+    args = parser.parse_args(argv)
+
+    try:
+        catalog = AssetCatalog(args.catalog)
+    except sqlite3.Error as e:
+        print(get_text(language, "catalog_error", error=str(e)), file=sys.stderr)
+        return 2
+
+    with catalog:
+        if args.command == "scan":
+            if not args.assets or not os.path.isdir(args.assets):
+                print(get_text(language, "service_no_assets"), file=sys.stderr)
+                return 2
+            asset_manager = AssetManager(scan_cache=ScanCache())
+            asset_manager.set_streaming_assets_path(args.assets, use_service=True)
+            result = catalog.record_scan(asset_manager)
+            print(get_text(language, "catalog_scanned", path=args.assets, **result))
+        elif args.command == "assets":
+            for asset in catalog.find_assets(args.category, args.subfolder, args.name, args.assets):
+                print(f"{asset['category']}\t{asset['rel_path']}")
+        elif args.command == "scenes":
+            for scene in catalog.scenes_using(args.category, args.subfolder, args.name):
+                print(get_text(language, "catalog_scene_item", **scene))
+        elif args.command == "changes":
+            try:
+                since = parse_since(args.since)
+            except ValueError as e:
+                print(get_text(language, "catalog_error", error=str(e)), file=sys.stderr)
+                return 2
+            changes = catalog.changes_since(since, args.assets)
+            for change, mark, column in (("added", "+", "added_at"), ("removed", "-", "removed_at")):
+                for asset in changes[change]:
+                    print(f"{mark} {format_time(asset[column])}\t{asset['category']}\t{asset['rel_path']}")
+        elif args.command == "unused":
+            for asset in catalog.unused_assets(args.assets):
+                print(f"{asset['category']}\t{asset['rel_path']}")
+        else:
+            for scan in catalog.scan_history(args.assets):
+                print(get_text(language, "catalog_history_item", time=format_time(scan["scanned_at"]), **scan))
+    return 0
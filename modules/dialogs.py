@@ -4,8 +4,12 @@ UIダイアログモジュール
 各種ダイアログクラスを提供します。
 """
 
+import sqlite3
+import time
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, scrolledtext
+
+from .catalog import format_time
 
 
 class LanguageDialog(tk.Toplevel):
@@ -75,3 +79,111 @@ class LanguageDialog(tk.Toplevel):
     def get_selected_language(self):
         """選択された言語を取得"""
         return self.result
+
+
+class CatalogDialog(tk.Toplevel):
+    """カタログ検索ダイアログ（検索結果は一覧に表示し、開いたまま何度でも検索できる）"""
+    
+    CATEGORIES = ("Environment", "Props", "Characters", "Particles")
+    
+    def __init__(self, parent, catalog, streaming_assets_path=None, get_text_func=None):
+        super().__init__(parent)
+        self.parent = parent
+        self.catalog = catalog
+        self.streaming_assets_path = streaming_assets_path
+        self.get_text = get_text_func
+        self.setup_ui()
+        self.transient(parent)
+    
+    def setup_ui(self):
+        """UIをセットアップ"""
+        self.title(self.get_text("dialog_catalog"))
+        self.geometry("760x480")
+        
+        frame = ttk.Frame(self, padding=10)
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        # 検索条件（カテゴリ・サブフォルダ・名前・日数）
+        filter_frame = ttk.Frame(frame)
+        filter_frame.pack(fill=tk.X)
+        self.all_categories = self.get_text("catalog_category_all")
+        self.category_var = tk.StringVar(value=self.all_categories)
+        self.subfolder_var = tk.StringVar()
+        self.name_var = tk.StringVar()
+        self.days_var = tk.StringVar(value="7")
+        ttk.Label(filter_frame, text=self.get_text("catalog_category")).pack(side=tk.LEFT)
+        ttk.Combobox(filter_frame, textvariable=self.category_var, state="readonly", width=12,
+                     values=(self.all_categories,) + self.CATEGORIES).pack(side=tk.LEFT, padx=(5, 10))
+        ttk.Label(filter_frame, text=self.get_text("catalog_subfolder")).pack(side=tk.LEFT)
+        ttk.Entry(filter_frame, textvariable=self.subfolder_var, width=16).pack(side=tk.LEFT, padx=(5, 10))
+        ttk.Label(filter_frame, text=self.get_text("catalog_name")).pack(side=tk.LEFT)
+        ttk.Entry(filter_frame, textvariable=self.name_var, width=16).pack(side=tk.LEFT, padx=(5, 10))
+        ttk.Label(filter_frame, text=self.get_text("catalog_days")).pack(side=tk.LEFT)
+        ttk.Spinbox(filter_frame, textvariable=self.days_var, from_=1, to=3650, width=5).pack(side=tk.LEFT, padx=(5, 0))
+        
+        # 検索の種類ごとのボタン
+        button_frame = ttk.Frame(frame)
+        button_frame.pack(fill=tk.X, pady=(10, 10))
+        for text_key, command in (("catalog_find_scenes", self.find_scenes),
+                                  ("catalog_find_assets", self.find_assets),
+                                  ("catalog_find_changes", self.find_changes),
+                                  ("catalog_find_unused", self.find_unused),
+                                  ("catalog_show_history", self.show_history)):
+            ttk.Button(button_frame, text=self.get_text(text_key), command=command).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_frame, text=self.get_text("dialog_ok"), command=self.destroy).pack(side=tk.RIGHT)
+        
+        self.result_text = scrolledtext.ScrolledText(frame, wrap=tk.NONE, height=20)
+        self.result_text.pack(fill=tk.BOTH, expand=True)
+        self.result_text.config(state=tk.DISABLED)
+    
+    def _filters(self):
+        """入力された検索条件 (カテゴリ, サブフォルダ, 名前)（未入力はNone）"""
+        category = self.category_var.get()
+        return (category if category in self.CATEGORIES else None,
+                self.subfolder_var.get().strip() or None,
+                self.name_var.get().strip() or None)
+    
+    def _show_lines(self, search):
+        """検索を実行して結果の行を表示（カタログのエラーはそのまま表示）"""
+        try:
+            lines = search()
+        except (sqlite3.Error, ValueError) as e:
+            lines = [self.get_text("catalog_error", error=str(e))]
+        else:
+            lines = [self.get_text("catalog_result_count", count=len(lines))] + lines if lines else \
+                [self.get_text("catalog_no_results")]
+        self.result_text.config(state=tk.NORMAL)
+        self.result_text.delete(1.0, tk.END)
+        self.result_text.insert(tk.END, "\n".join(lines))
+        self.result_text.config(state=tk.DISABLED)
+    
+    def find_scenes(self):
+        """条件に一致するアセットを使っているシーン"""
+        self._show_lines(lambda: [self.get_text("catalog_scene_item", **scene)
+                                  for scene in self.catalog.scenes_using(*self._filters())])
+    
+    def find_assets(self):
+        """条件に一致するアセット"""
+        self._show_lines(lambda: [f"{asset['category']}\t{asset['rel_path']}" for asset in
+                                  self.catalog.find_assets(*self._filters(), self.streaming_assets_path)])
+    
+    def find_changes(self):
+        """指定した日数のうちに追加・削除されたアセット"""
+        def search():
+            since = time.time() - int(self.days_var.get()) * 86400
+            changes = self.catalog.changes_since(since, self.streaming_assets_path)
+            return [f"{mark} {format_time(asset[column])}\t{asset['category']}\t{asset['rel_path']}"
+                    for change, mark, column in (("added", "+", "added_at"), ("removed", "-", "removed_at"))
+                    for asset in changes[change]]
+        self._show_lines(search)
+    
+    def find_unused(self):
+        """記録したどのシーンからも参照されていないアセット"""
+        category = self._filters()[0]
+        self._show_lines(lambda: [f"{asset['category']}\t{asset['rel_path']}" for asset in
+                                  self.catalog.unused_assets(self.streaming_assets_path, category)])
+    
+    def show_history(self):
+        """スキャン履歴"""
+        self._show_lines(lambda: [self.get_text("catalog_history_item", time=format_time(scan["scanned_at"]), **scan)
+                                  for scan in self.catalog.scan_history(self.streaming_assets_path)])
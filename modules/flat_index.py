@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""
+フラットインデックスモジュール
+存在確認用のインデックスを、解析せずにそのまま検索できる1つのバイト列（ファイル）に変換します。
+
+ファイルの構成（数値はすべてリトルエンディアン）:
+    ヘッダー     マジックナンバー, バージョン, フラグ, 項目数, メタデータの長さ,
+                 本体のCRC32, ヘッダーのCRC32
+    メタデータ   JSON（StreamingAssetsのパス, インデックスの指紋, カテゴリごとの数, 作成日時,
+                 ディレクトリごとの更新時刻）
+    項目表       キーのバイト列の順にソートした固定長の項目
+                 （キーと相対パスの文字列ヒープ内の位置と長さ, カテゴリ, ファイルサイズ）
+    文字列ヒープ 相対パス（スキャンした順）とキー "カテゴリ\\0サブフォルダ\\0ファイル名"（正規形）のUTF-8
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from contextlib import contextmanager
+
+from .asset_manager import AssetManager
+from .config import ConfigManager
+from .scan_cache import ScanCache
+from .translations import get_text
+
+# ヘッダー: マジックナンバー, バージョン, フラグ, 項目数, メタデータの長さ, 本体のCRC32, ヘッダーのCRC32
+_HEADER = struct.Struct("<8sIIIIII")
+# 項目: キーの位置, キーの長さ, 相対パスの位置, 相対パスの長さ, カテゴリ番号, ファイルサイズ
+_ENTRY = struct.Struct("<IIIIB3xQ")
+
+MAGIC = b"WSCFLAT\0"
+VERSION = 2
+
+# フラグ: ファイルサイズを記録している
+FLAG_FILE_SIZES = 1
+
+# 永続化したインデックスファイルの既定の場所
+INDEX_FILE = os.path.join(os.path.dirname(ConfigManager.SETTINGS_FILE), "asset_index.idx")
+
+
+class IndexFileError(ValueError):
+    """インデックスファイルの形式が異なる・壊れている"""
+
+
+def encode_key(category, key):
+    """(カテゴリ, インデックスのキー) をバイト列に変換（サブフォルダなしは空文字列）"""
+    subfolder, filename = key
+    return f"{category}\0{subfolder or ''}\0{filename}".encode("utf-8")
+
+
+def decode_key(data):
+    """encode_key() のバイト列を (カテゴリ, インデックスのキー) に戻す"""
+    category, subfolder, filename = data.decode("utf-8").split("\0")
+    return category, (subfolder or None, filename)
+
+
+def encode_asset_index(asset_manager, persistent=False):
+    """AssetManagerのインデックスをフラットインデックスのバイト列に変換
+
+    persistentの場合（ファイルに保存して次回以降も使う場合）は、各ファイルのサイズと
+    インデックスの指紋、スキャンした各ディレクトリの更新時刻も記録します。
+    ワーカープロセスとの一時的な共有では省略します。
+    """
+    categories = list(asset_manager.category_paths)
+    entries = []
+    paths = []
+    position = 0
+    for category_number, (category, assets) in enumerate(asset_manager.asset_files.items()):
+        for asset in assets:
+            size = 0
+            if persistent:
+                try:
+                    size = os.stat(asset.full_path).st_size
+                except OSError:
+                    pass
+            # 相対パスはスキャンした順にヒープに置く（位置の順がアセット一覧の順になる）
+            rel_path = asset.rel_path.encode("utf-8")
+            entries.append((encode_key(category, asset_manager._asset_key(asset)),
+                            position, len(rel_path), category_number, size))
+            paths.append(rel_path)
+            position += len(rel_path)
+    entries.sort()
+
+    metadata = json.dumps({
+        "streaming_assets_path": os.path.abspath(asset_manager.streaming_assets_path),
+        "categories": categories,
+        "assets": {category: len(assets) for category, assets in asset_manager.asset_files.items()},
+        "fingerprint": asset_manager.get_index_fingerprint() if persistent else None,
+        "directories": asset_manager.get_directory_mtimes() if persistent else None,
+        "built_at": time.time()
+    }, ensure_ascii=False).encode("utf-8")
+
+    # 項目表と文字列ヒープ（位置はヒープの先頭から、キーは相対パスの後ろ）
+    table = bytearray(_ENTRY.size * len(entries))
+    for number, (key, path_position, path_length, category_number, size) in enumerate(entries):
+        _ENTRY.pack_into(table, number * _ENTRY.size, position, len(key),
+                         path_position, path_length, category_number, size)
+        position += len(key)
+
+    body = b"".join((metadata, table, *paths, *(entry[0] for entry in entries)))
+    flags = FLAG_FILE_SIZES if persistent else 0
+    header = _HEADER.pack(MAGIC, VERSION, flags, len(entries), len(metadata), zlib.crc32(body), 0)
+    header = header[:-4] + struct.pack("<I", zlib.crc32(header[:-4]))
+    return header + body
+
+
+def write_index_file(asset_manager, file_path=None, persistent=True):
+    """インデックスをファイルに書き出す（書き終えてから置き換えるため、読み込み中のプロセスに影響しない）"""
+    file_path = file_path or INDEX_FILE
+    directory = os.path.dirname(os.path.abspath(file_path))
+    handle, temporary_path = tempfile.mkstemp(prefix="asset_index_", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(handle, "wb") as file:
+            file.write(encode_asset_index(asset_manager, persistent))
+        os.replace(temporary_path, file_path)
+    except BaseException:
+        try:
+            os.remove(temporary_path)
+        except OSError:
+            pass
+        raise
+    return file_path
+
+
+class FlatAssetIndex:
+    """フラットインデックスの検索クラス
+
+    バイト列（mmapしたファイルなど）を読み込まずにそのまま二分探索するため、
+    インデックスの大きさによらず、開いてすぐに存在確認ができます。
+    開くときにヘッダーのCRC32で壊れていないかを確認し（verifyの場合は本体も）、
+    異なる形式や壊れたファイルには IndexFileError を送出します。
+    """
+
+    def __init__(self, buffer, verify=True):
+        if len(buffer) < _HEADER.size:
+            raise IndexFileError("index file is truncated")
+        magic, version, flags, count, metadata_length, body_checksum, header_checksum = \
+            _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise IndexFileError("not an asset index file")
+        if version != VERSION:
+            raise IndexFileError(f"unsupported index version {version}")
+        if zlib.crc32(bytes(buffer[:_HEADER.size - 4])) != header_checksum:
+            raise IndexFileError("index header checksum mismatch")
+        self._table_offset = _HEADER.size + metadata_length
+        self._heap_offset = self._table_offset + _ENTRY.size * count
+        if len(buffer) < self._heap_offset:
+            raise IndexFileError("index file is truncated")
+        if verify:
+            view = memoryview(buffer)
+            body = view[_HEADER.size:]
+            try:
+                checksum = zlib.crc32(body)
+            finally:
+                body.release()
+                view.release()
+            if checksum != body_checksum:
+                raise IndexFileError("index body checksum mismatch")
+        try:
+            self.metadata = json.loads(bytes(buffer[_HEADER.size:self._table_offset]))
+        except ValueError as e:
+            raise IndexFileError(f"invalid index metadata: {e}") from e
+        self.flags = flags
+        self._buffer = buffer
+        self._count = count
+        self._file = None
+
+    @classmethod
+    def open_file(cls, file_path, verify=True):
+        """ファイルを読み取り専用でmmapして開く（内容はOSのページキャッシュと共有される）"""
+        file = open(file_path, "rb")
+        buffer = None
+        try:
+            if os.fstat(file.fileno()).st_size < _HEADER.size:
+                raise IndexFileError("index file is truncated")
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            index = cls(buffer, verify)
+        except (OSError, ValueError, struct.error):
+            if buffer is not None:
+                buffer.close()
+            file.close()
+            raise
+        index._file = file
+        return index
+
+    def close(self):
+        """mmapしたファイルを閉じる"""
+        if self._file:
+            self._buffer.close()
+            self._file.close()
+            self._file = None
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def has_file_sizes(self):
+        """ファイルサイズを記録しているか"""
+        return bool(self.flags & FLAG_FILE_SIZES)
+
+    def is_for(self, streaming_assets_path):
+        """指定したStreamingAssetsフォルダのインデックスか"""
+        recorded = self.metadata.get("streaming_assets_path") or ""
+        return os.path.normcase(recorded) == os.path.normcase(os.path.abspath(streaming_assets_path))
+
+    def changed_directory(self):
+        """作成後に変更されたディレクトリの相対パスを返す（変更がなければNone）
+
+        スキャン時に記録した各ディレクトリの更新時刻(mtime_ns)を現在の値と比べます
+        （ScanCacheと同じ判定）。ファイルやフォルダの追加・削除・名前の変更で親ディレクトリの
+        更新時刻が変わるため、ファイル自体は読まずにディレクトリごとのstatだけで済みます。
+        更新時刻を記録していないファイルは、変更されているものとして扱います。
+        """
+        root = self.metadata.get("streaming_assets_path") or ""
+        directories = self.metadata.get("directories")
+        if not directories:
+            return "."
+        for rel_dir, mtime_ns in directories.items():
+            try:
+                if os.stat(os.path.join(root, rel_dir) if rel_dir else root).st_mtime_ns != mtime_ns:
+                    return rel_dir or "."
+            except OSError:
+                # ディレクトリがなくなった・読めない
+                return rel_dir or "."
+        return None
+
+    def _entry(self, number):
+        """number番目の項目 (キーの位置, キーの長さ, 相対パスの位置, 相対パスの長さ, カテゴリ番号, サイズ)"""
+        return _ENTRY.unpack_from(self._buffer, self._table_offset + number * _ENTRY.size)
+
+    def _string(self, position, length):
+        """文字列ヒープのバイト列"""
+        start = self._heap_offset + position
+        return bytes(self._buffer[start:start + length])
+
+    def _key_at(self, number):
+        """number番目のキーのバイト列"""
+        position, length = _ENTRY.unpack_from(self._buffer, self._table_offset + number * _ENTRY.size)[:2]
+        return self._string(position, length)
+
+    def contains(self, category, key):
+        """(カテゴリ, インデックスのキー) が含まれるか二分探索で確認"""
+        target = encode_key(category, key)
+        low = 0
+        high = self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        return low < self._count and self._key_at(low) == target
+
+    def iter_assets(self):
+        """すべてのアセットを (カテゴリ, インデックスのキー, アセット情報の辞書) でスキャンした順に返す"""
+        categories = self.metadata["categories"]
+        root = self.metadata["streaming_assets_path"]
+        entries = sorted((self._entry(number) for number in range(self._count)), key=lambda entry: entry[2])
+        for key_position, key_length, path_position, path_length, category_number, size in entries:
+            category, key = decode_key(self._string(key_position, key_length))
+            rel_path = self._string(path_position, path_length).decode("utf-8")
+            yield category, key, {
+                "name": os.path.splitext(os.path.basename(rel_path))[0],
+                "full_path": os.path.join(root, rel_path).replace("\\", "/"),
+                "rel_path": rel_path,
+                "category": categories[category_number],
+                "subfolder_name": key[0] or "",
+                "size": size if self.has_file_sizes else None
+            }
+
+    def find_unused(self, referenced_keys):
+        """参照キーに一致しないアセットをカテゴリごとに返す（アセット情報は辞書）
+
+        AssetManager.find_unused_assets() と同じく、キーが最初に現れた順に
+        同じキーのアセットをまとめて返します。
+        """
+        groups = {category: {} for category in self.metadata["categories"]}
+        for category, key, asset in self.iter_assets():
+            if key not in referenced_keys.get(category, ()):
+                groups[category].setdefault(key, []).append(asset)
+        return {category: [asset for assets in keys.values() for asset in assets]
+                for category, keys in groups.items()}
+
+
+def load_index_file(streaming_assets_path, file_path=None):
+    """StreamingAssetsフォルダのインデックスファイルを開く
+
+    ない・別のフォルダ用・壊れている場合と、作成後にカテゴリのフォルダが変更されている
+    （アセットが追加・削除された）場合はNoneを返し、呼び出し側はスキャンします。
+    """
+    try:
+        index = FlatAssetIndex.open_file(file_path or INDEX_FILE)
+    except (OSError, ValueError, struct.error):
+        return None
+    if not index.is_for(streaming_assets_path) or index.changed_directory() is not None:
+        index.close()
+        return None
+    return index
+
+
+@contextmanager
+def temporary_flat_index(asset_manager):
+    """インデックスを一時ファイルに書き出し、そのパスを渡す（終了時に削除）"""
+    handle, file_path = tempfile.mkstemp(prefix="warudo_index_", suffix=".idx")
+    try:
+        with os.fdopen(handle, "wb") as file:
+            file.write(encode_asset_index(asset_manager))
+        yield file_path
+    finally:
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+
+
+def main(argv=None):
+    """インデックスファイルを作り直す（--verify の場合は壊れていないか確認する）"""
+    config_manager = ConfigManager()
+    language = config_manager.get_language()
+
+    parser = argparse.ArgumentParser(description=get_text(language, "index_description"))
+    parser.add_argument("--assets", default=config_manager.get_streaming_assets_path(),
+                        help=get_text(language, "batch_assets_help"))
+    parser.add_argument("--output", default=INDEX_FILE, help=get_text(language, "index_output_help"))
+    parser.add_argument("--verify", action="store_true", help=get_text(language, "index_verify_help"))
+    args = parser.parse_args(argv)
+
+    if args.verify:
+        try:
+            index = FlatAssetIndex.open_file(args.output)
+        except (OSError, ValueError, struct.error) as e:
+            print(get_text(language, "index_invalid", path=args.output, error=str(e)), file=sys.stderr)
+            return 1
+        metadata = index.metadata
+        changed = index.changed_directory()
+        index.close()
+        if changed is not None:
+            print(get_text(language, "index_outdated", path=args.output, directory=changed), file=sys.stderr)
+            return 1
+        print(get_text(language, "index_valid", path=args.output, count=len(index),
+                       assets=metadata["streaming_assets_path"],
+                       built=time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(metadata["built_at"]))))
+        return 0
+
+    if not args.assets or not os.path.isdir(args.assets):
+        print(get_text(language, "service_no_assets"), file=sys.stderr)
+        return 2
+    start = time.perf_counter()
+    asset_manager = AssetManager(scan_cache=ScanCache())
+    asset_manager.set_streaming_assets_path(args.assets)
+    try:
+        write_index_file(asset_manager, args.output)
+    except OSError as e:
+        print(get_text(language, "file_error", error=str(e)), file=sys.stderr)
+        return 2
+    print(get_text(language, "index_built", path=args.output, assets=args.assets,
+                   count=sum(asset_manager.get_asset_summary().values()), seconds=time.perf_counter() - start))
+    return 0
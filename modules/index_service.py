@@ -0,0 +1,442 @@
+# -*- coding: utf-8 -*-
+"""
+インデックスサービスモジュール
+StreamingAssetsのインデックスをメモリに保持し続け、存在確認やシーンのチェックの問い合わせに
+ローカルのHTTP（JSON）で答えるサービスと、そのクライアントを提供します。
+"""
+
+import argparse
+import http.client
+import ipaddress
+import json
+import os
+import signal
+import sys
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .analyzer import SceneAnalyzer
+from .asset_manager import AssetManager
+from .batch import check_scene
+from .config import ConfigManager
+from .scan_cache import ScanCache
+from .translations import get_text
+
+# 起動中のサービスの接続先を書き出すファイル（クライアントはこのファイルでサービスを見つける）
+SERVICE_FILE = os.path.join(os.path.dirname(ConfigManager.SETTINGS_FILE), "index_service.json")
+
+
+class IndexServiceError(OSError):
+    """インデックスサービスとの通信エラー（応答がない・エラーが返された）"""
+
+
+def _root_key(root):
+    """StreamingAssetsのパスを比較用に変換"""
+    return os.path.normcase(os.path.abspath(root)) if root else ""
+
+
+def is_loopback(host):
+    """アドレスがIPv4のループバック（127.0.0.0/8 または localhost）かどうか
+
+    サーバーはIPv4でのみ待ち受けるため、IPv6のアドレス（::1 など）は受け付けません。
+    """
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.IPv4Address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class IndexService:
+    """StreamingAssetsのインデックスを保持し続けるローカルサービスクラス
+
+    起動時に一度だけスキャンし、その後はフォルダの監視で検出した変更を
+    interval秒ごとにインデックスに反映します（フォルダ全体は再スキャンしない）。
+    問い合わせはスレッドごとに並行して処理し、変更の反映は処理中の問い合わせが
+    なくなってから行います。反映を待っている間は新しい問い合わせを待たせるため、
+    問い合わせが続いても反映が後回しになり続けることはありません。
+    IPv4のループバック以外のアドレスでは起動できず（ValueError）、ループバック以外からの
+    問い合わせには403を返します（認証がないため、ファイルの有無を外部に答えない）。
+
+    問い合わせ（すべてJSON）:
+        GET  /status  → streaming_assets_path / assets（カテゴリごとの数）/ fingerprint / generation
+        POST /exists  {"category", "paths": [...]} → {"exists": [...]}
+        POST /check   {"scene", "language", "references", "records"} → 一括チェックと同じ結果の辞書
+        POST /unused  {"keys": {カテゴリ: [[サブフォルダ, ファイル名], ...]}} → {"unused": {カテゴリ: [...]}}
+    """
+
+    REVALIDATE_INTERVAL = 1.0
+
+    def __init__(self, asset_manager, host="127.0.0.1", port=0, interval=None):
+        if not is_loopback(host):
+            raise ValueError(f"index service must listen on an IPv4 loopback address: {host}")
+        self.asset_manager = asset_manager
+        self.analyzer = SceneAnalyzer(asset_manager)
+        self.interval = interval or self.REVALIDATE_INTERVAL
+        self.revalidations = 0
+        self._routes = {
+            "/status": self._handle_status,
+            "/exists": self._handle_exists,
+            "/check": self._handle_check,
+            "/unused": self._handle_unused
+        }
+
+        # 問い合わせ中の数（インデックスの変更は0になるまで待つ）と、変更の反映を待っている数
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writers = 0
+        self._stopped = threading.Event()
+        self._threads = []
+        self._service_file = None
+
+        self.server = ThreadingHTTPServer((host, port), _RequestHandler)
+        self.server.service = self
+
+    @property
+    def url(self):
+        """サービスのURL"""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """フォルダの監視と問い合わせの受け付けを開始"""
+        self.asset_manager.start_watching()
+        for target in (self.server.serve_forever, self._revalidate_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        """サービスを停止し、接続先のファイルを削除"""
+        self._stopped.set()
+        if self._threads:
+            self.server.shutdown()
+        self.server.server_close()
+        self.asset_manager.stop_watching()
+        self.remove_service_file()
+
+    def wait(self):
+        """停止されるまで待つ（Ctrl+CでKeyboardInterrupt）"""
+        while not self._stopped.wait(0.5):
+            pass
+
+    def write_service_file(self, service_file=None):
+        """クライアント用に接続先をファイルに書き出す"""
+        self._service_file = service_file or SERVICE_FILE
+        host, port = self.server.server_address[:2]
+        with open(self._service_file, "w", encoding="utf-8") as file:
+            json.dump({
+                "host": host,
+                "port": port,
+                "pid": os.getpid(),
+                "streaming_assets_path": os.path.abspath(self.asset_manager.streaming_assets_path)
+            }, file, ensure_ascii=False)
+
+    def remove_service_file(self):
+        """書き出した接続先のファイルを削除（別のサービスが書き換えていれば残す）"""
+        if not self._service_file:
+            return
+        try:
+            with open(self._service_file, "r", encoding="utf-8") as file:
+                if json.load(file).get("pid") == os.getpid():
+                    os.remove(self._service_file)
+        except (OSError, ValueError):
+            pass
+        self._service_file = None
+
+    @contextmanager
+    def reading(self):
+        """インデックスを読む問い合わせの間、変更の反映を待たせる（反映を待っている間は先に反映する）"""
+        with self._condition:
+            while self._writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield self.asset_manager
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    def revalidate(self):
+        """監視で検出した変更をインデックスに反映し、変更のあったキーの数を返す"""
+        with self._condition:
+            self._writers += 1
+            try:
+                while self._readers:
+                    self._condition.wait()
+                affected = self.asset_manager.apply_watch_changes()
+            finally:
+                self._writers -= 1
+                self._condition.notify_all()
+        self.revalidations += 1
+        return sum(len(keys) for keys in affected.values())
+
+    def _revalidate_loop(self):
+        """interval秒ごとに変更を反映"""
+        while not self._stopped.wait(self.interval):
+            self.revalidate()
+
+    def handle(self, path, payload):
+        """問い合わせを処理して (HTTPステータス, 応答の辞書) を返す"""
+        if self._stopped.is_set():
+            # 停止後も残っている接続には答えない（クライアントはローカルのスキャンに切り替える）
+            return 503, {"error": "service stopped"}
+        handler = self._routes.get(path)
+        if handler is None:
+            return 404, {"error": f"unknown request: {path}"}
+        try:
+            return 200, handler(payload or {})
+        except (KeyError, TypeError, ValueError) as e:
+            return 400, {"error": f"invalid request: {e!r}"}
+
+    def _handle_status(self, payload):
+        with self.reading() as asset_manager:
+            return {
+                "streaming_assets_path": os.path.abspath(asset_manager.streaming_assets_path),
+                "assets": asset_manager.get_asset_summary(),
+                "fingerprint": asset_manager.get_index_fingerprint(),
+                "generation": asset_manager.index_generation,
+                "watching": asset_manager.watcher is not None,
+                "revalidations": self.revalidations
+            }
+
+    def _handle_exists(self, payload):
+        category = payload["category"]
+        with self.reading() as asset_manager:
+            return {"exists": [asset_manager.check_file_exists(path, category) for path in payload["paths"]]}
+
+    def _handle_check(self, payload):
+        language = payload.get("language", "ja")
+        get_text_func = lambda key, **kwargs: get_text(language, key, **kwargs)
+        with self.reading():
+            return check_scene(self.analyzer, payload["scene"], get_text_func,
+                               bool(payload.get("references")), bool(payload.get("records")))
+
+    def _handle_unused(self, payload):
+        referenced_keys = {
+            category: {(subfolder, filename) for subfolder, filename in keys}
+            for category, keys in payload["keys"].items()
+        }
+        with self.reading() as asset_manager:
+            unused = asset_manager.find_unused_assets(referenced_keys)
+            return {"unused": {category: [asset.to_dict() for asset in assets]
+                               for category, assets in unused.items()}}
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """JSONの問い合わせをIndexServiceに渡すハンドラー（接続は使い回せる）"""
+
+    protocol_version = "HTTP/1.1"
+    # ヘッダーと本文を別々に送るため、Nagleアルゴリズムによる応答の遅延(約40ms)を避ける
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if self._reject_remote():
+            return
+        self._respond(*self.server.service.handle(self.path, None))
+
+    def do_POST(self):
+        if self._reject_remote():
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as e:
+            self._respond(400, {"error": f"invalid JSON: {e}"})
+            return
+        self._respond(*self.server.service.handle(self.path, payload))
+
+    def _reject_remote(self):
+        """ループバック以外からの問い合わせに403を返す（返した場合はTrue）"""
+        if is_loopback(self.client_address[0]):
+            return False
+        self.close_connection = True
+        self._respond(403, {"error": "only local requests are accepted"})
+        return True
+
+    def _respond(self, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """問い合わせごとのログは出力しない"""
+
+
+class IndexServiceClient:
+    """インデックスサービスのクライアントクラス
+
+    接続は問い合わせごとに作らず使い回します（切断されていれば一度だけ接続し直す）。
+    プロセス間で受け渡すと、受け取った側で新しく接続します。
+    """
+
+    REQUEST_TIMEOUT = 60.0
+
+    def __init__(self, host, port, timeout=None):
+        self.host = host
+        self.port = port
+        self.timeout = timeout or self.REQUEST_TIMEOUT
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_connection"] = None
+        state["_lock"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        """サービスのURL"""
+        return f"http://{self.host}:{self.port}"
+
+    def close(self):
+        """接続を閉じる"""
+        with self._lock:
+            if self._connection:
+                self._connection.close()
+                self._connection = None
+
+    def request(self, path, payload=None):
+        """問い合わせを送り、応答の辞書を返す（payloadがなければGET）"""
+        body = None if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        headers = {"Content-Type": "application/json; charset=utf-8"} if body is not None else {}
+        with self._lock:
+            for attempt in range(2):
+                if self._connection is None:
+                    self._connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+                try:
+                    self._connection.request("GET" if body is None else "POST", path, body, headers)
+                    response = self._connection.getresponse()
+                    data = response.read()
+                    break
+                except (OSError, http.client.HTTPException) as e:
+                    # サービス側で閉じられた使い回しの接続は一度だけ接続し直す
+                    self._connection.close()
+                    self._connection = None
+                    if attempt:
+                        raise IndexServiceError(f"{self.url}{path}: {e}") from e
+        try:
+            result = json.loads(data)
+        except ValueError as e:
+            raise IndexServiceError(f"{self.url}{path}: {e}") from e
+        if response.status != 200:
+            raise IndexServiceError(f"{self.url}{path}: {result.get('error')}")
+        return result
+
+    def status(self):
+        """サービスの状態（StreamingAssetsのパス、アセット数、インデックスの指紋など）"""
+        return self.request("/status")
+
+    def check_files(self, category, asset_paths):
+        """参照パスのリストの存在確認（1回の問い合わせ）"""
+        return self.request("/exists", {"category": category, "paths": list(asset_paths)})["exists"]
+
+    def check_scene(self, scene_path, language="ja", collect_references=False, collect_records=False):
+        """シーンファイルをサービス側でチェック（結果は一括チェックの1シーン分と同じ形式）"""
+        return self.request("/check", {
+            "scene": os.path.abspath(scene_path),
+            "language": language,
+            "references": collect_references,
+            "records": collect_records
+        })
+
+    def find_unused(self, referenced_keys):
+        """参照キーに一致しないアセットをカテゴリごとに返す（アセット情報は辞書）"""
+        keys = {category: [list(key) for key in category_keys]
+                for category, category_keys in referenced_keys.items()}
+        return self.request("/unused", {"keys": keys})["unused"]
+
+
+def find_index_service(streaming_assets_path, service_file=None, timeout=0.5):
+    """同じStreamingAssetsフォルダのインデックスサービスが起動していればクライアントを返す（なければNone）"""
+    if not streaming_assets_path:
+        return None
+    try:
+        with open(service_file or SERVICE_FILE, "r", encoding="utf-8") as file:
+            info = json.load(file)
+        if _root_key(info["streaming_assets_path"]) != _root_key(streaming_assets_path):
+            return None
+        client = IndexServiceClient(info["host"], info["port"], timeout)
+        status = client.status()
+    except (OSError, ValueError, KeyError, TypeError):
+        # ファイルがない・サービスが終了している（接続先のファイルだけが残っている）
+        return None
+    client.close()
+    client.timeout = IndexServiceClient.REQUEST_TIMEOUT
+    if _root_key(status.get("streaming_assets_path")) != _root_key(streaming_assets_path):
+        return None
+    return client
+
+
+def main(argv=None):
+    """インデックスサービスを起動し、停止（Ctrl+C）されるまで問い合わせに答える"""
+    config_manager = ConfigManager()
+    language = config_manager.get_language()
+
+    parser = argparse.ArgumentParser(description=get_text(language, "service_description"))
+    parser.add_argument("--assets", default=config_manager.get_streaming_assets_path(),
+                        help=get_text(language, "batch_assets_help"))
+    parser.add_argument("--host", default="127.0.0.1", help=get_text(language, "service_host_help"))
+    parser.add_argument("--port", type=int, default=0, help=get_text(language, "service_port_help"))
+    parser.add_argument("--interval", type=float, default=IndexService.REVALIDATE_INTERVAL,
+                        help=get_text(language, "service_interval_help"))
+    parser.add_argument("--status", action="store_true", help=get_text(language, "service_status_help"))
+    args = parser.parse_args(argv)
+
+    if args.status:
+        client = find_index_service(args.assets)
+        if client is None:
+            print(get_text(language, "service_not_running"))
+            return 1
+        status = client.status()
+        print(get_text(language, "service_status", url=client.url, path=status["streaming_assets_path"],
+                       count=sum(status["assets"].values()), generation=status["generation"]))
+        return 0
+
+    if not args.assets or not os.path.isdir(args.assets):
+        print(get_text(language, "service_no_assets"), file=sys.stderr)
+        return 2
+    if not is_loopback(args.host):
+        print(get_text(language, "service_host_not_local", host=args.host), file=sys.stderr)
+        return 2
+
+    # インデックスは起動時に一度だけ作成し、以降は監視で変更分だけを反映する
+    asset_manager = AssetManager(scan_cache=ScanCache())
+    asset_manager.set_streaming_assets_path(args.assets)
+    try:
+        service = IndexService(asset_manager, args.host, args.port, args.interval)
+    except OSError as e:
+        print(get_text(language, "file_error", error=str(e)), file=sys.stderr)
+        return 2
+    service.start()
+    try:
+        service.write_service_file()
+    except OSError as e:
+        service.stop()
+        print(get_text(language, "file_error", error=str(e)), file=sys.stderr)
+        return 2
+    print(get_text(language, "service_started", url=service.url, path=args.assets,
+                   count=sum(asset_manager.get_asset_summary().values())))
+    # 終了要求(SIGTERM)でも接続先のファイルを削除してから終了する
+    signal.signal(signal.SIGTERM, lambda signum, frame: service._stopped.set())
+    try:
+        service.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+    print(get_text(language, "service_stopped"))
+    return 0
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+計測モジュール
+処理フェーズごとの経過時間・件数・ピークメモリを記録します。
+"""
+
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from .config import ConfigManager
+
+
+class PhaseRecord:
+    """1つの処理フェーズの計測結果"""
+
+    __slots__ = ("name", "seconds", "items", "peak_bytes")
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.items = None
+        self.peak_bytes = None
+
+    def to_dict(self):
+        """辞書に変換"""
+        return {
+            "name": self.name,
+            "seconds": self.seconds,
+            "items": self.items,
+            "peak_bytes": self.peak_bytes
+        }
+
+
+class PhaseProfiler:
+    """処理フェーズの計測クラス
+
+    使い方:
+        profiler = PhaseProfiler(trace_memory=True)
+        with profiler.phase("extract_objects") as record:
+            extracted = analyzer.extract_objects(data)
+            record.items = len(extracted["props"])
+
+    trace_memory を有効にすると tracemalloc でフェーズ中のピークメモリも記録します
+    （tracemalloc は処理を遅くするため、デバッグ表示が有効な場合のみ使用します）。
+    """
+
+    LOG_FILE = os.path.join(os.path.dirname(ConfigManager.SETTINGS_FILE), "debug_log.jsonl")
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.records = []
+
+    @contextmanager
+    def phase(self, name, items=None):
+        """フェーズを計測するコンテキストマネージャー（計測結果のレコードを返す）"""
+        record = PhaseRecord(name)
+        record.items = items
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - start
+            if self.trace_memory:
+                record.peak_bytes = max(tracemalloc.get_traced_memory()[1] - base, 0)
+                if started_tracing:
+                    tracemalloc.stop()
+            self.records.append(record)
+
+    def extend(self, other):
+        """他の計測結果を追加"""
+        if other:
+            self.records.extend(other.records)
+
+    def to_dict(self):
+        """計測結果を辞書に変換"""
+        return {
+            "total_seconds": sum(record.seconds for record in self.records),
+            "phases": [record.to_dict() for record in self.records]
+        }
+
+    def format_text(self):
+        """計測結果を表示用のテキストにする"""
+        lines = []
+        for record in self.records:
+            line = f"{record.name:<24}{record.seconds * 1000:>10.1f} ms"
+            if record.items is not None:
+                line += f"  items={record.items}"
+            if record.peak_bytes is not None:
+                line += f"  peak={record.peak_bytes / (1024 * 1024):.2f} MB"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def append_to_log(self, log_file=None, **context):
+        """計測結果をJSONL形式のログに1行追加"""
+        entry = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        entry.update(context)
+        entry.update(self.to_dict())
+        try:
+            with open(log_file or self.LOG_FILE, "a", encoding="utf-8") as file:
+                file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"デバッグログの保存エラー: {e}")
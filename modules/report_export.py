@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+レポート出力モジュール
+分析結果（参照と問題点）を機械で読める形式（JSONL / JSON / CSV / JUnit XML）で書き出します。
+"""
+
+import csv
+import json
+import os
+from xml.sax.saxutils import escape, quoteattr
+
+from .analyzer import SceneAnalyzer
+
+# レコードの項目（CSVの列の順序）
+#   record: "reference"（参照） / "issue"（問題点） / "unused"（未使用ファイル） / "error"（読み込みエラー）
+#   issue: 問題の種類 "subfolder" / "missing"（recordが "issue" の場合）
+REPORT_FIELDS = ("record", "scene", "category", "name", "path", "count",
+                 "subfolder", "workshop", "exists", "issue", "message")
+
+
+def iter_scene_records(scene_path, verifications, get_text_func, error=None):
+    """1つのシーンの参照と問題点のレコードを順に生成
+
+    verificationsは SceneAnalyzer.verify_paths() の結果です。
+    errorを指定した場合（シーンを読み込めなかった場合）はエラーのレコードだけを生成します。
+    """
+    if error is not None:
+        yield {"record": "error", "scene": scene_path, "message": error}
+        return
+
+    for category, records in verifications.items():
+        for record in records:
+            yield {
+                "record": "reference",
+                "scene": scene_path,
+                "category": category,
+                "name": record.name,
+                "path": record.path,
+                "count": record.count,
+                "subfolder": record.subfolder,
+                "workshop": record.workshop,
+                "exists": record.exists
+            }
+
+    # 問題点（サマリーと同じ文面をmessageに入れる）
+    for category, _, type_key in SceneAnalyzer.SUBFOLDER_CHECKS:
+        type_name = get_text_func(type_key)
+        for record in verifications.get(category, ()):
+            if record.subfolder is not None:
+                yield {
+                    "record": "issue",
+                    "scene": scene_path,
+                    "category": category,
+                    "name": record.name,
+                    "path": record.path,
+                    "subfolder": record.subfolder,
+                    "issue": "subfolder",
+                    "message": get_text_func("subfolder_move", type=type_name, name=record.name,
+                                             folder=record.subfolder, category=category)
+                }
+    for category, records in verifications.items():
+        type_name = get_text_func(SceneAnalyzer.CATEGORY_NAME_KEYS.get(category, category))
+        for record in records:
+            if record.exists is False:
+                yield {
+                    "record": "issue",
+                    "scene": scene_path,
+                    "category": category,
+                    "name": record.name,
+                    "path": record.path,
+                    "exists": False,
+                    "issue": "missing",
+                    "message": get_text_func("file_missing", type=type_name, name=record.name,
+                                             path=record.path, debug="")
+                }
+
+
+def iter_unused_records(unused_files, get_text_func):
+    """未使用ファイルのレコードを順に生成（unused_filesはカテゴリ → アセット情報のリスト）"""
+    for category, assets in unused_files.items():
+        type_name = get_text_func(SceneAnalyzer.CATEGORY_NAME_KEYS.get(category, category))
+        for asset in assets:
+            yield {
+                "record": "unused",
+                "category": category,
+                "name": asset["name"],
+                "path": asset["rel_path"],
+                "message": get_text_func("file_unused_item", type=type_name,
+                                         name=asset["name"], path=asset["rel_path"])
+            }
+
+
+class ReportWriter:
+    """レポート出力の基底クラス
+
+    レコード（REPORT_FIELDS の項目を持つ辞書）を1件ずつ受け取り、その場でファイルに書き出すため、
+    結果全体を1つの文字列やリストにまとめません。
+        with create_report_writer("report.jsonl") as writer:
+            writer.write_all(records)
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.count = 0
+
+    def __enter__(self):
+        self.begin()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.end()
+        self.stream.close()
+        return False
+
+    def begin(self):
+        """出力の開始（ヘッダーなど）"""
+
+    def write(self, record):
+        """1件のレコードを書き出す"""
+        raise NotImplementedError
+
+    def write_all(self, records):
+        """複数のレコードを順に書き出す"""
+        for record in records:
+            self.write(record)
+
+    def end(self):
+        """出力の終了（フッターなど）"""
+
+
+class JsonlReportWriter(ReportWriter):
+    """JSON Lines形式（1行に1レコード、大きな結果向け）"""
+
+    def write(self, record):
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.count += 1
+
+
+class JsonReportWriter(ReportWriter):
+    """JSON形式（レコードの配列を要素ごとに書き出す）"""
+
+    def begin(self):
+        self.stream.write("[")
+
+    def write(self, record):
+        self.stream.write(",\n" if self.count else "\n")
+        self.stream.write(json.dumps(record, ensure_ascii=False))
+        self.count += 1
+
+    def end(self):
+        self.stream.write("\n]\n")
+
+
+class CsvReportWriter(ReportWriter):
+    """CSV形式（列は REPORT_FIELDS、該当しない項目は空欄）"""
+
+    def begin(self):
+        self._writer = csv.DictWriter(self.stream, fieldnames=REPORT_FIELDS, extrasaction="ignore")
+        self._writer.writeheader()
+
+    def write(self, record):
+        self._writer.writerow(record)
+        self.count += 1
+
+
+class JUnitReportWriter(ReportWriter):
+    """JUnit XML形式（CIなどのチェックリスト用）
+
+    シーンごとに1つのtestsuite、参照ごとに1つのtestcaseを出力し、問題点はfailureにします。
+    testsuiteの件数の属性を書くため、1つのシーンの分だけをまとめてから書き出します。
+    未使用ファイルは "unused_files"、読み込みエラーはシーンのtestsuiteのerrorとして出力します。
+    """
+
+    UNUSED_SUITE = "unused_files"
+
+    def begin(self):
+        self.stream.write('<?xml version="1.0" encoding="UTF-8"?>\n<testsuites>\n')
+        self._suite = None
+        self._cases = {}
+
+    def write(self, record):
+        suite = self.UNUSED_SUITE if record["record"] == "unused" else record.get("scene") or ""
+        if suite != self._suite:
+            self._flush()
+            self._suite = suite
+        key = (record.get("category"), record.get("path"))
+        if record["record"] == "reference":
+            self._cases.setdefault(key, [record, []])
+        elif record["record"] == "issue":
+            self._cases.setdefault(key, [record, []])[1].append(record)
+        else:
+            self._cases[(record["record"], len(self._cases))] = [record, []]
+        self.count += 1
+
+    def end(self):
+        self._flush()
+        self.stream.write("</testsuites>\n")
+
+    def _flush(self):
+        """まとめたシーンの分をtestsuiteとして書き出す"""
+        if not self._cases:
+            return
+        cases = list(self._cases.values())
+        failures = sum(1 for _, issues in cases if issues)
+        errors = sum(1 for record, _ in cases if record["record"] == "error")
+        write = self.stream.write
+        write(f'  <testsuite name={quoteattr(self._suite)} tests="{len(cases)}" '
+              f'failures="{failures}" errors="{errors}">\n')
+        for record, issues in cases:
+            name = record.get("path") or record.get("scene") or ""
+            classname = record.get("category") or record["record"]
+            write(f'    <testcase classname={quoteattr(classname)} name={quoteattr(name)}')
+            if record["record"] == "error":
+                write(f'>\n      <error message={quoteattr(record["message"])}/>\n    </testcase>\n')
+            elif record["record"] == "unused":
+                write(f'>\n      <system-out>{escape(record["message"])}</system-out>\n    </testcase>\n')
+            elif issues:
+                write(">\n")
+                for issue in issues:
+                    write(f'      <failure type={quoteattr(issue["issue"])} message={quoteattr(issue["message"])}/>\n')
+                write("    </testcase>\n")
+            else:
+                write("/>\n")
+        write("  </testsuite>\n")
+        self._cases = {}
+        self._suite = None
+
+
+# 出力形式と出力クラス、ファイルの拡張子
+REPORT_FORMATS = {
+    "jsonl": (JsonlReportWriter, ".jsonl"),
+    "json": (JsonReportWriter, ".json"),
+    "csv": (CsvReportWriter, ".csv"),
+    "junit": (JUnitReportWriter, ".xml"),
+}
+
+
+def guess_report_format(file_path):
+    """ファイルの拡張子から出力形式を判定（不明な場合はJSONL）"""
+    extension = os.path.splitext(file_path)[1].lower()
+    for report_format, (_, format_extension) in REPORT_FORMATS.items():
+        if extension == format_extension:
+            return report_format
+    return "jsonl"
+
+
+def create_report_writer(file_path, report_format=None):
+    """出力ファイルを開いてレポート出力オブジェクトを作成（report_formatを省略すると拡張子で判定）"""
+    writer_class = REPORT_FORMATS[report_format or guess_report_format(file_path)][0]
+    newline = "" if writer_class is CsvReportWriter else None
+    return writer_class(open(file_path, "w", encoding="utf-8", newline=newline))
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+分析結果キャッシュモジュール
+シーンファイルの分析結果をファイルの内容のハッシュ値ごとにディスクに保存します。
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+
+from .config import ConfigManager
+
+
+class SceneResultCache:
+    """シーン分析結果の永続キャッシュクラス
+
+    シーンファイルはサイズ・更新時刻(mtime)・内容のハッシュ値で識別します。
+    サイズと更新時刻が前回と同じファイルはハッシュ値の計算も省略し、
+    変わっていても内容が同じ（コピーや上書き保存のみ）であればキャッシュを使えます。
+    エントリは1つずつ別のファイルに保存し、MAX_ENTRIES個を超えると
+    最も長く使われていないものから削除します（LRU）。読み込み（get）による使用順の変更は
+    索引ファイルにすぐには書かず、次の保存（put）か close() でまとめて保存します。
+    """
+
+    CACHE_DIR = os.path.join(os.path.dirname(ConfigManager.SETTINGS_FILE), "scene_cache")
+    INDEX_FILE = "index.json"
+    VERSION = 1
+    MAX_ENTRIES = 64
+    HASH_CHUNK_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, cache_dir=None, max_entries=None):
+        self.cache_dir = cache_dir or self.CACHE_DIR
+        self.max_entries = max_entries or self.MAX_ENTRIES
+        self._files = {}               # ファイルパス → [サイズ, mtime_ns, ハッシュ値]
+        self._entries = OrderedDict()  # ハッシュ値（古い順）
+        self._dirty = False            # 索引ファイルに保存していない変更があるか
+        self.load()
+
+    @staticmethod
+    def _path_key(file_path):
+        """ファイルパスをキャッシュのキーに変換"""
+        return os.path.normcase(os.path.abspath(file_path))
+
+    def _entry_file(self, content_hash):
+        """エントリの保存先"""
+        return os.path.join(self.cache_dir, f"{content_hash}.json")
+
+    def load(self):
+        """キャッシュの索引を読み込む"""
+        self._files = {}
+        self._entries = OrderedDict()
+        index_file = os.path.join(self.cache_dir, self.INDEX_FILE)
+        if not os.path.exists(index_file):
+            return
+        try:
+            with open(index_file, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            if data.get("version") == self.VERSION:
+                self._files = data.get("files", {})
+                self._entries = OrderedDict.fromkeys(data.get("entries", []))
+        except Exception as e:
+            print(f"分析結果キャッシュの読み込みエラー: {e}")
+            self._files = {}
+            self._entries = OrderedDict()
+
+    def save(self):
+        """キャッシュの索引を保存する（一時ファイルに書き終えてから置き換えるため、途中で中断しても壊れない）"""
+        temporary_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            handle, temporary_path = tempfile.mkstemp(prefix="index_", suffix=".tmp", dir=self.cache_dir)
+            with os.fdopen(handle, "w", encoding="utf-8") as file:
+                json.dump({
+                    "version": self.VERSION,
+                    "files": {key: known for key, known in self._files.items() if known[2] in self._entries},
+                    "entries": list(self._entries)
+                }, file, ensure_ascii=False)
+            os.replace(temporary_path, os.path.join(self.cache_dir, self.INDEX_FILE))
+            self._dirty = False
+        except Exception as e:
+            print(f"分析結果キャッシュの保存エラー: {e}")
+            if temporary_path:
+                try:
+                    os.remove(temporary_path)
+                except OSError:
+                    pass
+
+    def close(self):
+        """保存していない使用順の変更があれば索引を保存する"""
+        if self._dirty:
+            self.save()
+
+    def known_hash(self, file_path):
+        """サイズとmtimeが前回と同じファイルの記録済みハッシュ値を取得（なければNone）"""
+        stat = os.stat(file_path)
+        known = self._files.get(self._path_key(file_path))
+        if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            return known[2]
+        return None
+
+    def content_hash(self, file_path):
+        """ファイルの内容のハッシュ値を取得（サイズとmtimeが前回と同じなら再計算しない）"""
+        content_hash = self.known_hash(file_path)
+        if content_hash:
+            return content_hash
+
+        stat = os.stat(file_path)
+        digest = hashlib.blake2b(digest_size=16)
+        size = 0
+        with open(file_path, "rb") as file:
+            while True:
+                chunk = file.read(self.HASH_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                size += len(chunk)
+        content_hash = f"{size:x}-{digest.hexdigest()}"
+        self._remember(file_path, stat, content_hash)
+        return content_hash
+
+    def read(self, file_path):
+        """ファイルの内容を読み込み、(内容のバイト列, 読み込んだ内容のハッシュ値) を返す
+
+        ハッシュ値は解析するバイト列そのものから求めるため、読み込み後にファイルが
+        上書きされても、分析結果が別の内容のハッシュ値で保存されることはありません。
+        """
+        stat = os.stat(file_path)
+        with open(file_path, "rb") as file:
+            data = file.read()
+        content_hash = f"{len(data):x}-{hashlib.blake2b(data, digest_size=16).hexdigest()}"
+        self._remember(file_path, stat, content_hash)
+        return data, content_hash
+
+    def _remember(self, file_path, stat, content_hash):
+        """読み込み前後でサイズとmtimeが変わっていなければ、ファイルのハッシュ値を記録"""
+        try:
+            after = os.stat(file_path)
+        except OSError:
+            return
+        if (after.st_size, after.st_mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+            self._files[self._path_key(file_path)] = [stat.st_size, stat.st_mtime_ns, content_hash]
+
+    def get(self, content_hash):
+        """内容のハッシュ値に対応するキャッシュを取得（なければNone）"""
+        if content_hash not in self._entries:
+            return None
+        try:
+            with open(self._entry_file(content_hash), "r", encoding="utf-8") as file:
+                entry = json.load(file)
+        except Exception as e:
+            print(f"分析結果キャッシュの読み込みエラー: {e}")
+            self._remove(content_hash)
+            self.save()
+            return None
+
+        # 最近使ったエントリとして末尾に移動（索引は次の保存でまとめて書く）
+        self._entries.move_to_end(content_hash)
+        self._dirty = True
+        return entry
+
+    def put(self, content_hash, entry):
+        """分析したシーンの内容のハッシュ値でキャッシュを保存（JSONに変換できる値のみ）
+
+        content_hash には分析したデータを読み込んだ時点の値（read() / content_hash() の戻り値）を
+        渡します。保存時にファイルのハッシュ値を求め直すと、その間に保存されたシーンの内容と
+        古い分析結果が結び付いてしまうためです。
+        """
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self._entry_file(content_hash), "w", encoding="utf-8") as file:
+                json.dump(entry, file, ensure_ascii=False)
+        except Exception as e:
+            print(f"分析結果キャッシュの保存エラー: {e}")
+            return
+
+        self._entries[content_hash] = None
+        self._entries.move_to_end(content_hash)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+        self.save()
+
+    def _remove(self, content_hash):
+        """エントリとそのハッシュ値を持つファイルの記録を削除"""
+        self._entries.pop(content_hash, None)
+        for path_key in [key for key, known in self._files.items() if known[2] == content_hash]:
+            del self._files[path_key]
+        try:
+            os.remove(self._entry_file(content_hash))
+        except OSError:
+            pass
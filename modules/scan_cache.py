@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+スキャンキャッシュモジュール
+StreamingAssetsのスキャン結果をディレクトリ単位でディスクに保存します。
+"""
+
+import json
+import os
+
+from .config import ConfigManager
+
+
+class ScanCache:
+    """StreamingAssetsスキャン結果の永続キャッシュクラス
+
+    ルートパスごとに、各ディレクトリの更新時刻(mtime)・サブディレクトリ・
+    .warudoファイル一覧を保存します。次回起動時は更新時刻が変わった
+    ディレクトリだけを読み直せば済むようになります。
+    キャッシュファイルは起動を遅らせないよう、初めて使うときに読み込みます。
+    """
+
+    CACHE_FILE = os.path.join(os.path.dirname(ConfigManager.SETTINGS_FILE), "scan_cache.json")
+    VERSION = 1
+
+    def __init__(self, cache_file=None):
+        self.cache_file = cache_file or self.CACHE_FILE
+        self._roots = None
+    
+    def _ensure_loaded(self):
+        """まだ読み込んでいなければキャッシュファイルを読み込む"""
+        if self._roots is None:
+            self.load()
+
+    @staticmethod
+    def _root_key(root):
+        """ルートパスをキャッシュのキーに変換"""
+        return os.path.normcase(os.path.abspath(root))
+
+    def load(self):
+        """キャッシュファイルを読み込む"""
+        self._roots = {}
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            if data.get("version") == self.VERSION:
+                self._roots = data.get("roots", {})
+        except Exception as e:
+            print(f"スキャンキャッシュの読み込みエラー: {e}")
+            self._roots = {}
+
+    def save(self):
+        """キャッシュファイルに保存する"""
+        self._ensure_loaded()
+        try:
+            with open(self.cache_file, "w", encoding="utf-8") as file:
+                json.dump({"version": self.VERSION, "roots": self._roots}, file, ensure_ascii=False)
+        except Exception as e:
+            print(f"スキャンキャッシュの保存エラー: {e}")
+
+    def get_listings(self, root):
+        """ルートパスのディレクトリ一覧を取得（相対パス → [mtime_ns, サブディレクトリ, ファイル]）"""
+        self._ensure_loaded()
+        return self._roots.get(self._root_key(root), {})
+
+    def set_listings(self, root, listings):
+        """ルートパスのディレクトリ一覧を更新"""
+        self._ensure_loaded()
+        self._roots[self._root_key(root)] = listings
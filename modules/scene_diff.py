@@ -0,0 +1,349 @@
+# -*- coding: utf-8 -*-
+"""
+シーン比較モジュール
+2つのシーン（同じシーンの別のリビジョンなど）のアセット参照の差分を求めます。
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter
+
+from .analyzer import SceneAnalyzer
+from .config import ConfigManager
+from .result_cache import SceneResultCache
+from .translations import get_text
+
+class SceneDiffer:
+    """サブツリーの比較によるシーン比較クラス
+
+    2つのJSONツリーを根から同時にたどり、同じサブツリーは中を見ずに飛ばします。
+    辞書は同じキーの子どうしを比較し、リストは先頭と末尾の一致する要素を除いたうえで、
+    残りの要素のサブツリーのハッシュ値（葉から順に計算）が一致するものを除き、
+    一致しないものどうしを順に対応させます（挿入・削除・並べ替えに対応）。
+    参照は変わったサブツリー（片方にしかない部分）からだけ抽出し、参照パスごとの増減を求めます。
+
+    同じサブツリーの判定にはC実装の == による比較（最初の違いで打ち切り）を使い、
+    ハッシュ値はリストの中で位置がずれた部分の要素についてだけ計算するため、
+    比較と抽出にかかる時間はシーン全体ではなく変更の大きさにほぼ比例します。
+    増減のあった参照パスだけは、追加・削除・回数の変化を区別するために
+    それぞれのシーン全体での出現回数を使います。分析結果のキャッシュにあればその値を使い、
+    なければシーン全体を1回走査して数えるため、その場合の時間はシーン全体に比例します。
+    """
+
+    def __init__(self, analyzer=None):
+        self.analyzer = analyzer or SceneAnalyzer(None)
+
+    def diff_files(self, old_path, new_path):
+        """2つのシーンファイルを比較
+
+        分析結果のキャッシュ（analyzer.result_cache）があれば出現回数はキャッシュから取得します。
+        キャッシュにないシーンは全体から参照を抽出してキャッシュに保存するため、
+        そのシーンの最初の比較だけはシーン全体を走査する時間がかかります。
+        """
+        old_data, old_totals = self._load_file(old_path)
+        new_data, new_totals = self._load_file(new_path)
+        return self.diff(old_data, new_data, old_totals, new_totals)
+
+    def _load_file(self, file_path):
+        """シーンファイルを読み込み、(シーンデータ, 参照パスごとの出現回数) を返す（キャッシュがなければNone）"""
+        result_cache = self.analyzer.result_cache
+        if result_cache is None:
+            with open(file_path, "r", encoding="utf-8") as f:
+                return json.load(f), None
+        # 出現回数は読み込んだ内容そのもののハッシュ値でキャッシュを探す
+        data, content_hash = result_cache.read(file_path)
+        scene_data = json.loads(data.decode("utf-8"))
+        cached = self.analyzer.load_cached_result(file_path, content_hash)
+        if cached is None:
+            # キャッシュにないシーンは一度だけ全体から抽出して保存する（次回からは走査しない）
+            extracted_objects = self.analyzer.extract_objects(scene_data)
+            object_counts = self.analyzer.group_extracted_objects(extracted_objects)
+            self.analyzer.store_result(content_hash, extracted_objects, object_counts)
+            cached = {"object_counts": object_counts}
+        return scene_data, self._totals(cached)
+
+    @staticmethod
+    def _totals(cached):
+        """分析結果から参照パスごとの出現回数を求める"""
+        return {obj["path"]: obj["count"] for counts in cached["object_counts"].values() for obj in counts}
+
+    def cached_totals(self, file_path):
+        """分析結果のキャッシュから参照パスごとの出現回数を取得（キャッシュがなければNone）"""
+        if file_path is None or self.analyzer.result_cache is None:
+            return None
+        cached = self.analyzer.load_cached_result(file_path)
+        if cached is None:
+            return None
+        return self._totals(cached)
+
+    def diff(self, old_data, new_data, old_totals=None, new_totals=None):
+        """2つのシーンデータを比較し、カテゴリごとの追加・削除・出現回数の変化を返す
+
+        old_totals / new_totals には分かっていれば参照パス → シーン全体での出現回数を渡します。
+
+        戻り値の辞書:
+            categories: カテゴリ → {"added" / "removed" / "changed": [項目, ...]}
+                        項目は path / name / old_count / new_count の辞書（パス順）
+            regions: 参照を抽出し直した（変更された）部分のJSON Pointerのリスト
+            stats: 比較したサブツリーと、同一のためスキップしたサブツリーの数
+        """
+        delta, regions, compared, skipped = self._diff_trees(old_data, new_data)
+        changed_paths = {path for (_, path), change in delta.items() if change}
+        if old_totals is None:
+            old_totals = self._count_references(old_data, changed_paths)
+        if new_totals is None:
+            new_totals = self._count_references(new_data, changed_paths)
+
+        categories = {category: {"added": [], "removed": [], "changed": []}
+                      for _, category in SceneAnalyzer.EXTRACTED_CATEGORIES}
+        category_of = dict(SceneAnalyzer.EXTRACTED_CATEGORIES)
+        for (key, path), change in sorted(delta.items()):
+            if not change:
+                continue
+            old_count = old_totals.get(path, 0)
+            new_count = new_totals.get(path, 0)
+            if not old_count:
+                kind = "added"
+            elif not new_count:
+                kind = "removed"
+            else:
+                kind = "changed"
+            categories[category_of[key]][kind].append({
+                "path": path,
+                "name": self.analyzer._get_name_from_path(path),
+                "old_count": old_count,
+                "new_count": new_count
+            })
+        return {
+            "categories": categories,
+            "regions": regions,
+            "stats": {"compared": compared, "skipped": skipped}
+        }
+
+    @staticmethod
+    def _subtree_hash(node, hashes):
+        """サブツリーのハッシュ値を葉から順に計算（hashesは id → ハッシュ値のメモ）
+
+        子の辞書とリストはハッシュ値、文字列はそのまま、その他の値は型と組にして
+        （1 / 1.0 / true を区別し、子のハッシュ値と値が衝突しないように）まとめます。
+        Pythonの hash() を使うため、同じプロセス内の比較でのみ有効です。
+        """
+        stack = [(node, False)]
+        pop = stack.pop
+        push = stack.append
+        while stack:
+            current, children_done = pop()
+            if id(current) in hashes:
+                continue
+            is_dict = type(current) is dict
+            children = current.values() if is_dict else current
+            if not children_done:
+                push((current, True))
+                for child in children:
+                    child_type = type(child)
+                    if (child_type is dict or child_type is list) and id(child) not in hashes:
+                        push((child, False))
+                continue
+            items = tuple(
+                hashes[id(child)] if type(child) in (dict, list)
+                else child if type(child) is str else (type(child), child)
+                for child in children
+            )
+            hashes[id(current)] = hash((tuple(current) if is_dict else None, items))
+        return hashes[id(node)]
+
+    def _diff_trees(self, old_data, new_data):
+        """異なるサブツリーだけをたどり、(抽出結果のキー, パス) ごとの増減を求める"""
+        delta = Counter()
+        regions = []
+        hashes = {}
+        compared = 0
+        skipped = 0
+        match = self.analyzer._match_reference
+
+        def extract(node, pointer, sign):
+            # 片方にしかないサブツリーの参照をすべて数える
+            if type(node) not in (dict, list):
+                return
+            regions.append(pointer)
+            for key, table in self.analyzer.extract_objects(node).items():
+                if key == "other_objects":
+                    continue
+                for path, count in table.path_counts():
+                    delta[(key, path)] += sign * count
+
+        def own_reference(node):
+            value = node.get("value")
+            return match(value) if type(value) is str else None
+
+        pairs = [(old_data, new_data, "")]
+        stack = []
+        while pairs or stack:
+            # 対応する子どうしを比較し、異なる辞書・リストだけを積む
+            for old_child, new_child, child_pointer in pairs:
+                old_type = type(old_child)
+                if old_type is type(new_child) and old_type in (dict, list):
+                    if old_child == new_child:
+                        skipped += 1
+                    else:
+                        stack.append((old_child, new_child, child_pointer))
+                elif old_child != new_child:
+                    extract(old_child, child_pointer, -1)
+                    extract(new_child, child_pointer, 1)
+            pairs = []
+            if not stack:
+                break
+
+            old_node, new_node, pointer = stack.pop()
+            compared += 1
+            if type(old_node) is dict:
+                # 辞書自身の参照（valueキー）
+                old_reference = own_reference(old_node)
+                new_reference = own_reference(new_node)
+                if old_reference != new_reference:
+                    regions.append(pointer)
+                    if old_reference:
+                        delta[old_reference] -= 1
+                    if new_reference:
+                        delta[new_reference] += 1
+                for key, old_child in old_node.items():
+                    child_pointer = f"{pointer}/{_escape_pointer(key)}"
+                    if key in new_node:
+                        pairs.append((old_child, new_node[key], child_pointer))
+                    else:
+                        extract(old_child, child_pointer, -1)
+                for key, new_child in new_node.items():
+                    if key not in old_node:
+                        extract(new_child, f"{pointer}/{_escape_pointer(key)}", 1)
+                continue
+
+            # 先頭と末尾の一致する要素は比較済みとして除く
+            start = 0
+            old_end = len(old_node)
+            new_end = len(new_node)
+            while start < old_end and start < new_end and old_node[start] == new_node[start]:
+                start += 1
+            while old_end > start and new_end > start and old_node[old_end - 1] == new_node[new_end - 1]:
+                old_end -= 1
+                new_end -= 1
+            skipped += start + len(old_node) - old_end
+
+            # 残りの要素はハッシュ値が一致するものどうしを除き、一致しないものを順に対応させる
+            unmatched = Counter(
+                self._subtree_hash(child, hashes)
+                for child in old_node[start:old_end] if type(child) in (dict, list)
+            )
+            new_rest = []
+            for index in range(start, new_end):
+                child = new_node[index]
+                if type(child) not in (dict, list):
+                    continue
+                child_hash = self._subtree_hash(child, hashes)
+                if unmatched[child_hash] > 0:
+                    unmatched[child_hash] -= 1
+                    skipped += 1
+                else:
+                    new_rest.append((index, child))
+            old_rest = []
+            for index in range(start, old_end):
+                child = old_node[index]
+                if type(child) not in (dict, list):
+                    continue
+                child_hash = hashes[id(child)]
+                if unmatched[child_hash] > 0:
+                    unmatched[child_hash] -= 1
+                    old_rest.append((index, child))
+            for position in range(max(len(old_rest), len(new_rest))):
+                if position >= len(new_rest):
+                    index, old_child = old_rest[position]
+                    extract(old_child, f"{pointer}/{index}", -1)
+                elif position >= len(old_rest):
+                    index, new_child = new_rest[position]
+                    extract(new_child, f"{pointer}/{index}", 1)
+                else:
+                    pairs.append((old_rest[position][1], new_rest[position][1],
+                                  f"{pointer}/{new_rest[position][0]}"))
+
+        # 同じ参照が別の場所に移動しただけのものは増減が0になる
+        return delta, regions, compared, skipped
+
+    def _count_references(self, data, paths):
+        """シーン全体での、指定した参照パスの出現回数を数える（pathsが空なら走査しない）"""
+        counts = Counter()
+        if not paths:
+            return counts
+        stack = [data] if type(data) in (dict, list) else []
+        pop = stack.pop
+        push = stack.append
+        while stack:
+            node = pop()
+            if type(node) is dict:
+                value = node.get("value")
+                if type(value) is str and "://" in value:
+                    value = value.strip('"')
+                    if value in paths:
+                        counts[value] += 1
+                node = node.values()
+            for child in node:
+                child_type = type(child)
+                if child_type is dict or child_type is list:
+                    push(child)
+        return counts
+
+    def format_text(self, result, get_text_func, old_name, new_name):
+        """比較結果を表示用のテキストにする"""
+        lines = [get_text_func("diff_header", old=old_name, new=new_name)]
+        has_changes = False
+        for key, category in SceneAnalyzer.EXTRACTED_CATEGORIES:
+            changes = result["categories"][category]
+            if not any(changes.values()):
+                continue
+            has_changes = True
+            lines.append("")
+            lines.append(get_text_func(SceneAnalyzer.CATEGORY_NAME_KEYS[category]))
+            for kind in ("added", "removed", "changed"):
+                for item in changes[kind]:
+                    lines.append("  " + get_text_func(f"diff_{kind}", **item))
+        if not has_changes:
+            lines.append(get_text_func("diff_no_changes"))
+        lines.append("")
+        lines.append(get_text_func("diff_stats", regions=len(result["regions"]), **result["stats"]))
+        return "\n".join(lines)
+
+
+def _escape_pointer(key):
+    """JSON Pointer（RFC 6901）の参照トークンにエスケープ"""
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def has_changes(result):
+    """比較結果に参照の差分があるか判定"""
+    return any(any(changes.values()) for changes in result["categories"].values())
+
+
+def main(argv=None):
+    """コマンドラインから2つのシーンを比較し、終了コードを返す（差分なし: 0 / あり: 1 / エラー: 2）"""
+    language = ConfigManager().get_language()
+
+    parser = argparse.ArgumentParser(description=get_text(language, "diff_description"))
+    parser.add_argument("old", help=get_text(language, "diff_old_help"))
+    parser.add_argument("new", help=get_text(language, "diff_new_help"))
+    args = parser.parse_args(argv)
+
+    # 出現回数を分析結果のキャッシュ（GUIと共有）から取得し、2回目以降は全体を走査しない
+    result_cache = SceneResultCache()
+    differ = SceneDiffer(SceneAnalyzer(None, result_cache=result_cache))
+    try:
+        result = differ.diff_files(args.old, args.new)
+    except ValueError as e:
+        print(get_text(language, "json_error", error=str(e)), file=sys.stderr)
+        return 2
+    except OSError as e:
+        print(get_text(language, "file_error", error=str(e)), file=sys.stderr)
+        return 2
+    finally:
+        result_cache.close()
+    print(differ.format_text(result, lambda key, **kwargs: get_text(language, key, **kwargs),
+                             args.old, args.new))
+    return 1 if has_changes(result) else 0
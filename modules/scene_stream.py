@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+シーンストリーム読み込みモジュール
+JSON全体をメモリに展開せずに、シーンファイルを少しずつ読み込みながら
+"value" キーの文字列値を取り出します。
+"""
+
+import json
+import re
+
+# 文字列外で注目する文字（構造記号と文字列の開始）
+_STRUCTURAL = re.compile(r'[{}\[\]:,"]')
+# 文字列内で注目する文字（終端とエスケープ）
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+# キー文字列として保持する最大長（"value" との比較にしか使わない）
+_MAX_KEY_LENGTH = 64
+# 参照文字列かどうか判定できないまま保持する最大長
+_MAX_VALUE_PREFIX = 4096
+
+
+class SceneStreamError(ValueError):
+    """シーンファイルのJSON構造が不正な場合のエラー"""
+
+
+def iter_value_strings(file_obj, prefixes=(), chunk_size=1024 * 1024, progress=None):
+    """オブジェクトの "value" キーに対応する文字列値を出現順に返すジェネレーター
+
+    Args:
+        file_obj: テキストモードで開いたシーンファイル
+        prefixes (tuple): 長い文字列を保持し続ける条件となる接頭辞
+            （前後の二重引用符を除いた値がこれらで始まらない巨大な文字列は読み飛ばす。
+            空の場合は読み飛ばさない）
+        chunk_size (int): 1回に読み込む文字数
+        progress (callable): チャンクを読み込むたびに読み込んだ文字数の累計を渡して呼ぶ関数
+
+    メモリ使用量はチャンクサイズとネストの深さにのみ依存し、シーンの大きさには依存しません。
+    """
+    stack = []              # True: オブジェクト, False: 配列
+    expect_key = False      # 次の文字列がキーかどうか
+    key_is_value = False    # 直前のキーが "value" かどうか
+    pending_value = False   # "value": の直後かどうか
+    in_string = False
+    string_role = None      # "key" / "value" / None（読み飛ばし）
+    string_parts = []
+    string_length = 0
+    prefix_checked = False  # 長い値の接頭辞を確認済みか
+    escape_pending = False  # チャンク末尾が "\" で終わった
+    total_read = 0
+
+    while True:
+        chunk = file_obj.read(chunk_size)
+        if not chunk:
+            break
+        total_read += len(chunk)
+        pos = 0
+        end = len(chunk)
+
+        while pos < end:
+            if in_string:
+                if escape_pending:
+                    # 前のチャンク末尾の "\" に続く1文字
+                    if string_role:
+                        string_parts.append(chunk[pos])
+                        string_length += 1
+                    escape_pending = False
+                    pos += 1
+                    continue
+
+                match = _STRING_SPECIAL.search(chunk, pos)
+                stop = match.start() if match else end
+                if string_role and stop > pos:
+                    string_parts.append(chunk[pos:stop])
+                    string_length += stop - pos
+                if not match:
+                    pos = end
+                elif match.group() == "\\":
+                    # エスケープ文字（\uXXXX の16進数部分に特別な文字は含まれない）
+                    if stop + 1 < end:
+                        if string_role:
+                            string_parts.append(chunk[stop:stop + 2])
+                            string_length += 2
+                        pos = stop + 2
+                    else:
+                        if string_role:
+                            string_parts.append("\\")
+                            string_length += 1
+                        escape_pending = True
+                        pos = end
+                else:
+                    # 文字列の終端
+                    in_string = False
+                    pos = stop + 1
+                    if string_role == "key":
+                        key_is_value = _decode(string_parts) == "value"
+                    elif string_role == "value":
+                        yield _decode(string_parts)
+                    string_parts = []
+                    string_length = 0
+                    string_role = None
+                    prefix_checked = False
+                    continue
+
+                # 保持している文字列が長すぎる場合は読み飛ばしに切り替える
+                if string_role == "key" and string_length > _MAX_KEY_LENGTH:
+                    string_role = None
+                    key_is_value = False
+                    string_parts = []
+                elif (string_role == "value" and prefixes and not prefix_checked and
+                      string_length > _MAX_VALUE_PREFIX):
+                    prefix_checked = True
+                    if not _has_prefix("".join(string_parts), prefixes):
+                        string_role = None
+                        string_parts = []
+                continue
+
+            match = _STRUCTURAL.search(chunk, pos)
+            if not match:
+                break
+            char = match.group()
+            pos = match.end()
+
+            if char == '"':
+                in_string = True
+                if stack and stack[-1] and expect_key:
+                    string_role = "key"
+                    key_is_value = False
+                    expect_key = False
+                elif pending_value:
+                    string_role = "value"
+                else:
+                    string_role = None
+                pending_value = False
+            elif char == ":":
+                pending_value = key_is_value
+                key_is_value = False
+            elif char == ",":
+                pending_value = False
+                expect_key = bool(stack and stack[-1])
+            elif char == "{":
+                stack.append(True)
+                expect_key = True
+                pending_value = False
+            elif char == "[":
+                stack.append(False)
+                expect_key = False
+                pending_value = False
+            else:
+                # "}" または "]"
+                if not stack or stack.pop() != (char == "}"):
+                    raise SceneStreamError(f"対応しない閉じ括弧 '{char}' (位置: {total_read - end + pos})")
+                expect_key = False
+                pending_value = False
+
+        if progress:
+            progress(total_read)
+
+    if in_string:
+        raise SceneStreamError("文字列が閉じられていません")
+    if stack:
+        raise SceneStreamError("括弧が閉じられていません")
+
+
+def _decode(parts):
+    """JSON文字列の中身（エスケープを含む）をデコード"""
+    raw = "".join(parts)
+    if "\\" not in raw:
+        return raw
+    try:
+        return json.loads(f'"{raw}"')
+    except ValueError:
+        return raw
+
+
+def _has_prefix(raw, prefixes):
+    """エスケープされた二重引用符を除いた文字列がいずれかの接頭辞で始まるか"""
+    head = raw
+    while head.startswith('\\"') or head.startswith('"'):
+        head = head[2:] if head.startswith('\\"') else head[1:]
+    return head.startswith(tuple(prefixes))
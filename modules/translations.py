@@ -17,6 +17,7 @@ TRANSLATIONS = {
         "options_group": "オプション",
         "verify_files": "ファイルの存在を検証",
         "show_debug": "デバッグ情報を表示",
+        "check_unused": "未使用ファイルをチェック",
         "analyze_button": "シーンデータを分析",
         "env_category": "環境 (Environment)",
         "prop_category": "アイテム (Prop)",
@@ -31,6 +32,8 @@ TRANSLATIONS = {
         "file_verified": "ファイル確認済み",
         "file_not_found": "存在しないファイル",
         "file_loaded": "ファイルを読み込みました: {path}",
+        "file_loaded_cached": "変更のないファイルのため、前回の分析結果を使用します: {path}",
+        "file_streaming": "大きなファイルのため、分析時に読み込みながら処理します: {path}",
         "json_error": "JSONの解析エラー: {error}",
         "file_error": "ファイル読み込みエラー: {error}",
         "select_json_first": "まずJSONファイルを選択してください。",
@@ -50,13 +53,117 @@ TRANSLATIONS = {
         "usage_count": "使用回数: {count}",
         "subfolder_move": "{type}「{name}」はサブフォルダ（{folder}）内にあります。直接{category}フォルダに移動する必要があります。",
         "file_missing": "{type}「{name}」(パス: {path}){debug}は存在しません。",
+        "unused_category": "未使用ファイル",
+        "file_unused": "未使用",
+        "unused_files": "--- 未使用ファイル ---",
+        "unused_count": "未使用ファイル: {count}個",
+        "file_unused_item": "{type}「{name}」(パス: {path})はどのシーンからも使用されていません。",
+        "debug_header": "=== 処理フェーズの計測結果 ===",
+        "watch_assets": "StreamingAssetsを監視",
+        "auto_reanalyze": "保存時に再分析",
+        "scene_reanalyzed": "シーンファイルの変更を検出し、再分析しました: {path}",
+        "watch_select_assets": "監視するには、まずStreamingAssetsフォルダを選択してください。",
+        "watch_index_service": "インデックスサービスがStreamingAssetsを監視しているため、ここでの監視は不要です。",
+        "using_index_service": "起動中のインデックスサービス（{url}）のインデックスを使用します。",
+        "assets_changed": "StreamingAssetsの変更をインデックスに反映しました（{count}件）。",
+        "reverify_title": "再検証",
+        "reverify_prompt": "StreamingAssetsの変更により、{count}件の参照の検証結果が変わる可能性があります。再検証しますか？",
+        "batch_unused_help": "すべてのシーンで使用されていないStreamingAssets内のファイルを表示する",
         "menu_settings": "設定",
         "menu_language": "言語設定",
         "dialog_language": "言語の選択",
         "japanese": "日本語",
         "english": "English",
         "dialog_ok": "OK",
-        "dialog_cancel": "キャンセル"
+        "dialog_cancel": "キャンセル",
+        "cancel_button": "キャンセル",
+        "task_cancelled": "処理をキャンセルしました。",
+        "progress_status": "{phase}... {percent}%",
+        "phase_loading": "シーンファイルを読み込み中",
+        "phase_extracting": "オブジェクトを抽出中",
+        "phase_verifying": "ファイルの存在を確認中",
+        "phase_summary": "サマリーを作成中",
+        "phase_scanning": "StreamingAssetsをスキャン中",
+        "phase_diffing": "シーンを比較中",
+        "phase_exporting": "レポートを書き出し中",
+        "menu_file": "ファイル",
+        "menu_export_report": "レポートを出力...",
+        "export_analyze_first": "レポートを出力するには、まずシーンデータを分析してください。",
+        "report_exported": "レポートを出力しました（{count}件）: {path}",
+        "compare_button": "別のシーンと比較",
+        "select_compare_scene": "比較するシーンファイル（新しいリビジョン）を選択",
+        "diff_header": "=== シーンの比較: {old} → {new} ===",
+        "diff_added": "[追加] {name} (パス: {path}) ×{new_count}",
+        "diff_removed": "[削除] {name} (パス: {path}) ×{old_count}",
+        "diff_changed": "[回数] {name} (パス: {path}) {old_count} → {new_count}",
+        "diff_no_changes": "アセット参照の差分はありません。",
+        "diff_stats": "変更された部分: {regions}か所（比較したサブツリー: {compared}個, 同一のためスキップ: {skipped}個）",
+        "diff_description": "2つのシーンファイルのアセット参照を比較し、追加・削除・出現回数の変化を表示します。",
+        "diff_old_help": "比較元のシーンファイル（古いリビジョン）",
+        "diff_new_help": "比較先のシーンファイル（新しいリビジョン）",
+        "batch_report_help": "参照と問題点をレポートファイルに書き出す（形式は拡張子 .jsonl / .json / .csv / .xml で判定）",
+        "batch_report_format_help": "レポートの形式（省略時はファイルの拡張子で判定）",
+        "batch_description": "複数のシーンファイルをGUIなしで一括チェックします。",
+        "batch_scenes_help": "シーンファイル（*.json）またはシーンファイルを含むフォルダ",
+        "batch_assets_help": "StreamingAssetsフォルダのパス（省略時は設定ファイルの値）",
+        "batch_workers_help": "並列に分析するプロセス数（省略時はCPUコア数）",
+        "batch_quiet_help": "問題のないシーンを表示しない",
+        "batch_no_scenes": "チェックするシーンファイルが見つかりません。",
+        "batch_no_assets": "StreamingAssetsフォルダが設定されていないため、ファイルの存在は検証しません。",
+        "batch_scene_ok": "[OK] {path}",
+        "batch_scene_issues": "[NG] {path}",
+        "batch_summary": "{total}個のシーンをチェック（問題あり: {problems}個） {seconds:.2f}秒, {rate:.1f}シーン/秒 (プロセス数: {workers})",
+        "service_description": "StreamingAssetsのインデックスをメモリに保持し、存在確認とシーンのチェックの問い合わせにローカルのHTTPで答えます。起動中はGUIと一括チェックが自動的に使用します。",
+        "service_host_help": "問い合わせを受け付けるアドレス（既定: 127.0.0.1。127.0.0.0/8 または localhost のみ）",
+        "service_host_not_local": "インデックスサービスはIPv4のループバックのアドレス（127.0.0.0/8 または localhost）でのみ起動できます: {host}",
+        "service_port_help": "問い合わせを受け付けるポート（省略時は空いているポート）",
+        "service_interval_help": "StreamingAssetsの変更をインデックスに反映する間隔（秒）",
+        "service_status_help": "起動中のインデックスサービスの状態を表示する",
+        "service_no_assets": "StreamingAssetsフォルダが見つかりません。--assets で指定してください。",
+        "service_started": "インデックスサービスを起動しました: {url}（{path}, {count}個のファイル）。Ctrl+Cで停止します。",
+        "service_stopped": "インデックスサービスを停止しました。",
+        "service_not_running": "このStreamingAssetsフォルダのインデックスサービスは起動していません。",
+        "service_status": "{url}: {path}（{count}個のファイル, 世代: {generation}）",
+        "batch_index_help": "StreamingAssetsをスキャンせずにインデックスファイル（build_index.py で作成）を使う（ファイル名の省略時は asset_index.idx）",
+        "index_file_unusable": "インデックスファイル {path} が見つからないか、別のフォルダ用か壊れているか、作成後にStreamingAssetsのアセットが変更されているため、StreamingAssetsをスキャンしました。",
+        "index_description": "StreamingAssetsをスキャンし、起動直後から読み込まずに検索できるインデックスファイルを作り直します。",
+        "index_output_help": "インデックスファイルのパス（既定: asset_index.idx）",
+        "index_verify_help": "作り直さずに、インデックスファイルが壊れていないか・作成後にアセットが変更されていないか確認する",
+        "index_built": "インデックスファイルを作成しました: {path}（{assets}, {count}個のファイル, {seconds:.2f}秒）",
+        "index_valid": "インデックスファイルは正常です: {path}（{assets}, {count}個のファイル, 作成日時: {built}）",
+        "index_invalid": "インデックスファイルを使用できません: {path}（{error}）",
+        "index_outdated": "インデックスファイルは作成後に変更されたフォルダ {directory} を反映していません: {path}（build_index.py で作り直してください）",
+        "batch_catalog_help": "スキャン結果とシーンごとの参照をカタログ（SQLite）に記録する（ファイル名の省略時は asset_catalog.db）",
+        "catalog_description": "StreamingAssetsのスキャン結果・シーンごとの参照・スキャン履歴を記録したカタログ（SQLite）を更新・検索します。",
+        "catalog_file_help": "カタログのファイル（既定: asset_catalog.db）",
+        "catalog_scan_help": "StreamingAssetsをスキャンして記録する（前回からの追加・削除を履歴に残す）",
+        "catalog_assets_help": "条件に一致するアセットを表示する",
+        "catalog_scenes_help": "条件に一致するアセットを使っているシーンを表示する（シーンは batch_check.py --catalog で記録）",
+        "catalog_subfolder_help": "サブフォルダ名（空文字列でカテゴリフォルダ直下）",
+        "catalog_name_help": "拡張子なしの名前（大文字小文字を区別しない、* と ? を使える）",
+        "catalog_changes_help": "追加・削除されたアセットを表示する",
+        "catalog_since_help": "日数または日付（例: 7, 2024-05-01）",
+        "catalog_unused_help": "記録したどのシーンからも参照されていないアセットを表示する",
+        "catalog_history_help": "スキャン履歴を表示する",
+        "catalog_error": "カタログのエラー: {error}",
+        "catalog_scanned": "カタログに記録しました: {path}（{asset_count}個のファイル, 追加: {added}個, 削除: {removed}個）",
+        "catalog_scene_item": "{scene}（{references}個の参照, {count}回）",
+        "catalog_history_item": "{time}  {root}  {asset_count}個のファイル（追加: {added}個, 削除: {removed}個）",
+        "menu_record_catalog": "カタログに記録",
+        "menu_catalog_search": "カタログを検索...",
+        "dialog_catalog": "カタログを検索",
+        "catalog_category": "カテゴリ",
+        "catalog_category_all": "すべて",
+        "catalog_subfolder": "サブフォルダ",
+        "catalog_name": "名前",
+        "catalog_days": "日数",
+        "catalog_find_scenes": "使用しているシーン",
+        "catalog_find_assets": "アセット",
+        "catalog_find_changes": "追加・削除",
+        "catalog_find_unused": "未使用",
+        "catalog_show_history": "スキャン履歴",
+        "catalog_no_results": "一致する記録はありません。",
+        "catalog_result_count": "{count}件"
     },
     "en": {
         "window_title": "Warudo Scene Data Checker",
@@ -69,6 +176,7 @@ TRANSLATIONS = {
         "options_group": "Options",
         "verify_files": "Verify file existence",
         "show_debug": "Show debug info",
+        "check_unused": "Check unused files",
         "analyze_button": "Analyze Scene Data",
         "env_category": "Environment",
         "prop_category": "Prop",
@@ -83,6 +191,8 @@ TRANSLATIONS = {
         "file_verified": "File verified",
         "file_not_found": "File not found",
         "file_loaded": "File loaded: {path}",
+        "file_loaded_cached": "File unchanged; using the previous analysis results: {path}",
+        "file_streaming": "Large file: it will be read incrementally during analysis: {path}",
         "json_error": "JSON parse error: {error}",
         "file_error": "File read error: {error}",
         "select_json_first": "Please select a JSON file first.",
@@ -102,13 +212,117 @@ TRANSLATIONS = {
         "usage_count": "Usage count: {count}",
         "subfolder_move": "{type} '{name}' is in subfolder ({folder}). It should be moved directly to {category} folder.",
         "file_missing": "{type} '{name}' (Path: {path}){debug} is missing.",
+        "unused_category": "Unused Files",
+        "file_unused": "Unused",
+        "unused_files": "--- Unused Files ---",
+        "unused_count": "Unused files: {count}",
+        "file_unused_item": "{type} '{name}' (Path: {path}) is not used by any scene.",
+        "debug_header": "=== Phase timings ===",
+        "watch_assets": "Watch StreamingAssets",
+        "auto_reanalyze": "Reanalyze on save",
+        "scene_reanalyzed": "Scene file changed on disk and was reanalyzed: {path}",
+        "watch_select_assets": "Please select the StreamingAssets folder before watching it.",
+        "watch_index_service": "The index service is already watching StreamingAssets; watching here is not needed.",
+        "using_index_service": "Using the index of the running index service ({url}).",
+        "assets_changed": "Applied StreamingAssets changes to the index ({count} file(s)).",
+        "reverify_title": "Re-verify",
+        "reverify_prompt": "{count} reference(s) may be affected by StreamingAssets changes. Re-verify them?",
+        "batch_unused_help": "List files in StreamingAssets that none of the scenes use",
         "menu_settings": "Settings",
         "menu_language": "Language",
         "dialog_language": "Select Language",
         "japanese": "Japanese",
         "english": "English",
         "dialog_ok": "OK",
-        "dialog_cancel": "Cancel"
+        "dialog_cancel": "Cancel",
+        "cancel_button": "Cancel",
+        "task_cancelled": "The operation was cancelled.",
+        "progress_status": "{phase}... {percent}%",
+        "phase_loading": "Loading scene file",
+        "phase_extracting": "Extracting objects",
+        "phase_verifying": "Verifying files",
+        "phase_summary": "Building summary",
+        "phase_scanning": "Scanning StreamingAssets",
+        "phase_diffing": "Comparing scenes",
+        "phase_exporting": "Writing report",
+        "menu_file": "File",
+        "menu_export_report": "Export Report...",
+        "export_analyze_first": "Please analyze the scene data before exporting a report.",
+        "report_exported": "Report exported ({count} records): {path}",
+        "compare_button": "Compare with Scene",
+        "select_compare_scene": "Select the scene file to compare with (newer revision)",
+        "diff_header": "=== Scene comparison: {old} -> {new} ===",
+        "diff_added": "[added] {name} (Path: {path}) x{new_count}",
+        "diff_removed": "[removed] {name} (Path: {path}) x{old_count}",
+        "diff_changed": "[count] {name} (Path: {path}) {old_count} -> {new_count}",
+        "diff_no_changes": "No differences in asset references.",
+        "diff_stats": "Changed regions: {regions} (subtrees compared: {compared}, skipped as identical: {skipped})",
+        "diff_description": "Compare the asset references of two scene files and show added, removed and count-changed references.",
+        "diff_old_help": "Scene file to compare from (older revision)",
+        "diff_new_help": "Scene file to compare to (newer revision)",
+        "batch_report_help": "Write references and issues to a report file (format chosen by the .jsonl / .json / .csv / .xml extension)",
+        "batch_report_format_help": "Report format (defaults to the one matching the file extension)",
+        "batch_description": "Check many scene files at once without the GUI.",
+        "batch_scenes_help": "Scene files (*.json) or folders containing scene files",
+        "batch_assets_help": "Path to the StreamingAssets folder (defaults to the value in settings)",
+        "batch_workers_help": "Number of processes analyzing in parallel (defaults to the CPU count)",
+        "batch_quiet_help": "Do not print scenes without issues",
+        "batch_no_scenes": "No scene files to check were found.",
+        "batch_no_assets": "StreamingAssets folder is not set; file existence will not be verified.",
+        "batch_scene_ok": "[OK] {path}",
+        "batch_scene_issues": "[NG] {path}",
+        "batch_summary": "Checked {total} scene(s) ({problems} with issues) in {seconds:.2f}s, {rate:.1f} scenes/s ({workers} processes)",
+        "service_description": "Keep the StreamingAssets index in memory and answer existence and scene check requests over local HTTP. While it runs, the GUI and batch checks use it automatically.",
+        "service_host_help": "Address to accept requests on (default: 127.0.0.1; 127.0.0.0/8 or localhost only)",
+        "service_host_not_local": "The index service only listens on IPv4 loopback addresses (127.0.0.0/8 or localhost): {host}",
+        "service_port_help": "Port to accept requests on (defaults to a free port)",
+        "service_interval_help": "Interval in seconds for applying StreamingAssets changes to the index",
+        "service_status_help": "Show the status of the running index service",
+        "service_no_assets": "StreamingAssets folder not found. Specify it with --assets.",
+        "service_started": "Index service started: {url} ({path}, {count} files). Press Ctrl+C to stop.",
+        "service_stopped": "Index service stopped.",
+        "service_not_running": "No index service is running for this StreamingAssets folder.",
+        "service_status": "{url}: {path} ({count} files, generation: {generation})",
+        "batch_index_help": "Use an index file (created with build_index.py) instead of scanning StreamingAssets (defaults to asset_index.idx when no file name is given)",
+        "index_file_unusable": "Index file {path} is missing, belongs to another folder, is corrupted or is older than changes to StreamingAssets; StreamingAssets was scanned instead.",
+        "index_description": "Scan StreamingAssets and rebuild the index file that can be searched right after launch without loading it.",
+        "index_output_help": "Path of the index file (default: asset_index.idx)",
+        "index_verify_help": "Check that the index file is not corrupted or outdated instead of rebuilding it",
+        "index_built": "Index file written: {path} ({assets}, {count} files, {seconds:.2f}s)",
+        "index_valid": "Index file is valid: {path} ({assets}, {count} files, built at {built})",
+        "index_invalid": "Index file cannot be used: {path} ({error})",
+        "index_outdated": "Index file does not reflect folder {directory}, which changed after it was built: {path} (rebuild it with build_index.py)",
+        "batch_catalog_help": "Record the scan results and per-scene references in the catalog (SQLite) (defaults to asset_catalog.db when no file name is given)",
+        "catalog_description": "Update and query the catalog (SQLite) of StreamingAssets scan results, per-scene references and scan history.",
+        "catalog_file_help": "Catalog file (default: asset_catalog.db)",
+        "catalog_scan_help": "Scan StreamingAssets and record it (additions and removals since the last scan go to the history)",
+        "catalog_assets_help": "List the assets matching the filters",
+        "catalog_scenes_help": "List the scenes using assets matching the filters (scenes are recorded with batch_check.py --catalog)",
+        "catalog_subfolder_help": "Subfolder name (an empty string means directly in the category folder)",
+        "catalog_name_help": "Name without extension (case-insensitive; * and ? allowed)",
+        "catalog_changes_help": "List added and removed assets",
+        "catalog_since_help": "Number of days or a date (e.g. 7, 2024-05-01)",
+        "catalog_unused_help": "List assets not referenced by any recorded scene",
+        "catalog_history_help": "Show the scan history",
+        "catalog_error": "Catalog error: {error}",
+        "catalog_scanned": "Recorded in the catalog: {path} ({asset_count} files, added: {added}, removed: {removed})",
+        "catalog_scene_item": "{scene} ({references} references, {count} uses)",
+        "catalog_history_item": "{time}  {root}  {asset_count} files (added: {added}, removed: {removed})",
+        "menu_record_catalog": "Record in Catalog",
+        "menu_catalog_search": "Search Catalog...",
+        "dialog_catalog": "Search Catalog",
+        "catalog_category": "Category",
+        "catalog_category_all": "All",
+        "catalog_subfolder": "Subfolder",
+        "catalog_name": "Name",
+        "catalog_days": "Days",
+        "catalog_find_scenes": "Scenes Using",
+        "catalog_find_assets": "Assets",
+        "catalog_find_changes": "Added / Removed",
+        "catalog_find_unused": "Unused",
+        "catalog_show_history": "Scan History",
+        "catalog_no_results": "No matching records.",
+        "catalog_result_count": "{count} results"
     }
 }
 
@@ -6,16 +6,55 @@
 
 import os
 import json
+import sqlite3
+import time
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 
 from .translations import get_text
-from .dialogs import LanguageDialog
+from .catalog import AssetCatalog
+from .dialogs import CatalogDialog, LanguageDialog
+from .worker import BackgroundTask
+from .profiling import PhaseProfiler
+from .report_export import create_report_writer, iter_scene_records, iter_unused_records
+from .scene_diff import SceneDiffer
 
 
 class MainUI(tk.Tk):
     """メインUIクラス"""
     
+    # 抽出結果のキー、表示名の翻訳キー、カテゴリ名
+    CATEGORIES = (
+        ("environments", "env_category", "Environment"),
+        ("props", "prop_category", "Props"),
+        ("characters", "char_category", "Characters"),
+        ("particles", "particle_category", "Particles")
+    )
+    
+    # 処理フェーズごとの進捗バーの範囲（%）
+    PHASE_RANGES = {
+        "phase_loading": (0, 100),
+        "phase_scanning": (0, 100),
+        "phase_diffing": (0, 100),
+        "phase_exporting": (0, 100),
+        "phase_extracting": (0, 60),
+        "phase_verifying": (60, 95),
+        "phase_summary": (95, 100)
+    }
+    
+    # バックグラウンド処理の通知を確認する間隔（ミリ秒）
+    POLL_INTERVAL = 50
+    
+    # ツリーに行を挿入する1回あたりの時間（秒）
+    TREE_SLICE_SECONDS = 0.015
+    
+    # StreamingAssetsの変更を確認する間隔（ミリ秒）
+    WATCH_POLL_INTERVAL = 1000
+    
+    # 開いているシーンファイルの変更を確認する間隔（ミリ秒）と、保存が終わったとみなすまでの待ち時間（秒）
+    SCENE_POLL_INTERVAL = 500
+    SCENE_DEBOUNCE_SECONDS = 1.0
+    
     def __init__(self, config_manager, asset_manager, analyzer):
         super().__init__()
         
@@ -26,10 +65,46 @@ class MainUI(tk.Tk):
         # データ保存用
         self.current_file_path = None
         self.scene_data = None
+        self.scene_hash = None        # 読み込んだシーンデータの内容のハッシュ値（分析結果のキャッシュのキー）
+        self.scene_streaming = False  # 大きなシーンは分析時にストリーム読み込みする
+        self.analysis_result = None   # 最後の分析結果（監視による再検証用）
+        self.cached_result = None     # キャッシュから復元した分析結果（JSONの解析を省略）
+        
+        # 実行中のバックグラウンド処理と完了時の処理
+        self._task = None
+        self._task_done = None
+        
+        # デバッグ表示と処理フェーズの計測結果（StreamingAssetsスキャン / シーン読み込み）
+        self.debug_mode = False
+        self.scan_profiler = None
+        self.load_profiler = None
+        
+        # ツリーの遅延挿入の状態（カテゴリ行のID → 行のリスト / 挿入済みの数 / after()のID）
+        self._tree_rows = {}
+        self._tree_progress = {}
+        self._tree_jobs = {}
+        
+        # 表示中のツリーの内容（カテゴリの表示名 → カテゴリ行のID / カテゴリ行のID → すべての行）
+        self._tree_categories = {}
+        self._tree_all_rows = {}
+        
+        # 開いているシーンファイルの監視（前回のサイズと更新時刻 / 変更を検出した時刻 / 次の確認のafter()のID）
+        self._scene_stat = None
+        self._scene_changed_at = None
+        self._scene_poll_job = None
+        
+        # StreamingAssetsフォルダの監視で検出した変更の次の確認（after()のID）
+        self._watch_poll_job = None
+        
+        # カタログ（初めて使うときに開く）と、スキャン結果・分析結果を記録するかどうか
+        self.catalog = None
+        self.catalog_var = tk.BooleanVar(value=bool(config_manager.get_setting("record_catalog", False)))
+        self.catalog_recording = False
         
         # 色の定義
         self.workshop_color = "#90EE90"
         self.missing_file_color = "#FF0000"
+        self.unused_file_color = "#808080"
         self.subfolder_colors = {
             "Props": "#FFC800",
             "Environment": "#87CEFA",
@@ -41,8 +116,10 @@ class MainUI(tk.Tk):
         self._create_menu_bar()
         self._setup_ui()
         
-        # 保存されたStreamingAssetsパスを読み込み
-        self._load_streaming_assets_path()
+        # 保存されたStreamingAssetsパスの読み込みは、ウィンドウを表示してからバックグラウンドで行う
+        if self.catalog_var.get():
+            self._toggle_catalog()
+        self.after_idle(self._load_streaming_assets_path)
     
     def _setup_window(self):
         """ウィンドウの基本設定"""
@@ -58,12 +135,29 @@ class MainUI(tk.Tk):
         self.menu_bar = tk.Menu(self)
         self.config(menu=self.menu_bar)
         
+        # ファイルメニュー
+        file_menu = tk.Menu(self.menu_bar, tearoff=0)
+        file_menu.add_command(
+            label=self.get_text("menu_export_report"),
+            command=self._export_report
+        )
+        file_menu.add_command(
+            label=self.get_text("menu_catalog_search"),
+            command=self._show_catalog_dialog
+        )
+        self.menu_bar.add_cascade(label=self.get_text("menu_file"), menu=file_menu)
+        
         # 設定メニュー
         settings_menu = tk.Menu(self.menu_bar, tearoff=0)
         settings_menu.add_command(
             label=self.get_text("menu_language"), 
             command=self._show_language_dialog
         )
+        settings_menu.add_checkbutton(
+            label=self.get_text("menu_record_catalog"),
+            variable=self.catalog_var,
+            command=self._toggle_catalog
+        )
         self.menu_bar.add_cascade(label=self.get_text("menu_settings"), menu=settings_menu)
     
     def _show_language_dialog(self):
@@ -79,6 +173,38 @@ class MainUI(tk.Tk):
             self.menu_bar.destroy()
             self._create_menu_bar()
     
+    def _get_catalog(self):
+        """カタログを開く（開けなければエラーを表示してNone）"""
+        if self.catalog is None:
+            try:
+                self.catalog = AssetCatalog()
+            except sqlite3.Error as e:
+                self._set_text_content(self.get_text("catalog_error", error=str(e)))
+        return self.catalog
+    
+    def _toggle_catalog(self):
+        """スキャン結果と分析結果をカタログに記録するかどうかの切り替え"""
+        self.config_manager.set_setting("record_catalog", self.catalog_var.get())
+        self.catalog_recording = bool(self.catalog_var.get() and self._get_catalog())
+        if self.catalog_var.get() and not self.catalog_recording:
+            self.catalog_var.set(False)
+    
+    def _record_catalog(self, record, profiler):
+        """カタログに記録する（記録しない設定ならなにもしない、ワーカースレッドで実行）"""
+        if not self.catalog_recording:
+            return
+        with profiler.phase("catalog_record"):
+            try:
+                record(self.catalog)
+            except sqlite3.Error as e:
+                print(f"カタログの記録エラー: {e}")
+    
+    def _show_catalog_dialog(self):
+        """カタログ検索ダイアログを表示"""
+        catalog = self._get_catalog()
+        if catalog:
+            CatalogDialog(self, catalog, self.asset_manager.streaming_assets_path, self.get_text)
+    
     def _update_ui_texts(self):
         """UI全体のテキストを現在の言語で更新"""
         self.title(self.get_text("window_title"))
@@ -102,10 +228,15 @@ class MainUI(tk.Tk):
             ('assets_group', 'assets_group'),
             ('options_group', 'options_group'),
             ('file_select_button', 'select_json'),
+            ('compare_button', 'compare_button'),
             ('assets_select_button', 'select_assets'),
             ('verify_files_cb', 'verify_files'),
+            ('unused_cb', 'check_unused'),
             ('debug_cb', 'show_debug'),
-            ('analyze_button', 'analyze_button')
+            ('watch_cb', 'watch_assets'),
+            ('auto_reanalyze_cb', 'auto_reanalyze'),
+            ('analyze_button', 'analyze_button'),
+            ('cancel_button', 'cancel_button')
         ]
         
         for attr_name, text_key in ui_elements:
@@ -136,6 +267,9 @@ class MainUI(tk.Tk):
         
         # テキスト表示エリア
         self._create_text_area(paned)
+        
+        # 進捗表示エリア
+        self._create_progress_area(main_frame)
 
         # 分析ボタン
         self.analyze_button = ttk.Button(
@@ -145,6 +279,25 @@ class MainUI(tk.Tk):
         )
         self.analyze_button.pack(fill=tk.X)
     
+    def _create_progress_area(self, parent):
+        """進捗バーとキャンセルボタンを作成"""
+        progress_frame = ttk.Frame(parent)
+        progress_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        self.cancel_button = ttk.Button(
+            progress_frame,
+            text=self.get_text("cancel_button"),
+            command=self._cancel_task,
+            state=tk.DISABLED
+        )
+        self.cancel_button.pack(side=tk.RIGHT)
+        
+        self.progress_bar = ttk.Progressbar(progress_frame, mode="determinate", maximum=100)
+        self.progress_bar.pack(side=tk.RIGHT, fill=tk.X, expand=True, padx=(10, 10))
+        
+        self.progress_label = ttk.Label(progress_frame, text="", width=40)
+        self.progress_label.pack(side=tk.LEFT)
+    
     def _create_file_selection_area(self, parent):
         """ファイル選択エリアを作成"""
         file_frame = ttk.Frame(parent)
@@ -160,6 +313,9 @@ class MainUI(tk.Tk):
         self.file_path_label = ttk.Label(json_inner_frame, text=self.get_text("json_not_selected"))
         self.file_path_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
 
+        self.compare_button = ttk.Button(json_inner_frame, text=self.get_text("compare_button"), command=self._compare_scene)
+        self.compare_button.pack(side=tk.RIGHT, padx=(5, 0))
+
         self.file_select_button = ttk.Button(json_inner_frame, text=self.get_text("select_json"), command=self._select_file)
         self.file_select_button.pack(side=tk.RIGHT)
 
@@ -193,6 +349,41 @@ class MainUI(tk.Tk):
             variable=self.verify_var
         )
         self.verify_files_cb.pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.unused_var = tk.BooleanVar(value=False)
+        self.unused_cb = ttk.Checkbutton(
+            options_inner_frame,
+            text=self.get_text("check_unused"),
+            variable=self.unused_var
+        )
+        self.unused_cb.pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.debug_var = tk.BooleanVar(value=False)
+        self.debug_cb = ttk.Checkbutton(
+            options_inner_frame,
+            text=self.get_text("show_debug"),
+            variable=self.debug_var,
+            command=self._toggle_debug_mode
+        )
+        self.debug_cb.pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.watch_var = tk.BooleanVar(value=False)
+        self.watch_cb = ttk.Checkbutton(
+            options_inner_frame,
+            text=self.get_text("watch_assets"),
+            variable=self.watch_var,
+            command=self._toggle_watch
+        )
+        self.watch_cb.pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.auto_reanalyze_var = tk.BooleanVar(value=False)
+        self.auto_reanalyze_cb = ttk.Checkbutton(
+            options_inner_frame,
+            text=self.get_text("auto_reanalyze"),
+            variable=self.auto_reanalyze_var,
+            command=self._toggle_auto_reanalyze
+        )
+        self.auto_reanalyze_cb.pack(side=tk.LEFT, padx=(0, 10))
     
     def _create_tree_view_area(self, parent):
         """ツリービューエリアを作成"""
@@ -209,7 +400,7 @@ class MainUI(tk.Tk):
         self.tree_widget = ttk.Treeview(
             tree_frame, 
             columns=("object", "path", "status"), 
-            show="headings",
+            show=("tree", "headings"),
             yscrollcommand=tree_scroll_y.set,
             xscrollcommand=tree_scroll_x.set
         )
@@ -224,17 +415,23 @@ class MainUI(tk.Tk):
         self.tree_widget.heading("path", text=self.get_text("column_path"))
         self.tree_widget.heading("status", text=self.get_text("column_status"))
         
+        # 展開ボタン用の列
+        self.tree_widget.column("#0", width=40, stretch=False)
         self.tree_widget.column("object", width=300)
         self.tree_widget.column("path", width=400)
         self.tree_widget.column("status", width=100)
         
         # タグの設定
         self._setup_tree_tags()
+        
+        # カテゴリの子の行は初めて展開したときに挿入する
+        self.tree_widget.bind("<<TreeviewOpen>>", self._on_tree_open)
     
     def _setup_tree_tags(self):
         """ツリービューのタグを設定"""
         self.tree_widget.tag_configure("missing", foreground=self.missing_file_color)
         self.tree_widget.tag_configure("workshop", background=self.workshop_color)
+        self.tree_widget.tag_configure("unused", foreground=self.unused_file_color)
         for category, color in self.subfolder_colors.items():
             self.tree_widget.tag_configure(f"subfolder_{category.lower()}", background=color)
     
@@ -260,6 +457,22 @@ class MainUI(tk.Tk):
         self.asset_manager.debug_mode = self.debug_mode
         self.analyzer.debug_mode = self.debug_mode
     
+    def _new_profiler(self):
+        """処理フェーズの計測オブジェクトを作成（デバッグ表示中はメモリも計測）"""
+        return PhaseProfiler(trace_memory=self.debug_mode)
+    
+    def _show_debug_info(self, profilers, **context):
+        """デバッグ表示が有効なら計測結果をテキストエリアに追記し、JSONLログにも記録"""
+        if not self.debug_mode:
+            return
+        merged = PhaseProfiler()
+        for profiler in profilers:
+            merged.extend(profiler)
+        if not merged.records:
+            return
+        self._append_text_content("\n\n" + self.get_text("debug_header") + "\n" + merged.format_text() + "\n")
+        merged.append_to_log(**context)
+    
     def _select_file(self):
         """JSONファイルを選択"""
         file_path = filedialog.askopenfilename(
@@ -269,52 +482,371 @@ class MainUI(tk.Tk):
         if file_path:
             self.current_file_path = file_path
             self.file_path_label["text"] = os.path.basename(file_path)
+            self.scene_data = None
+            self.scene_hash = None
+            self.analysis_result = None
+            self.cached_result = None
+            self._scene_stat = self._get_scene_stat(file_path)
+            self._scene_changed_at = None
             
-            # ファイル読み込み
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    self.scene_data = json.load(f)
-                self._set_text_content(self.get_text("file_loaded", path=file_path))
-            except json.JSONDecodeError as e:
-                self._set_text_content(self.get_text("json_error", error=str(e)))
-                self.scene_data = None
-            except Exception as e:
-                self._set_text_content(self.get_text("file_error", error=str(e)))
+            # 大きなファイルはJSON全体を読み込まず、分析時にストリーム処理する
+            self.scene_streaming = self.analyzer.should_stream(file_path)
+            if self.scene_streaming:
+                self._set_text_content(self.get_text("file_streaming", path=file_path))
+                return
+            
+            # ファイル読み込み（ワーカースレッドで実行）
+            self.load_profiler = None
+            self._start_task(self._load_scene_task, self._on_scene_loaded, file_path, self._new_profiler())
+    
+    def _compare_scene(self):
+        """読み込み中のシーンと別のシーン（新しいリビジョンなど）のアセット参照を比較"""
+        if not self.current_file_path:
+            self._set_text_content(self.get_text("select_json_first"))
+            return
+        new_path = filedialog.askopenfilename(
+            title=self.get_text("select_compare_scene"),
+            filetypes=[("JSONファイル", "*.json")]
+        )
+        if new_path:
+            self._start_task(self._diff_task, self._set_text_content,
+                             self.current_file_path, new_path, self.scene_data)
+    
+    def _diff_task(self, report, old_path, new_path, old_data=None):
+        """2つのシーンを比較して結果のテキストを返す（ワーカースレッドで実行）"""
+        report("phase_diffing", 0.0)
+        differ = SceneDiffer(self.analyzer)
+        if old_data is None:
+            with open(old_path, 'r', encoding='utf-8') as f:
+                old_data = json.load(f)
+        report("phase_diffing", 0.4)
+        with open(new_path, 'r', encoding='utf-8') as f:
+            new_data = json.load(f)
+        report("phase_diffing", 0.8)
+        result = differ.diff(old_data, new_data, differ.cached_totals(old_path), differ.cached_totals(new_path))
+        return differ.format_text(result, self.get_text, os.path.basename(old_path), os.path.basename(new_path))
+    
+    def _load_scene_task(self, report, file_path, profiler):
+        """シーンファイルを読み込む（ワーカースレッドで実行、変更のないシーンはキャッシュを使用）"""
+        report("phase_loading", 0.0)
+        with profiler.phase("json_load", items=os.path.getsize(file_path)):
+            # 分析結果は読み込んだ内容のハッシュ値で保存する（分析前にファイルが保存されても混ざらない）
+            scene_data, cached, scene_hash = self.analyzer.load_scene(file_path)
+        report("phase_loading", 1.0)
+        return file_path, scene_data, scene_hash, profiler, cached
+    
+    def _on_scene_loaded(self, result):
+        """シーンファイルの読み込み完了時の処理"""
+        file_path, scene_data, scene_hash, profiler, cached = result
+        if file_path != self.current_file_path:
+            return
+        self.scene_data = scene_data
+        self.scene_hash = scene_hash
+        self.cached_result = cached
+        self.load_profiler = profiler
+        text_key = "file_loaded_cached" if cached else "file_loaded"
+        self._set_text_content(self.get_text(text_key, path=file_path))
+    
+    def _start_task(self, func, on_done, *args):
+        """バックグラウンド処理を開始し、完了まで操作ボタンを無効にする"""
+        if self._task:
+            return
+        self._task = BackgroundTask(func, *args).start()
+        self._task_done = on_done
+        self._set_busy(True)
+        self.after(self.POLL_INTERVAL, self._poll_task)
+    
+    def _poll_task(self):
+        """バックグラウンド処理の通知を確認（Tkのメインスレッドで実行）"""
+        task = self._task
+        if not task:
+            return
+        
+        finished = False
+        for message in task.poll():
+            kind = message[0]
+            if kind == "progress":
+                self._show_progress(message[1], message[2])
+            elif kind == "done":
+                finished = True
+                self._finish_task()
+                self._task_done(message[1])
+            elif kind == "error":
+                finished = True
+                self._finish_task()
+                self._show_task_error(message[1])
+            elif kind == "cancelled":
+                finished = True
+                self._finish_task()
+                self._set_text_content(self.get_text("task_cancelled"))
+        
+        if not finished:
+            self.after(self.POLL_INTERVAL, self._poll_task)
+    
+    def _cancel_task(self):
+        """実行中のバックグラウンド処理をキャンセル"""
+        if self._task:
+            self._task.cancel()
+            self.cancel_button.config(state=tk.DISABLED)
+    
+    def _finish_task(self):
+        """バックグラウンド処理の終了後にUIを元に戻す"""
+        self._task = None
+        self._set_busy(False)
+        self.progress_bar["value"] = 0
+        self.progress_label["text"] = ""
+    
+    def _set_busy(self, busy):
+        """処理中は操作ボタンを無効にし、キャンセルボタンを有効にする"""
+        state = tk.DISABLED if busy else tk.NORMAL
+        for button in (self.file_select_button, self.compare_button, self.assets_select_button, self.analyze_button):
+            button.config(state=state)
+        self.cancel_button.config(state=tk.NORMAL if busy else tk.DISABLED)
+    
+    def _show_progress(self, phase, fraction):
+        """進捗バーとフェーズ名を更新（fractionがNoneの場合はフェーズの開始位置）"""
+        start, end = self.PHASE_RANGES.get(phase, (0, 100))
+        percent = start + (end - start) * min(fraction or 0.0, 1.0)
+        self.progress_bar["value"] = percent
+        self.progress_label["text"] = self.get_text("progress_status", phase=self.get_text(phase), percent=int(percent))
+    
+    def _show_task_error(self, error):
+        """バックグラウンド処理のエラーを表示"""
+        if isinstance(error, ValueError):
+            # json.JSONDecodeError とストリーム読み込みの構文エラー
+            self._set_text_content(self.get_text("json_error", error=str(error)))
+            if not self.scene_streaming:
                 self.scene_data = None
+                self.scene_hash = None
+        else:
+            self._set_text_content(self.get_text("file_error", error=str(error)))
+    
     def _select_streaming_assets(self):
         """StreamingAssetsフォルダを選択"""
         folder_path = filedialog.askdirectory(title="StreamingAssetsフォルダを選択")
         if folder_path:
-            self.asset_manager.set_streaming_assets_path(folder_path)
-            self.assets_path_label["text"] = os.path.basename(folder_path) or folder_path
-            
-            # パスを設定に保存
-            self.config_manager.set_streaming_assets_path(folder_path)
-            
-            # 見つかったファイルの情報を表示
-            asset_summary = self.get_text("scan_results") + "\n"
-            summary = self.asset_manager.get_asset_summary()
-            
-            for category, count in summary.items():
-                asset_summary += self.get_text("files_detected", category=category, count=count) + "\n"
-                    
-            self._set_text_content(asset_summary)
+            # パスはスキャンが完了してから設定に保存する（_on_scan_done）
+            self._scan_streaming_assets(folder_path)
     
     def _load_streaming_assets_path(self):
         """保存されたStreamingAssetsパスを読み込み"""
         saved_path = self.config_manager.get_streaming_assets_path()
         if saved_path and os.path.exists(saved_path):
-            self.asset_manager.set_streaming_assets_path(saved_path)
-            self.assets_path_label["text"] = os.path.basename(saved_path) or saved_path
-            
-            # 見つかったファイルの情報を表示
-            asset_summary = self.get_text("scan_results") + "\n"
-            summary = self.asset_manager.get_asset_summary()
-            
-            for category, count in summary.items():
-                asset_summary += self.get_text("files_detected", category=category, count=count) + "\n"
-                    
-            self._set_text_content(asset_summary)
+            self._scan_streaming_assets(saved_path)
+    
+    def _scan_streaming_assets(self, folder_path):
+        """StreamingAssetsフォルダをスキャン（ワーカースレッドで実行、キャッシュがあれば変更分のみ）"""
+        if self._task:
+            return
+        self.assets_path_label["text"] = os.path.basename(folder_path) or folder_path
+        self._start_task(self._scan_task, self._on_scan_done, folder_path, self._new_profiler())
+    
+    def _scan_task(self, report, folder_path, profiler):
+        """StreamingAssetsフォルダをスキャンしてインデックスを作成（ワーカースレッドで実行）
+        
+        同じフォルダのインデックスサービスが起動していれば、スキャンせずにサービスを使います。
+        """
+        report("phase_scanning", 0.0)
+        with profiler.phase("scan_streaming_assets") as record:
+            self.asset_manager.set_streaming_assets_path(folder_path, use_service=True)
+            record.items = sum(self.asset_manager.get_asset_summary().values())
+        self._record_catalog(lambda catalog: catalog.record_scan(self.asset_manager), profiler)
+        return folder_path, profiler
+    
+    def _on_scan_done(self, result):
+        """スキャン完了時に結果を表示"""
+        folder_path, profiler = result
+        self.scan_profiler = profiler
+        
+        # パスを設定に保存
+        self.config_manager.set_streaming_assets_path(folder_path)
+        
+        # 見つかったファイルの情報を表示
+        asset_summary = self.get_text("scan_results") + "\n"
+        summary = self.asset_manager.get_asset_summary()
+        
+        for category, count in summary.items():
+            asset_summary += self.get_text("files_detected", category=category, count=count) + "\n"
+        if self.asset_manager.index_service:
+            asset_summary += self.get_text("using_index_service", url=self.asset_manager.index_service.url) + "\n"
+                
+        self._set_text_content(asset_summary)
+        self._show_debug_info([profiler], streaming_assets=folder_path, **self.asset_manager.last_scan_stats)
+        
+        # 監視中なら新しいフォルダの監視に切り替える
+        if self.watch_var.get() and self.asset_manager.start_watching():
+            self._schedule_watch_poll()
+    
+    def _toggle_watch(self):
+        """StreamingAssetsフォルダの監視の切り替え"""
+        if not self.watch_var.get():
+            self.asset_manager.stop_watching()
+            if self._watch_poll_job is not None:
+                self.after_cancel(self._watch_poll_job)
+                self._watch_poll_job = None
+            return
+        if not self.asset_manager.start_watching():
+            self.watch_var.set(False)
+            if self.asset_manager.index_service:
+                # インデックスサービスが監視しているため不要
+                self._set_text_content(self.get_text("watch_index_service"))
+            else:
+                self._set_text_content(self.get_text("watch_select_assets"))
+            return
+        self._schedule_watch_poll()
+    
+    def _schedule_watch_poll(self):
+        """監視で検出した変更の確認を予約（予約済みなら確認を重複させない）"""
+        if self._watch_poll_job is None:
+            self._watch_poll_job = self.after(self.WATCH_POLL_INTERVAL, self._poll_watch)
+    
+    def _poll_watch(self):
+        """監視で検出した変更をインデックスに反映し、影響する参照の再検証を提案"""
+        self._watch_poll_job = None
+        if not self.asset_manager.watcher:
+            return
+        
+        # 分析中はインデックスを変更しない（次回に持ち越す）
+        if not self._task:
+            affected = self.asset_manager.apply_watch_changes()
+            if affected:
+                self._on_assets_changed(affected)
+        self._schedule_watch_poll()
+    
+    def _on_assets_changed(self, affected):
+        """インデックスの変更を表示し、分析結果があれば影響する参照だけを再検証"""
+        count = sum(len(keys) for keys in affected.values())
+        self._append_text_content("\n" + self.get_text("assets_changed", count=count) + "\n")
+        
+        result = self.analysis_result
+        if not result:
+            return
+        references = set()
+        if result["verify"]:
+            references = {
+                (category, record.path)
+                for category, records in result["verifications"].items()
+                for record in records if record.key in affected.get(category, ())
+            }
+        if not references and not result["check_unused"]:
+            return
+        if messagebox.askyesno(self.get_text("reverify_title"),
+                               self.get_text("reverify_prompt", count=len(references))):
+            self._start_task(self._reverify_task, self._on_reanalysis_done,
+                             result, references, self._new_profiler())
+    
+    def _reverify_task(self, report, result, references, profiler):
+        """変更の影響を受ける参照だけを再検証（ワーカースレッドで実行）"""
+        # 影響を受けない参照は前回の存在確認の結果を使う
+        known_status = {
+            (category, record.path): record.exists
+            for category, records in result["verifications"].items()
+            for record in records if (category, record.path) not in references
+        }
+        report("phase_verifying", 0.0)
+        with profiler.phase("verify_paths", items=len(references)):
+            verifications = self.analyzer.verify_paths(result["object_counts"], result["verify"], known_status)
+        
+        report("phase_summary", 0.0)
+        return self._build_analysis_result(
+            result["extracted_objects"], result["object_counts"], verifications,
+            result["verify"], result["check_unused"], profiler
+        )
+    
+    def _toggle_auto_reanalyze(self):
+        """開いているシーンファイルの監視（保存時の自動再分析）の切り替え"""
+        if not self.auto_reanalyze_var.get():
+            if self._scene_poll_job is not None:
+                self.after_cancel(self._scene_poll_job)
+                self._scene_poll_job = None
+            return
+        self._scene_stat = self._get_scene_stat(self.current_file_path)
+        self._scene_changed_at = None
+        if self._scene_poll_job is None:
+            self._scene_poll_job = self.after(self.SCENE_POLL_INTERVAL, self._poll_scene_file)
+    
+    @staticmethod
+    def _get_scene_stat(file_path):
+        """シーンファイルの (サイズ, 更新時刻) を取得（ファイルがなければNone）"""
+        if not file_path:
+            return None
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+    
+    def _poll_scene_file(self):
+        """シーンファイルの変更を確認し、一定時間変化がなくなったら再分析する"""
+        self._scene_poll_job = None
+        if not self.auto_reanalyze_var.get():
+            return
+        stat = self._get_scene_stat(self.current_file_path)
+        if stat != self._scene_stat:
+            # 保存中は変化が続くので、最後の変化から SCENE_DEBOUNCE_SECONDS 待つ
+            self._scene_stat = stat
+            self._scene_changed_at = time.monotonic() if stat else None
+        elif (self._scene_changed_at is not None and not self._task and
+              time.monotonic() - self._scene_changed_at >= self.SCENE_DEBOUNCE_SECONDS):
+            self._scene_changed_at = None
+            verify = bool(self.verify_var.get() and self.asset_manager.streaming_assets_path)
+            check_unused = bool(self.unused_var.get() and self.asset_manager.streaming_assets_path)
+            self._start_task(self._reanalyze_task, self._on_scene_reanalyzed,
+                             self.current_file_path, verify, check_unused, self._new_profiler())
+        self._scene_poll_job = self.after(self.SCENE_POLL_INTERVAL, self._poll_scene_file)
+    
+    def _reanalyze_task(self, report, file_path, verify, check_unused, profiler):
+        """変更されたシーンファイルを読み込み直して分析（ワーカースレッドで実行）"""
+        streaming = self.analyzer.should_stream(file_path)
+        scene_data = scene_hash = cached = None
+        if not streaming:
+            _, scene_data, scene_hash, _, cached = self._load_scene_task(report, file_path, profiler)
+        result = self._analysis_task(report, scene_data, file_path if streaming else None, verify, check_unused,
+                                     profiler, file_path, cached, scene_hash)
+        return file_path, scene_data, scene_hash, streaming, cached, result
+    
+    def _on_scene_reanalyzed(self, reanalyzed):
+        """自動再分析の完了時に、変わった行だけツリーに反映"""
+        file_path, scene_data, scene_hash, streaming, cached, result = reanalyzed
+        if file_path != self.current_file_path:
+            return
+        self.scene_data = scene_data
+        self.scene_hash = scene_hash
+        self.scene_streaming = streaming
+        self.cached_result = cached
+        # 読み込みの計測結果は分析の計測結果に含まれている
+        self.load_profiler = None
+        self._on_reanalysis_done(result)
+        self._append_text_content("\n" + self.get_text("scene_reanalyzed", path=file_path) + "\n")
+    
+    def _export_report(self):
+        """分析結果の参照と問題点をレポートファイルに書き出す"""
+        if not self.analysis_result:
+            self._set_text_content(self.get_text("export_analyze_first"))
+            return
+        file_path = filedialog.asksaveasfilename(
+            title=self.get_text("menu_export_report"),
+            defaultextension=".jsonl",
+            filetypes=[("JSON Lines", "*.jsonl"), ("JSON", "*.json"), ("CSV", "*.csv"), ("JUnit XML", "*.xml")]
+        )
+        if file_path:
+            self._start_task(self._export_task, self._on_report_exported,
+                             file_path, self.current_file_path, self.analysis_result)
+    
+    def _export_task(self, report, file_path, scene_path, result):
+        """レポートを1件ずつ書き出す（ワーカースレッドで実行）"""
+        report("phase_exporting", 0.0)
+        with create_report_writer(file_path) as writer:
+            writer.write_all(iter_scene_records(scene_path, result["verifications"], self.get_text))
+            if result["unused_files"] is not None:
+                writer.write_all(iter_unused_records(result["unused_files"], self.get_text))
+        report("phase_exporting", 1.0)
+        return file_path, writer.count
+    
+    def _on_report_exported(self, exported):
+        """レポートの書き出し完了を表示"""
+        file_path, count = exported
+        self._append_text_content("\n" + self.get_text("report_exported", path=file_path, count=count) + "\n")
     
     def _set_text_content(self, text):
         """テキストエディタの内容を設定"""
@@ -323,143 +855,410 @@ class MainUI(tk.Tk):
         self.text_edit.insert(tk.END, text)
         self.text_edit.config(state=tk.DISABLED)
     
+    def _append_text_content(self, text):
+        """テキストエディタの末尾にテキストを追加"""
+        self.text_edit.config(state=tk.NORMAL)
+        self.text_edit.insert(tk.END, text)
+        self.text_edit.config(state=tk.DISABLED)
+    
     def _analyze_scene_data(self):
-        """シーンデータを分析"""
-        if not self.scene_data:
+        """シーンデータを分析（抽出・検証・サマリー作成はワーカースレッドで実行）"""
+        if not self.scene_data and not self.scene_streaming and not self.cached_result:
             self._set_text_content(self.get_text("select_json_first"))
             return
         
-        # ツリーをクリア
-        for item in self.tree_widget.get_children():
-            self.tree_widget.delete(item)
+        # Tkの変数はメインスレッドで読み取っておく
+        verify = bool(self.verify_var.get() and self.asset_manager.streaming_assets_path)
+        check_unused = bool(self.unused_var.get() and self.asset_manager.streaming_assets_path)
+        stream_path = self.current_file_path if self.scene_streaming else None
+        self._start_task(self._analysis_task, self._on_analysis_done,
+                         self.scene_data, stream_path, verify, check_unused, self._new_profiler(),
+                         self.current_file_path, self.cached_result, self.scene_hash)
+    
+    def _analysis_task(self, report, scene_data, stream_path, verify, check_unused=False, profiler=None,
+                       scene_path=None, cached=None, scene_hash=None):
+        """シーンデータの分析（ワーカースレッドで実行、ウィジェットには触れない）
+        
+        scene_pathを指定すると分析結果をキャッシュに保存します。キャッシュのキーは
+        scene_hash（scene_dataを読み込んだ時点の内容のハッシュ値）です。cachedはキャッシュから
+        復元した分析結果で、抽出をせず、インデックスが変わっていなければ存在確認も省略します。
+        """
+        profiler = profiler or PhaseProfiler()
         
+        # 大きなシーンは読み込み時にキャッシュを確認していないのでここで確認
+        if cached is None and stream_path:
+            with profiler.phase("cache_lookup"):
+                scene_hash = self.analyzer.content_hash(stream_path)
+                cached = self.analyzer.load_cached_result(stream_path, scene_hash)
+        if cached:
+            extracted_objects, object_counts = cached["extracted_objects"], cached["object_counts"]
+            cached_status = self.analyzer.cached_file_status(cached)
+            scene_hash = cached["content_hash"]
+        else:
+            extracted_objects, object_counts = self._extract_and_group(report, scene_data, stream_path, profiler)
+            cached_status = None
+            if stream_path and scene_hash and self.analyzer.content_hash(stream_path) != scene_hash:
+                # 読み込み中にファイルが保存された（どちらの内容の結果か分からないので保存しない）
+                scene_hash = None
+        
+        # ユニークなパスごとに一度だけ分類と存在確認を行う（ツリー・サマリー・レポートで共有）
+        report("phase_verifying", 0.0)
+        with profiler.phase("verify_paths") as record:
+            verifications = self.analyzer.verify_paths(
+                object_counts, verify, cached_status,
+                progress=lambda fraction: report("phase_verifying", fraction)
+            )
+            record.items = sum(len(records) for records in verifications.values())
+        
+        # 新しい結果（抽出または存在確認をし直した場合）をキャッシュに保存
+        if scene_path and (not cached or (verify and cached_status is None)):
+            with profiler.phase("cache_store"):
+                self.analyzer.store_result(scene_hash, extracted_objects, object_counts,
+                                           verifications if verify else None)
+        if scene_path:
+            self._record_catalog(lambda catalog: catalog.record_scene(
+                scene_path, iter_scene_records(scene_path, verifications, self.get_text),
+                self.asset_manager.streaming_assets_path
+            ), profiler)
+        
+        report("phase_summary", 0.0)
+        result = self._build_analysis_result(extracted_objects, object_counts, verifications,
+                                             verify, check_unused, profiler)
+        if scene_path and not cached:
+            # 抽出結果（参照テーブル）を残し、再分析では抽出を省略する（シーンデータは破棄できる）
+            result["retained"] = (scene_path, self.analyzer.retained_result(
+                extracted_objects, object_counts, verifications if verify else None, scene_hash))
+        return result
+    
+    def _extract_and_group(self, report, scene_data, stream_path, profiler):
+        """参照を抽出し、同じパスのオブジェクトをまとめる（ワーカースレッドで実行）"""
         # オブジェクトを抽出
-        extracted_objects = self.analyzer.extract_objects(self.scene_data)
+        report("phase_extracting", 0.0)
+        with profiler.phase("extract_objects") as record:
+            if stream_path:
+                file_size = max(os.path.getsize(stream_path), 1)
+                extracted_objects = self.analyzer.extract_objects_from_file(
+                    stream_path, streaming=True,
+                    progress=lambda read: report("phase_extracting", read / file_size)
+                )
+            else:
+                extracted_objects = self.analyzer.extract_objects(
+                    scene_data, checkpoint=lambda processed: report("phase_extracting", None)
+                )
+            record.items = sum(len(objects) for objects in extracted_objects.values())
         
         # 重複オブジェクトをまとめる
-        env_counts = self.analyzer.group_objects_by_path(extracted_objects["environments"])
-        prop_counts = self.analyzer.group_objects_by_path(extracted_objects["props"])
-        char_counts = self.analyzer.group_objects_by_path(extracted_objects["characters"])
-        particle_counts = self.analyzer.group_objects_by_path(extracted_objects["particles"])
+        with profiler.phase("group_objects_by_path") as record:
+            object_counts = self.analyzer.group_extracted_objects(extracted_objects)
+            record.items = sum(len(counts) for counts in object_counts.values())
+        return extracted_objects, object_counts
+    
+    def _build_analysis_result(self, extracted_objects, object_counts, verifications, verify, check_unused, profiler):
+        """未使用ファイルのチェック、ツリーの表示内容とサマリーの生成（ワーカースレッドで実行）"""
+        # 未使用ファイルをチェック（検証済みの参照キーとインデックスの差集合）
+        unused_files = None
+        if check_unused:
+            with profiler.phase("find_unused_files") as record:
+                unused_files = self.asset_manager.find_unused_assets(self.analyzer.referenced_keys(verifications))
+                record.items = sum(len(assets) for assets in unused_files.values())
+        
+        # ツリーの表示内容とサマリーを生成
+        with profiler.phase("tree_build") as record:
+            tree_model = self._build_tree_model(extracted_objects, verifications, unused_files)
+            record.items = sum(len(rows) for _, rows in tree_model)
+        summary = self._generate_analysis_summary(extracted_objects, object_counts, verifications,
+                                                  verify, unused_files, profiler)
+        return {
+            "extracted_objects": extracted_objects,
+            "object_counts": object_counts,
+            "verifications": verifications,
+            "unused_files": unused_files,
+            "tree_model": tree_model,
+            "summary": summary,
+            "verify": verify,
+            "check_unused": check_unused,
+            "profiler": profiler
+        }
+    
+    def _on_analysis_done(self, result, patch_tree=False):
+        """分析完了時にツリーとサマリーを表示（patch_treeの場合は変わった行だけ更新）"""
+        self.analysis_result = result
+        scene_path, retained = result.pop("retained", (None, None))
+        if retained and scene_path == self.current_file_path:
+            # 解析したJSON全体はもう使わないため解放する
+            self.cached_result = retained
+            self.scene_data = None
+            self.scene_hash = None
+        profiler = result["profiler"]
+        if patch_tree and self._tree_categories:
+            with profiler.phase("tree_patch") as record:
+                record.items = self._patch_tree_model(result["tree_model"])
+        else:
+            with profiler.phase("tree_insert", items=len(result["tree_model"])):
+                self._show_tree_model(result["tree_model"])
+        self._set_text_content(result["summary"])
         
-        # ツリービューにカテゴリとアイテムを追加
-        self._add_category_to_tree(env_counts, "env_category", "Environment")
-        self._add_category_to_tree(prop_counts, "prop_category", "Props")
-        self._add_category_to_tree(char_counts, "char_category", "Characters")
-        self._add_category_to_tree(particle_counts, "particle_category", "Particles")
+        # デバッグ情報（読み込みからツリー表示までの各フェーズ）
+        profilers = [profiler] if self.scene_streaming else [self.load_profiler, profiler]
+        self._show_debug_info(profilers, scene=self.current_file_path)
+    
+    def _on_reanalysis_done(self, result):
+        """再分析・再検証の完了時に、展開状態とスクロール位置を保ったままツリーを更新"""
+        self._on_analysis_done(result, patch_tree=True)
+    
+    def _build_tree_model(self, extracted_objects, verifications, unused_files=None):
+        """ツリーに表示する内容を作成（ワーカースレッドで実行）
+        
+        戻り値は (カテゴリの表示名, [(行の値, タグ), ...]) のリストです。
+        """
+        model = []
+        for _, category_key, category in self.CATEGORIES:
+            rows = [self._build_tree_row(record) for record in verifications[category]]
+            if rows:
+                model.append((self.get_text(category_key), rows))
         
         # その他のオブジェクト
         if extracted_objects["other_objects"]:
-            other_root = self.tree_widget.insert("", tk.END, text=self.get_text("other_category"), 
-                                                values=(self.get_text("other_category"), "", ""))
-            for obj in extracted_objects["other_objects"]:
-                self.tree_widget.insert(other_root, tk.END, 
-                                      values=(obj.get('name', 'Unknown'), obj.get('path', ''), ""))
-        
-        # すべてのアイテムを展開
-        for item in self.tree_widget.get_children():
-            self.tree_widget.item(item, open=True)
-        
-        # サマリーを生成して表示
-        self._generate_analysis_summary(extracted_objects, env_counts, prop_counts, char_counts, particle_counts)
-    
-    def _add_category_to_tree(self, object_counts, category_key, category):
-        """カテゴリをツリーに追加"""
-        if object_counts:
-            category_root = self.tree_widget.insert("", tk.END, text=self.get_text(category_key), 
-                                                   values=(self.get_text(category_key), "", ""))
-            self._add_objects_to_tree(category_root, object_counts, category)
-    
-    def _add_objects_to_tree(self, parent_item, object_counts, category):
-        """オブジェクトをツリーに追加"""
-        for obj in object_counts:
-            name = obj['name']
-            path = obj['path']
-            count = obj['count']
-            
-            # 2回以上出現するオブジェクトは出現回数を表示
-            display_name = name
-            if count > 1:
-                display_name = f"{name} ({self.get_text('usage_count', count=count)})"
-            
-            # ツリーアイテム作成
-            item_id = self.tree_widget.insert(parent_item, tk.END, values=(display_name, path, ""))
-            
-            # サブフォルダの確認（色付け）
-            self._check_subfolder_display(item_id, path)
-            
-            # ファイルが存在するかチェック
-            if self.verify_var.get() and self.asset_manager.streaming_assets_path:
-                file_exists = self.asset_manager.check_file_exists(path, category)
-                
-                if file_exists:
-                    self.tree_widget.set(item_id, "status", self.get_text("file_verified"))
-                else:
-                    self.tree_widget.set(item_id, "status", self.get_text("file_not_found"))
-                    self.tree_widget.item(item_id, tags=("missing",))
-    
-    def _check_subfolder_display(self, item_id, path):
-        """サブフォルダ内のオブジェクトの表示を調整"""
-        if not path:
-            return False
-            
-        # "workshop/" はワークショップアイテム
-        if "workshop/" in path:
-            current_text = self.tree_widget.item(item_id, "values")[0]
-            if f" ({self.get_text('workshop_label')})" not in current_text:
-                self.tree_widget.set(item_id, "object", f"{current_text} ({self.get_text('workshop_label')})")
-            self.tree_widget.item(item_id, tags=("workshop",))
-            return False
+            rows = [((obj.get('name', 'Unknown'), obj.get('path', ''), ""), ())
+                    for obj in extracted_objects["other_objects"]]
+            model.append((self.get_text("other_category"), rows))
+        
+        # 未使用ファイル
+        if unused_files:
+            unused_label = self.get_text("file_unused")
+            rows = [((asset["name"], asset["rel_path"], unused_label), ("unused",))
+                    for assets in unused_files.values() for asset in assets]
+            if rows:
+                model.append((self.get_text("unused_category"), rows))
+        return model
+    
+    def _build_tree_row(self, record):
+        """1つの参照パスの検証結果(PathVerification)から行の値とタグを作成"""
+        # 2回以上出現するオブジェクトは出現回数を表示
+        display_name = record.name
+        if record.count > 1:
+            display_name = f"{display_name} ({self.get_text('usage_count', count=record.count)})"
+        status = ""
+        tags = ()
+        
+        if record.workshop:
+            # ワークショップアイテム
+            workshop_text = f" ({self.get_text('workshop_label')})"
+            if workshop_text not in display_name:
+                display_name += workshop_text
+            tags = ("workshop",)
+        elif record.subfolder is not None:
+            # サブフォルダ内のオブジェクトは状態にもサブフォルダ名を表示し、タグで色を設定
+            status = f"{self.get_text('subfolder_label')}: {record.subfolder}"
+            display_name = f"{display_name} ({status})"
+            tags = (f"subfolder_{record.category.lower()}",)
+        
+        # ファイルの存在確認結果（未確認の場合はNone）
+        if record.exists is not None:
+            if record.exists:
+                status = self.get_text("file_verified")
+            else:
+                status = self.get_text("file_not_found")
+                tags = ("missing",)
+        
+        return (display_name, record.path, status), tags
+    
+    def _clear_tree(self):
+        """ツリーと遅延挿入の状態をクリア"""
+        for job in self._tree_jobs.values():
+            self.after_cancel(job)
+        self._tree_jobs = {}
+        self._tree_rows = {}
+        self._tree_progress = {}
+        self._tree_categories = {}
+        self._tree_all_rows = {}
+        children = self.tree_widget.get_children()
+        if children:
+            self.tree_widget.delete(*children)
+    
+    def _show_tree_model(self, model):
+        """カテゴリ行だけを折りたたんだ状態で追加し、子の行は展開時に挿入する"""
+        self._clear_tree()
+        for label, rows in model:
+            self._insert_category(label, rows, tk.END)
+    
+    def _insert_category(self, label, rows, index):
+        """カテゴリ行を折りたたんだ状態で追加（子の行は展開時に挿入）"""
+        category_root = self.tree_widget.insert("", index, text=label, values=(label, "", ""))
+        # 展開できるように仮の子を追加
+        self.tree_widget.insert(category_root, tk.END, values=("", "", ""))
+        self._tree_rows[category_root] = rows
+        self._tree_progress[category_root] = 0
+        self._tree_categories[label] = category_root
+        self._tree_all_rows[category_root] = rows
+        return category_root
+    
+    def _patch_tree_model(self, model):
+        """表示中のツリーとの差分だけを反映し、変更した行の数を返す
+        
+        カテゴリ行はIDを保つため展開状態とスクロール位置が変わりません。まだ挿入していない
+        子の行は挿入待ちのリストを差し替えるだけで、挿入済みの行はパスで対応させて
+        追加・更新・削除・移動をします。
+        """
+        tree = self.tree_widget
+        changed = 0
+        labels = {label for label, _ in model}
+        for label in [label for label in self._tree_categories if label not in labels]:
+            category_root = self._tree_categories.pop(label)
+            self._forget_category(category_root)
+            tree.delete(category_root)
+            changed += 1
+        
+        for position, (label, rows) in enumerate(model):
+            category_root = self._tree_categories.get(label)
+            if category_root is None:
+                self._insert_category(label, rows, position)
+                changed += 1
+                continue
+            if tree.index(category_root) != position:
+                tree.move(category_root, "", position)
             
-        # 各種フォルダのサブフォルダチェック
-        folders_to_check = {
-            "data/Props/": "Props",
-            "data/Environment/": "Environment", 
-            "data/Characters/": "Characters",
-            "data/Particles/": "Particles"
-        }
+            if self._tree_progress.get(category_root) == 0:
+                # まだ展開されていないカテゴリは挿入待ちの行を差し替えるだけ
+                self._tree_rows[category_root] = rows
+            elif category_root in self._tree_rows:
+                # 挿入の途中だったカテゴリは挿入し直す
+                job = self._tree_jobs.pop(category_root, None)
+                if job:
+                    self.after_cancel(job)
+                tree.delete(*tree.get_children(category_root))
+                self._tree_rows[category_root] = rows
+                self._tree_progress[category_root] = 0
+                self._populate_tree_batch(category_root)
+                changed += len(rows)
+            else:
+                changed += self._patch_category_rows(category_root, self._tree_all_rows[category_root], rows)
+            self._tree_all_rows[category_root] = rows
+        return changed
+    
+    def _patch_category_rows(self, category_root, old_rows, rows):
+        """挿入済みの子の行を新しい行のリストに合わせ、変更した行の数を返す"""
+        tree = self.tree_widget
+        # パス（同じパスが複数ある場合は出現順）で前回の行と対応させる
+        old_items = {}
+        occurrences = {}
+        for item_id, row in zip(tree.get_children(category_root), old_rows):
+            path = row[0][1]
+            occurrence = occurrences.get(path, 0)
+            occurrences[path] = occurrence + 1
+            old_items[(path, occurrence)] = (item_id, row)
+        
+        keys = []
+        occurrences = {}
+        for row in rows:
+            path = row[0][1]
+            occurrence = occurrences.get(path, 0)
+            occurrences[path] = occurrence + 1
+            keys.append((path, occurrence))
+        
+        changed = 0
+        new_keys = set(keys)
+        removed = [item_id for key, (item_id, _) in old_items.items() if key not in new_keys]
+        if removed:
+            tree.delete(*removed)
+            changed += len(removed)
+        
+        # 残った行の現在の並び。順序が変わらない行は移動しない
+        remaining = [item_id for item_id in tree.get_children(category_root)]
+        cursor = 0
+        placed = set()
+        for index, (key, row) in enumerate(zip(keys, rows)):
+            while cursor < len(remaining) and remaining[cursor] in placed:
+                cursor += 1
+            old = old_items.get(key)
+            if old is None:
+                tree.insert(category_root, index, values=row[0], tags=row[1])
+                changed += 1
+                continue
+            item_id, old_row = old
+            if old_row != row:
+                tree.item(item_id, values=row[0], tags=row[1])
+                changed += 1
+            if cursor < len(remaining) and remaining[cursor] == item_id:
+                cursor += 1
+            else:
+                tree.move(item_id, category_root, index)
+            placed.add(item_id)
+        return changed
+    
+    def _forget_category(self, category_root):
+        """削除するカテゴリ行の遅延挿入の状態を破棄"""
+        job = self._tree_jobs.pop(category_root, None)
+        if job:
+            self.after_cancel(job)
+        self._tree_rows.pop(category_root, None)
+        self._tree_progress.pop(category_root, None)
+        self._tree_all_rows.pop(category_root, None)
+    
+    def _on_tree_open(self, event):
+        """カテゴリが初めて展開されたときに子の行の挿入を開始"""
+        item_id = self.tree_widget.focus()
+        if item_id not in self._tree_rows or item_id in self._tree_jobs:
+            return
+        if self._tree_progress[item_id] == 0:
+            # 仮の子を削除
+            placeholder = self.tree_widget.get_children(item_id)
+            if placeholder:
+                self.tree_widget.delete(*placeholder)
+        self._populate_tree_batch(item_id)
+    
+    def _populate_tree_batch(self, item_id):
+        """子の行を一定時間ずつ挿入し、残りは after() で続ける"""
+        self._tree_jobs.pop(item_id, None)
+        rows = self._tree_rows.get(item_id)
+        if rows is None:
+            return
+        
+        index = self._tree_progress[item_id]
+        insert = self.tree_widget.insert
+        deadline = time.perf_counter() + self.TREE_SLICE_SECONDS
+        while index < len(rows):
+            # 1行につき1回のTk呼び出しで値とタグを設定
+            values, tags = rows[index]
+            insert(item_id, tk.END, values=values, tags=tags)
+            index += 1
+            if not index % 64 and time.perf_counter() >= deadline:
+                break
         
-        for folder_path, folder_name in folders_to_check.items():
-            if folder_path in path and path.count('/') > 2:
-                parts = path.split('/')
-                if len(parts) > 3 and parts[2] == folder_name and len(parts) > 4:
-                    subfolder_name = parts[3]
-                    
-                    # 表示テキストを更新
-                    current_text = self.tree_widget.item(item_id, "values")[0]
-                    if f" ({self.get_text('subfolder_label')}: {subfolder_name})" not in current_text:
-                        self.tree_widget.set(item_id, "object", 
-                                           f"{current_text} ({self.get_text('subfolder_label')}: {subfolder_name})")
-                    
-                    # ステータスにもサブフォルダ名を表示
-                    self.tree_widget.set(item_id, "status", f"{self.get_text('subfolder_label')}: {subfolder_name}")
-                    
-                    # タグを使用して色を設定
-                    self.tree_widget.item(item_id, tags=(f"subfolder_{folder_name.lower()}",))
-                    
-                    return True
-        
-        return False
-    
-    def _generate_analysis_summary(self, extracted_objects, env_counts, prop_counts, char_counts, particle_counts):
+        if index < len(rows):
+            self._tree_progress[item_id] = index
+            self._tree_jobs[item_id] = self.after(1, self._populate_tree_batch, item_id)
+        else:
+            # すべて挿入済み
+            del self._tree_rows[item_id]
+            del self._tree_progress[item_id]
+    
+    def _generate_analysis_summary(self, extracted_objects, object_counts, verifications, verify,
+                                   unused_files=None, profiler=None):
         """分析結果のサマリーを生成"""
         summary = self.get_text("analysis_results") + "\n"
-        summary += self.get_text("env_count", total=len(extracted_objects["environments"]), unique=len(env_counts)) + "\n"
-        summary += self.get_text("prop_count", total=len(extracted_objects["props"]), unique=len(prop_counts)) + "\n"
-        summary += self.get_text("char_count", total=len(extracted_objects["characters"]), unique=len(char_counts)) + "\n"
-        summary += self.get_text("particle_count", total=len(extracted_objects["particles"]), unique=len(particle_counts)) + "\n"
+        summary += self.get_text("env_count", total=len(extracted_objects["environments"]), unique=len(object_counts["Environment"])) + "\n"
+        summary += self.get_text("prop_count", total=len(extracted_objects["props"]), unique=len(object_counts["Props"])) + "\n"
+        summary += self.get_text("char_count", total=len(extracted_objects["characters"]), unique=len(object_counts["Characters"])) + "\n"
+        summary += self.get_text("particle_count", total=len(extracted_objects["particles"]), unique=len(object_counts["Particles"])) + "\n"
         summary += self.get_text("other_count", count=len(extracted_objects["other_objects"])) + "\n\n"
         
         # 問題チェック
         issues = []
         missing_files = []
         
+        profiler = profiler or PhaseProfiler()
+        
         # サブフォルダの問題チェック
-        issues = self.analyzer.check_subfolder_issues(extracted_objects, self.get_text)
+        with profiler.phase("subfolder_issues") as record:
+            issues = self.analyzer.subfolder_issues(verifications, self.get_text)
+            record.items = len(issues)
         
         # ファイル存在の問題チェック
-        if self.verify_var.get() and self.asset_manager.streaming_assets_path:
-            missing_files = self.analyzer.check_missing_files(extracted_objects, self.get_text)
+        if verify:
+            with profiler.phase("missing_file_issues") as record:
+                missing_files = self.analyzer.missing_file_issues(verifications, self.get_text)
+                record.items = len(missing_files)
         
         if issues:
             summary += self.get_text("subfolder_issues") + "\n"
@@ -473,5 +1272,13 @@ class MainUI(tk.Tk):
                 
         if not issues and not missing_files:
             summary += self.get_text("no_issues")
+        
+        # 未使用ファイル
+        if unused_files is not None:
+            unused_items = self.analyzer.check_unused_files(unused_files, self.get_text)
+            summary += "\n\n" + self.get_text("unused_files") + "\n"
+            summary += self.get_text("unused_count", count=len(unused_items)) + "\n"
+            for item in unused_items:
+                summary += f"- {item}\n"
             
-        self._set_text_content(summary)
+        return summary
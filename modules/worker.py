@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+バックグラウンド処理モジュール
+時間のかかる処理をワーカースレッドで実行し、進捗と結果をキューで通知します。
+"""
+
+import queue
+import threading
+
+
+class AnalysisCancelled(Exception):
+    """処理がキャンセルされた場合の例外"""
+
+
+class BackgroundTask:
+    """ワーカースレッドで1つの処理を実行するクラス
+
+    処理関数は report(phase, fraction) を受け取り、区切りのよいところで呼び出します。
+    キャンセルが要求されていると report が AnalysisCancelled を送出して処理を中断します。
+    UI側は poll() で通知を取り出します（Tkのメインスレッドからのみウィジェットを操作するため）。
+
+    通知はタプルで、以下のいずれかです。
+        ("progress", phase, fraction)
+        ("done", result)
+        ("error", exception)
+        ("cancelled",)
+    """
+
+    def __init__(self, func, *args):
+        self._func = func
+        self._args = args
+        self._queue = queue.Queue()
+        self._cancel_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        """処理を開始"""
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """次のチェックポイントで処理を中断するよう要求"""
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        """キャンセルが要求されたかどうか"""
+        return self._cancel_event.is_set()
+
+    def is_alive(self):
+        """処理中かどうか"""
+        return self._thread.is_alive()
+
+    def report(self, phase, fraction=0.0):
+        """進捗を通知（キャンセルが要求されていれば中断する）"""
+        if self._cancel_event.is_set():
+            raise AnalysisCancelled()
+        self._queue.put(("progress", phase, fraction))
+
+    def poll(self):
+        """たまっている通知をすべて取り出す"""
+        messages = []
+        while True:
+            try:
+                messages.append(self._queue.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def _run(self):
+        """ワーカースレッドの本体"""
+        try:
+            result = self._func(self.report, *self._args)
+        except AnalysisCancelled:
+            self._queue.put(("cancelled",))
+        except Exception as e:
+            self._queue.put(("error", e))
+        else:
+            if self._cancel_event.is_set():
+                self._queue.put(("cancelled",))
+            else:
+                self._queue.put(("done", result))